@@ -5,24 +5,47 @@ from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flasgger import Swagger
 from config import config
+from app.compression import Compression
+from app.json_provider import FastJSONProvider
+from app.metrics import Metrics, prometheus_client
+from app.pool_metrics import PoolMetrics
+from app.profiling import SqlProfiler
+from app.replicas import ReplicaRouter, RoutingSession
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 cors = CORS()
 jwt = JWTManager()
 swagger = Swagger()
+compression = Compression()
+pool_metrics = PoolMetrics()
+sql_profiler = SqlProfiler()
+metrics = Metrics()
+replica_router = ReplicaRouter()
 
 def create_app(config_name='default'):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    app.json = FastJSONProvider(app)
     
-    # Initialize extensions with app
+    # Initialize extensions with app (pool class and replica binds are set before the engines exist)
+    pool_metrics.init_app(app)
+    replica_router.init_app(app)
     db.init_app(app)
+    
+    # Visit rollups follow the writes of db.session (fails here on a database without upserts)
+    from app.services.visit_stats_service import VisitStatsService
+    VisitStatsService.init_app(app)
+    
     migrate.init_app(app, db)
     cors.init_app(app)
     jwt.init_app(app)
     swagger.init_app(app)
+    # Registered before compression so the measured times include it
+    metrics.init_app(app)
+    sql_profiler.init_app(app)
+    compression.init_app(app)
     
     # Register blueprints
     from app.controllers.owner_controller import owner_bp
@@ -32,6 +55,7 @@ def create_app(config_name='default'):
     from app.controllers.specialty_controller import specialty_bp
     from app.controllers.pettype_controller import pettype_bp
     from app.controllers.auth_controller import auth_bp
+    from app.controllers.stats_controller import stats_bp
     
     app.register_blueprint(owner_bp, url_prefix='/api/owners')
     app.register_blueprint(pet_bp, url_prefix='/api/pets')
@@ -40,12 +64,35 @@ def create_app(config_name='default'):
     app.register_blueprint(specialty_bp, url_prefix='/api/specialties')
     app.register_blueprint(pettype_bp, url_prefix='/api/pet-types')
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(stats_bp, url_prefix='/api/stats')
+    
+    # Maintenance commands (flask search ...)
+    from app.cli import register_cli
+    register_cli(app)
     
     # Health check endpoint
     @app.route('/health')
     def health_check():
         return {'status': 'OK', 'message': 'PetClinic API is running'}, 200
     
+    # Connection pool occupancy, checkout waits and hold times of this process
+    @app.route('/health/pool')
+    def pool_health():
+        return pool_metrics.report(db.engine), 200
+    
+    # Prometheus scrape endpoint
+    @app.route('/metrics')
+    def prometheus_metrics():
+        if prometheus_client is None:
+            return {'error': 'Metrics unavailable', 'message': 'prometheus_client is not installed'}, 501
+        body, content_type = metrics.exposition()
+        return body, 200, {'Content-Type': content_type}
+    
+    # Statements, database and serialization time of the profiled requests by endpoint
+    @app.route('/health/sql')
+    def sql_health():
+        return sql_profiler.report(), 200
+    
     # API documentation endpoint
     @app.route('/api')
     def api_docs():
@@ -60,7 +107,8 @@ def create_app(config_name='default'):
                 'vets': '/api/vets',
                 'specialties': '/api/specialties',
                 'pet-types': '/api/pet-types',
-                'auth': '/api/auth'
+                'auth': '/api/auth',
+                'stats': '/api/stats'
             }
         }, 200
     
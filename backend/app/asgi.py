@@ -0,0 +1,218 @@
+import asyncio
+import io
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from inspect import isawaitable
+from werkzeug.exceptions import HTTPException
+from werkzeug.routing import Map
+from app import create_app
+from app.async_db import AsyncDatabase, close_async_session
+from app.controllers.async_controller import async_rules
+from app.services.reference_cache import warm_reference_caches
+
+# Marks the end of a WSGI response on the queue feeding the ASGI server
+_DONE = object()
+
+class AsgiGateway:
+    """ASGI application serving the hot read endpoints on asyncio
+    
+    GET/HEAD requests for owner, pet and visit lists, details and searches
+    run the async views of ``async_controller`` on an ``AsyncSession``: a
+    request waiting on the database holds no thread, so one worker keeps
+    many of them in flight. Every other request goes to the Flask WSGI app
+    on a pool of ``ASGI_WSGI_THREADS`` threads. Both paths run the app's
+    request hooks (compression, CORS) and answer with the same bodies.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+        self.routes = Map(async_rules)
+        self.executor = ThreadPoolExecutor(max_workers=int(app.config.get('ASGI_WSGI_THREADS', 16)),
+                                           thread_name_prefix='wsgi')
+        AsyncDatabase(app)
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            raise RuntimeError(f"Unsupported ASGI scope {scope['type']}")
+        
+        environ = self.environ(scope, await self.read_body(receive))
+        try:
+            view, arguments = self.routes.bind_to_environ(environ).match()
+        except HTTPException:
+            return await self.call_wsgi(environ, send)
+        return await self.call_async(view, arguments, environ, send)
+    
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await asyncio.get_running_loop().run_in_executor(self.executor, self.warm)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await AsyncDatabase.dispose(self.app)
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    
+    def warm(self):
+        """Load pet types and specialties into memory before the first request"""
+        try:
+            with self.app.app_context():
+                warm_reference_caches()
+        except Exception as e:
+            print(f"⚠ Reference data not preloaded: {e}")
+    
+    async def call_async(self, view, arguments, environ, send):
+        """Run an async view inside a Flask request context"""
+        app = self.app
+        with app.request_context(environ):
+            try:
+                response = app.preprocess_request()
+                if response is None:
+                    response = view(**arguments)
+                    if isawaitable(response):
+                        response = await response
+                response = app.process_response(app.make_response(response))
+            except Exception as e:
+                response = app.make_response(app.handle_exception(e))
+            finally:
+                await close_async_session()
+        
+        # Werkzeug drops the body of HEAD, 204 and 304 responses here
+        body, status, headers = response.get_wsgi_response(environ)
+        await send({
+            'type': 'http.response.start',
+            'status': int(status.split(' ', 1)[0]),
+            'headers': self.headers(headers)
+        })
+        await send({'type': 'http.response.body', 'body': b''.join(body)})
+    
+    async def call_wsgi(self, environ, send):
+        """Run the Flask WSGI app in a worker thread and stream its response
+        
+        The worker iterates the whole response (streamed exports keep their
+        context in one thread) and hands chunks over through a small queue,
+        so a slow client slows the export down instead of buffering it.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=8)
+        aborted = threading.Event()
+        
+        def emit(item):
+            if aborted.is_set():
+                raise ConnectionAbortedError('Client went away')
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+        
+        def start_response(status, headers, exc_info=None):
+            emit((int(status.split(' ', 1)[0]), headers))
+            return emit
+        
+        def run():
+            try:
+                body = self.app(environ, start_response)
+                try:
+                    for chunk in body:
+                        if chunk:
+                            emit(chunk)
+                finally:
+                    if hasattr(body, 'close'):
+                        body.close()
+                emit(_DONE)
+            except ConnectionAbortedError:
+                pass
+            except BaseException as e:
+                if not aborted.is_set():
+                    emit(e)
+        
+        worker = loop.run_in_executor(self.executor, run)
+        started = False
+        try:
+            while True:
+                item = await queue.get()
+                if isinstance(item, BaseException):
+                    raise item
+                if item is _DONE:
+                    break
+                if not started:
+                    status, headers = item
+                    await send({
+                        'type': 'http.response.start',
+                        'status': status,
+                        'headers': self.headers(headers)
+                    })
+                    started = True
+                else:
+                    await send({'type': 'http.response.body', 'body': item, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            # Unblock a worker still waiting on the queue so it can close the response
+            aborted.set()
+            while not worker.done():
+                while not queue.empty():
+                    queue.get_nowait()
+                await asyncio.sleep(0.01)
+    
+    @staticmethod
+    def headers(headers) -> list:
+        return [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    
+    @staticmethod
+    async def read_body(receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                break
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+        return b''.join(chunks)
+    
+    @staticmethod
+    def environ(scope, body: bytes) -> dict:
+        """WSGI environ of an ASGI HTTP request"""
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        root_path = scope.get('root_path', '')
+        path = scope['path']
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': root_path.encode('utf-8').decode('latin-1'),
+            'PATH_INFO': path.encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+            'asgi.scope': scope
+        }
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name == 'CONTENT_TYPE':
+                environ['CONTENT_TYPE'] = value
+                continue
+            if name == 'CONTENT_LENGTH':
+                continue
+            key = f'HTTP_{name}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+        return environ
+
+def create_asgi_app(config_name=None):
+    """ASGI app for ``SERVER_MODE=async`` (``uvicorn --factory app.asgi:create_asgi_app``)"""
+    return AsgiGateway(create_app(config_name or os.environ.get('PETCLINIC_CONFIG', 'default')))
\ No newline at end of file
@@ -0,0 +1,57 @@
+from flask import current_app, g
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app import db
+
+# asyncio DBAPI drivers by backend, see requirements.txt
+ASYNC_DRIVERS = {'mysql': 'aiomysql', 'sqlite': 'aiosqlite', 'postgresql': 'asyncpg'}
+
+def async_url(url) -> URL:
+    """URL of the same database through its asyncio driver, e.g. mysql+pymysql:// -> mysql+aiomysql://"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'No asyncio driver known for {backend}')
+    return url.set(drivername=f'{backend}+{ASYNC_DRIVERS[backend]}')
+
+class AsyncDatabase:
+    """AsyncEngine and AsyncSession factory of an app, for the ASGI read path
+    
+    Connects to ``ASYNC_DATABASE_URL``, by default the app's primary database
+    through the asyncio driver of its backend, with the same pool settings as
+    the sync engine. Only ``app.asgi`` initialises it, so the WSGI servers
+    never import the asyncio drivers.
+    """
+    
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        url = app.config.get('ASYNC_DATABASE_URL')
+        if not url:
+            with app.app_context():
+                url = async_url(db.engine.url)
+        # The pool metrics subclass QueuePool, asyncio engines need their own pool class
+        options = {key: value for key, value in app.config['SQLALCHEMY_ENGINE_OPTIONS'].items() if key != 'poolclass'}
+        engine = create_async_engine(url, **options)
+        app.extensions['async_db'] = {
+            'engine': engine,
+            'sessions': async_sessionmaker(engine, expire_on_commit=False)
+        }
+    
+    @staticmethod
+    async def dispose(app) -> None:
+        await app.extensions['async_db']['engine'].dispose()
+
+def async_session() -> AsyncSession:
+    """AsyncSession of the current request, opened on first use"""
+    if 'async_session' not in g:
+        g.async_session = current_app.extensions['async_db']['sessions']()
+    return g.async_session
+
+async def close_async_session() -> None:
+    """Return the connection of the request's AsyncSession to the pool"""
+    session = g.pop('async_session', None)
+    if session is not None:
+        await session.close()
\ No newline at end of file
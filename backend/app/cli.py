@@ -0,0 +1,108 @@
+import click
+from flask.cli import AppGroup
+from app import db
+from app.models.fulltext import FullTextIndex
+
+search_cli = AppGroup('search', help='Manage the full-text search indexes.')
+plans_cli = AppGroup('plans', help='Inspect the query plans of the service queries.')
+petclinic_cli = AppGroup('petclinic', help='Load and maintain clinic data.')
+stats_cli = AppGroup('stats', help='Maintain the visit statistics rollups.')
+
+@search_cli.command('rebuild')
+@click.argument('tables', nargs=-1)
+def rebuild_search_index(tables):
+    """Rebuild the full-text indexes of TABLES (all of them by default)"""
+    names = tables or sorted(FullTextIndex.registry)
+    unknown = [name for name in names if name not in FullTextIndex.registry]
+    if unknown:
+        raise click.BadParameter(f'no search index on {", ".join(unknown)}', param_hint='TABLES')
+    
+    with db.engine.begin() as connection:
+        for name in names:
+            FullTextIndex.registry[name].rebuild(connection)
+            click.echo(f'Rebuilt search index on {name}')
+
+@plans_cli.command('check')
+@click.option('--verbose', '-v', is_flag=True, help='Print every statement and its plan.')
+def check_query_plans(verbose):
+    """Fail if a hot service query falls back to a full table or index scan (SQLite only)"""
+    from app.query_plans import check_hot_queries
+    
+    try:
+        report = check_hot_queries()
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    
+    failures = [entry for entry in report if entry['full_scans']]
+    for entry in report:
+        if verbose or entry['full_scans']:
+            status = 'FULL SCAN of ' + ', '.join(entry['full_scans']) if entry['full_scans'] else 'ok'
+            click.echo(f"{entry['query']}: {status}")
+            click.echo(f"  {' '.join(entry['statement'].split())}")
+            for step in entry['plan']:
+                click.echo(f'    {step}')
+    
+    click.echo(f'{len(report)} statements checked, {len(failures)} with full scans')
+    if failures:
+        raise SystemExit(1)
+
+@petclinic_cli.command('import')
+@click.option('--owners', type=click.Path(exists=True, dir_okay=False), help='Owners file (.csv or .ndjson).')
+@click.option('--pets', type=click.Path(exists=True, dir_okay=False), help='Pets file (.csv or .ndjson).')
+@click.option('--visits', type=click.Path(exists=True, dir_okay=False), help='Visits file (.csv or .ndjson).')
+@click.option('--batch-size', default=5000, show_default=True, help='Rows per INSERT batch and transaction.')
+@click.option('--workers', default=4, show_default=True, help='Batches inserted in parallel (1 on SQLite).')
+@click.option('--checkpoint', 'checkpoint_path', default='import.checkpoint.json', show_default=True,
+              type=click.Path(dir_okay=False), help='Progress file; rerun the same command to resume.')
+@click.option('--rejects', default='import.rejects.ndjson', show_default=True,
+              type=click.Path(dir_okay=False), help='Where rows that cannot be loaded are written.')
+def import_data(owners, pets, visits, batch_size, workers, checkpoint_path, rejects):
+    """Bulk load owners, pets and visits from CSV or NDJSON files
+    
+    Files are streamed and inserted in batches; pets reference owners and
+    visits reference pets through the ``id`` column of their source files.
+    After a failure, run the same command again to continue from the
+    checkpoint.
+    """
+    from app.importer import Checkpoint, Importer
+    
+    if not (owners or pets or visits):
+        raise click.UsageError('Give at least one of --owners, --pets or --visits')
+    
+    try:
+        checkpoint = Checkpoint(checkpoint_path)
+        importer = Importer(db.engine, checkpoint, rejects, batch_size, workers, click.echo)
+        importer.run(owners, pets, visits)
+    except (ValueError, OSError) as e:
+        # OSError: a file of this run or of an earlier one is gone
+        raise click.ClickException(str(e))
+    click.echo(f'Import complete, rejected rows are in {rejects}')
+
+@stats_cli.command('backfill')
+@click.option('--start', type=click.DateTime(['%Y-%m-%d', '%Y-%m']), help='First month to rebuild (default: oldest visit).')
+@click.option('--end', type=click.DateTime(['%Y-%m-%d', '%Y-%m']), help='Last month to rebuild (default: newest visit).')
+def backfill_visit_stats(start, end):
+    """Rebuild the visit rollup tables month by month
+    
+    Each month is recomputed from the visits in its own transaction, so the
+    command can run while the API is serving writes and can be rerun after
+    an interruption.
+    """
+    from app.models.visit import Visit
+    from app.services.visit_stats_service import VisitStatsService
+    
+    with db.engine.connect() as connection:
+        first, last = connection.execute(db.select(db.func.min(Visit.visit_date), db.func.max(Visit.visit_date))).one()
+    first = start.date() if start else first
+    last = end.date() if end else last
+    if first is None or last is None:
+        click.echo('No visits to count')
+        return
+    VisitStatsService.backfill(db.engine, first, last, click.echo)
+
+def register_cli(app):
+    """Attach the maintenance commands to ``flask``"""
+    app.cli.add_command(search_cli)
+    app.cli.add_command(plans_cli)
+    app.cli.add_command(petclinic_cli)
+    app.cli.add_command(stats_cli)
\ No newline at end of file
@@ -0,0 +1,132 @@
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Iterator, Tuple
+from flask import current_app, request
+from app.metrics import cache_lookup
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Content types worth compressing
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/csv', 'text/html', 'text/plain', 'application/javascript')
+
+def _gzip_stream():
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+def _brotli_stream():
+    compressor = brotli.Compressor(quality=5)
+    return compressor.process, compressor.finish
+
+def _zstd_stream():
+    compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    return compressor.compress, compressor.flush
+
+# Encodings in server preference order: (one-shot compress, streaming compressor factory)
+ENCODINGS: Dict[str, Tuple[Callable[[bytes], bytes], Callable]] = {}
+if zstandard is not None:
+    ENCODINGS['zstd'] = (lambda data: zstandard.ZstdCompressor(level=3).compress(data), _zstd_stream)
+if brotli is not None:
+    ENCODINGS['br'] = (lambda data: brotli.compress(data, quality=5), _brotli_stream)
+ENCODINGS['gzip'] = (lambda data: zlib.compress(data, 6, 31), _gzip_stream)
+
+class CompressedBodyCache:
+    """Small LRU of compressed bodies keyed by encoding and body digest
+    
+    Keys are derived from the uncompressed bytes, so an entry can never be
+    served for different content and nothing needs invalidating: changed
+    data simply produces a new key and the old one ages out.
+    """
+    
+    def __init__(self, size: int):
+        self.size = size
+        self._entries: 'OrderedDict[Tuple[str, bytes], bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_or_compress(self, encoding: str, body: bytes) -> bytes:
+        key = (encoding, hashlib.sha1(body).digest())
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+        if compressed is not None:
+            cache_lookup('compression', True)
+            return compressed
+        
+        cache_lookup('compression', False)
+        compressed = ENCODINGS[encoding][0](body)
+        with self._lock:
+            self._entries[key] = compressed
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return compressed
+
+class Compression:
+    """Negotiated gzip/brotli/zstd compression of responses
+    
+    Bodies under ``COMPRESS_MIN_SIZE`` bytes are sent as they are, streamed
+    responses (the exports) are compressed chunk by chunk, and GET bodies
+    are compressed through a ``COMPRESS_CACHE_SIZE`` entry cache so hot
+    payloads are compressed once. brotli and zstd are used when their
+    packages are installed; gzip is always available.
+    """
+    
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+        app.config.setdefault('COMPRESS_CACHE_SIZE', 64)
+        app.extensions['compression'] = CompressedBodyCache(app.config['COMPRESS_CACHE_SIZE'])
+        app.after_request(self.after_request)
+    
+    def after_request(self, response):
+        response.vary.add('Accept-Encoding')
+        if (response.status_code < 200 or response.status_code >= 300 or response.status_code == 204
+                or 'Content-Encoding' in response.headers or response.direct_passthrough
+                or response.mimetype not in COMPRESSIBLE_TYPES):
+            return response
+        
+        encoding = request.accept_encodings.best_match(list(ENCODINGS))
+        if encoding is None:
+            return response
+        
+        if response.is_streamed:
+            response.response = self._compress_stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            if len(body) < current_app.config['COMPRESS_MIN_SIZE']:
+                return response
+            cache = current_app.extensions['compression']
+            if request.method == 'GET' and cache.size:
+                response.set_data(cache.get_or_compress(encoding, body))
+            else:
+                response.set_data(ENCODINGS[encoding][0](body))
+        
+        response.headers['Content-Encoding'] = encoding
+        return response
+    
+    @staticmethod
+    def _compress_stream(chunks: Iterable, encoding: str) -> Iterator[bytes]:
+        compress, flush = ENCODINGS[encoding][1]()
+        try:
+            for chunk in chunks:
+                data = compress(chunk.encode() if isinstance(chunk, str) else chunk)
+                if data:
+                    yield data
+            yield flush()
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
\ No newline at end of file
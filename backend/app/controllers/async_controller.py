@@ -0,0 +1,133 @@
+from datetime import datetime
+from flask import request, jsonify
+from werkzeug.routing import Rule
+from app.async_db import async_session
+from app.services.owner_service import OwnerService
+from app.services.pet_service import PetService
+from app.services.visit_service import VisitService
+from .base_controller import validate_pagination, validate_projection, handle_not_found, handle_ranked_cursor, handle_success, handle_error
+
+# Async versions of the owner, pet and visit readers served by app/asgi.py.
+# Same parameters, validation and envelopes as the blueprint views; the
+# detail views validate with the ETag of the body instead of ``conditional``.
+
+@validate_pagination(OwnerService)
+@validate_projection(OwnerService.model)
+async def get_owners(page, per_page, projection, cursor):
+    try:
+        session = async_session()
+        search_term = request.args.get('search')
+        
+        if search_term:
+            if cursor is not None:
+                return handle_ranked_cursor()
+            result = await OwnerService.asearch_owners(session, search_term, page, per_page, cursor=cursor, **projection)
+        else:
+            result = await OwnerService.aget_all(session, page, per_page, cursor=cursor, **projection)
+        
+        return handle_success(result)
+    except Exception as e:
+        return handle_error(str(e))
+
+@validate_projection(OwnerService.model, OwnerService.detail_expand)
+async def get_owner(owner_id, projection):
+    try:
+        owner = await OwnerService.aget_by_id(async_session(), owner_id, projection['expand'])
+        if not owner:
+            return handle_not_found('Owner')
+        
+        return handle_success(owner.to_dict(**projection))
+    except Exception as e:
+        return handle_error(str(e))
+
+@validate_pagination(PetService)
+@validate_projection(PetService.model)
+async def get_pets(page, per_page, projection, cursor):
+    try:
+        session = async_session()
+        filters = {}
+        owner_id = request.args.get('owner_id', type=int)
+        type_id = request.args.get('type_id', type=int)
+        name = request.args.get('name')
+        
+        if owner_id:
+            filters['owner_id'] = owner_id
+        if type_id:
+            filters['type_id'] = type_id
+        if name:
+            filters['name'] = name
+        
+        if filters:
+            result = await PetService.asearch(session, filters, page, per_page, cursor=cursor, **projection)
+        else:
+            result = await PetService.aget_all(session, page, per_page, cursor=cursor, **projection)
+        
+        return handle_success(result)
+    except Exception as e:
+        return handle_error(str(e))
+
+@validate_projection(PetService.model, PetService.detail_expand)
+async def get_pet(pet_id, projection):
+    try:
+        pet = await PetService.aget_by_id(async_session(), pet_id, projection['expand'])
+        if not pet:
+            return handle_not_found('Pet')
+        
+        return handle_success(pet.to_dict(**projection))
+    except Exception as e:
+        return handle_error(str(e))
+
+@validate_pagination(VisitService)
+@validate_projection(VisitService.model)
+async def get_visits(page, per_page, projection, cursor):
+    try:
+        session = async_session()
+        pet_id = request.args.get('pet_id', type=int)
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        description = request.args.get('description')
+        
+        if pet_id:
+            result = await VisitService.aget_visits_by_pet(session, pet_id, page, per_page, cursor=cursor, **projection)
+            return handle_success(result)
+        
+        if start_date and end_date:
+            try:
+                start = datetime.strptime(start_date, '%Y-%m-%d').date()
+                end = datetime.strptime(end_date, '%Y-%m-%d').date()
+            except ValueError:
+                return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+            result = await VisitService.aget_visits_by_date_range(session, start, end, page, per_page, cursor=cursor, **projection)
+            return handle_success(result)
+        
+        if description:
+            if cursor is not None:
+                return handle_ranked_cursor()
+            result = await VisitService.asearch_visits_by_description(session, description, page, per_page, cursor=cursor, **projection)
+            return handle_success(result)
+        
+        result = await VisitService.aget_all(session, page, per_page, cursor=cursor, **projection)
+        return handle_success(result)
+    except Exception as e:
+        return handle_error(str(e))
+
+@validate_projection(VisitService.model, VisitService.detail_expand)
+async def get_visit(visit_id, projection):
+    try:
+        visit = await VisitService.aget_by_id(async_session(), visit_id, projection['expand'])
+        if not visit:
+            return handle_not_found('Visit')
+        
+        return handle_success(visit.to_dict(**projection))
+    except Exception as e:
+        return handle_error(str(e))
+
+# URL rules of the async views, the endpoint is the view itself
+async_rules = [
+    Rule('/api/owners', endpoint=get_owners, methods=['GET']),
+    Rule('/api/owners/<int:owner_id>', endpoint=get_owner, methods=['GET']),
+    Rule('/api/pets', endpoint=get_pets, methods=['GET']),
+    Rule('/api/pets/<int:pet_id>', endpoint=get_pet, methods=['GET']),
+    Rule('/api/visits', endpoint=get_visits, methods=['GET']),
+    Rule('/api/visits/<int:visit_id>', endpoint=get_visit, methods=['GET'])
+]
\ No newline at end of file
@@ -1,6 +1,43 @@
+import csv
+import hashlib
+import io
+import json
+from datetime import date, datetime
 from functools import wraps
-from flask import request, jsonify
-from marshmallow import ValidationError
+from flask import Response, current_app, g, request, jsonify, stream_with_context
+from werkzeug.http import is_resource_modified
+from marshmallow import ValidationError, validate
+from app.models.base import parse_paths
+from app.services.existence import existing_ids
+
+class Exists(validate.Validator):
+    """Field validator requiring the id to exist in the service's table
+    
+    Checks go through ``existing_ids``, so they are memoized per request
+    and ``prefetch_references`` can resolve a whole batch of records first.
+    """
+    
+    def __init__(self, service, error=None):
+        self.table = service.model.__table__
+        self.error = error or f'{service._label(self.table)} not found'
+    
+    def __call__(self, value):
+        if value not in existing_ids(self.table, [value]):
+            raise ValidationError(self.error)
+        return value
+
+def prefetch_references(schema, records):
+    """Check every id the ``records`` reference with one query per table before validating them one by one"""
+    for name, field in schema.fields.items():
+        for validator in field.validators:
+            if isinstance(validator, Exists):
+                ids = set()
+                for record in records:
+                    try:
+                        ids.add(int(record[name]))
+                    except (KeyError, TypeError, ValueError):
+                        pass
+                existing_ids(validator.table, ids)
 
 def validate_json(schema_class):
     """Decorator to validate JSON input using Marshmallow schema"""
@@ -24,8 +61,56 @@ def validate_json(schema_class):
         return decorated_function
     return decorator
 
-def validate_pagination():
-    """Decorator to validate pagination parameters"""
+def validate_bulk(schema_class):
+    """Decorator to validate a JSON array of records with a Marshmallow schema
+    
+    The view receives ``items``, the valid records as ``(index, data)``
+    pairs, and ``errors``, the validation messages keyed by index. The
+    request is rejected when it is not a non-empty array or exceeds
+    ``BULK_MAX_ITEMS``.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            payload = request.get_json(silent=True)
+            max_items = current_app.config.get('BULK_MAX_ITEMS', 10000)
+            if not isinstance(payload, list) or not payload:
+                return jsonify({'error': 'Invalid JSON format', 'message': 'Expected a non-empty array'}), 400
+            if len(payload) > max_items:
+                return jsonify({'error': 'Too many items', 'message': f'At most {max_items} items per request'}), 400
+            
+            schema = schema_class()
+            prefetch_references(schema, [record for record in payload if isinstance(record, dict)])
+            items, errors = [], {}
+            for index, record in enumerate(payload):
+                try:
+                    items.append((index, schema.load(record if isinstance(record, dict) else {})))
+                except ValidationError as err:
+                    errors[index] = err.messages
+            
+            kwargs['items'] = items
+            kwargs['errors'] = errors
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+def bulk_response(result, errors):
+    """Combine validation and insert errors: 201 if every record was created, 207 if some, 400 if none"""
+    errors = {**errors, **result['errors']}
+    if not result['created']:
+        return jsonify({'error': 'Validation error', 'messages': errors}), 400
+    
+    data = {'created': result['created'], 'ids': result['ids'], 'errors': errors}
+    return handle_success(data, f"{result['created']} records created", 207 if errors else 201)
+
+def validate_pagination(service=None):
+    """Decorator to validate pagination parameters
+    
+    When a ``service`` is given the view also receives a ``cursor`` keyword:
+    ``None`` for page/offset pagination, or the decoded sort key when the
+    request opts into keyset pagination with ``cursor=`` (empty for the
+    first page).
+    """
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
@@ -38,12 +123,157 @@ def validate_pagination():
                 if per_page < 1 or per_page > 100:
                     return jsonify({'error': 'Per page must be between 1 and 100'}), 400
                 
+                if service is not None:
+                    cursor = request.args.get('cursor')
+                    try:
+                        kwargs['cursor'] = service.decode_cursor(cursor) if cursor is not None else None
+                    except ValueError as err:
+                        return jsonify({'error': 'Invalid cursor', 'message': str(err)}), 400
+                
                 return f(page, per_page, *args, **kwargs)
             except ValueError:
                 return jsonify({'error': 'Invalid pagination parameters'}), 400
         return decorated_function
     return decorator
 
+def validate_projection(model, default_expand=None):
+    """Decorator to parse the ``fields`` and ``expand`` query parameters
+    
+    The parsed trees are passed to the view as the ``projection`` keyword so
+    they can be forwarded to the services and ``to_dict()``. ``default_expand``
+    applies when the request has no ``expand`` parameter.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            fields = parse_paths(request.args.get('fields'))
+            expand = parse_paths(request.args.get('expand', default_expand))
+            
+            try:
+                model.validate_expand(expand)
+            except ValueError as err:
+                return jsonify({'error': 'Invalid expand parameter', 'message': str(err)}), 400
+            
+            kwargs['projection'] = {'fields': fields, 'expand': expand}
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8'
+}
+
+def validate_export(f):
+    """Decorator to parse the ``format`` and ``fields`` query parameters of export views
+    
+    The view receives ``export_format`` (``ndjson`` by default or ``csv``)
+    and ``fields``, the parsed column list or None for every column.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({
+                'error': 'Invalid export format',
+                'message': f'format must be one of: {", ".join(EXPORT_FORMATS)}'
+            }), 400
+        
+        kwargs['export_format'] = export_format
+        kwargs['fields'] = parse_paths(request.args.get('fields'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+def stream_export(rows, export_format, filename):
+    """Stream column dicts as an NDJSON or CSV download, one row at a time"""
+    def generate_ndjson():
+        for row in rows:
+            yield json.dumps({key: _export_value(value) for key, value in row.items()}) + '\n'
+    
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = None
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow({key: _export_value(value) for key, value in row.items()})
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    generate = generate_csv if export_format == 'csv' else generate_ndjson
+    return Response(
+        stream_with_context(generate()),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename={filename}.{export_format}'}
+    )
+
+def conditional(service, id_arg):
+    """Decorator answering conditional GETs of a document before loading it
+    
+    ``service.freshness()`` versions the record named by the ``id_arg``
+    keyword together with the relationships of the request's ``expand``
+    (the view must sit below ``validate_projection``). A matching
+    ``If-None-Match`` or ``If-Modified-Since`` gets a 304 right away;
+    otherwise ``handle_success()`` sends the same validators with the body.
+    Documents that embed a collection get no ``Last-Modified``: removing one
+    of its rows does not raise any ``updated_at``, only the ETag changes.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return f(*args, **kwargs)
+            
+            version = service.freshness(kwargs[id_arg], kwargs['projection']['expand'])
+            if version is None:
+                return f(*args, **kwargs)
+            
+            digest = hashlib.sha1(repr((request.full_path, version)).encode()).hexdigest()
+            last_modified = None
+            if not service.model.expands_collection(kwargs['projection']['expand']):
+                last_modified = max(value for value in version if isinstance(value, datetime))
+            if not is_resource_modified(request.environ, etag=digest, last_modified=last_modified):
+                response = Response(status=304)
+                _set_validators(response, digest, last_modified)
+                return response
+            
+            g.validators = (digest, last_modified)
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+def latest_update(data):
+    """Largest ``updated_at`` of a serialized document, nested documents included
+    
+    None when the data holds a list anywhere (a page, an embedded
+    collection): a removed row never raises the maximum, so such a response
+    can only be validated by its ETag.
+    """
+    values = []
+    
+    def walk(value):
+        if isinstance(value, list):
+            return False
+        if isinstance(value, dict):
+            if isinstance(value.get('updated_at'), datetime):
+                values.append(value['updated_at'])
+            return all(walk(item) for item in value.values())
+        return True
+    
+    return max(values, default=None) if walk(data) else None
+
+def _set_validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Let clients store the document but revalidate it on every use
+    response.cache_control.no_cache = True
+
 def handle_not_found(resource_name):
     """Helper function to return 404 error"""
     return jsonify({
@@ -51,12 +281,31 @@ def handle_not_found(resource_name):
         'message': f'{resource_name} not found'
     }), 404
 
+def handle_ranked_cursor():
+    """400 for ``cursor`` on a ranked search, relevance order has no key to seek past"""
+    return jsonify({
+        'error': 'Invalid cursor',
+        'message': 'Ranked searches are paginated with page, not cursor'
+    }), 400
+
 def handle_success(data, message=None, status_code=200):
-    """Helper function to return success response"""
+    """Helper function to return success response, GETs get ETag/Last-Modified validators"""
     response = {'data': data}
     if message:
         response['message'] = message
-    return jsonify(response), status_code
+    
+    if request.method not in ('GET', 'HEAD') or status_code != 200:
+        return jsonify(response), status_code
+    
+    # Conditional GET: weak ETag of the body (or the version computed by
+    # ``conditional``) and, for documents without lists, Last-Modified from
+    # the newest ``updated_at``
+    response = jsonify(response)
+    validators = g.pop('validators', None)
+    if validators is None:
+        validators = (hashlib.sha1(response.get_data()).hexdigest(), latest_update(data))
+    _set_validators(response, *validators)
+    return response.make_conditional(request)
 
 def handle_error(error_message, status_code=500):
     """Helper function to return error response"""
@@ -2,7 +2,7 @@ from flask import Blueprint, request, jsonify
 from flasgger import swag_from
 from marshmallow import Schema, fields, validate, ValidationError
 from app.services.owner_service import OwnerService
-from .base_controller import validate_json, validate_pagination, handle_not_found, handle_success, handle_error
+from .base_controller import conditional, validate_json, validate_pagination, validate_projection, validate_export, stream_export, validate_bulk, bulk_response, handle_not_found, handle_ranked_cursor, handle_success, handle_error
 
 owner_bp = Blueprint('owner', __name__)
 
@@ -21,8 +21,9 @@ class OwnerUpdateSchema(Schema):
     telephone = fields.Str(validate=validate.Length(min=1, max=20))
 
 @owner_bp.route('', methods=['GET'])
-@validate_pagination()
-def get_owners(page, per_page):
+@validate_pagination(OwnerService)
+@validate_projection(OwnerService.model)
+def get_owners(page, per_page, projection, cursor):
     """
     Get all owners with pagination
     ---
@@ -39,10 +40,22 @@ def get_owners(page, per_page):
         type: integer
         default: 20
         description: Items per page (max 100)
+      - name: cursor
+        in: query
+        type: string
+        description: Opaque cursor for keyset pagination (send it empty for the first page, then use next_cursor; not available with search)
       - name: search
         in: query
         type: string
         description: Search term for name, address, city, or telephone
+      - name: fields
+        in: query
+        type: string
+        description: Comma separated attributes to return (dotted paths reach expanded relationships)
+      - name: expand
+        in: query
+        type: string
+        description: Comma separated relationships to embed (e.g. pets,pets.visits)
     responses:
       200:
         description: List of owners
@@ -51,16 +64,53 @@ def get_owners(page, per_page):
         search_term = request.args.get('search')
         
         if search_term:
-            result = OwnerService.search_owners(search_term, page, per_page)
+            if cursor is not None:
+                return handle_ranked_cursor()
+            result = OwnerService.search_owners(search_term, page, per_page, cursor=cursor, **projection)
         else:
-            result = OwnerService.get_all(page, per_page)
+            result = OwnerService.get_all(page, per_page, cursor=cursor, **projection)
         
         return handle_success(result)
     except Exception as e:
         return handle_error(str(e))
 
+@owner_bp.route('/export', methods=['GET'])
+@validate_export
+def export_owners(export_format, fields):
+    """
+    Export owners as a streamed NDJSON or CSV download
+    ---
+    tags:
+      - Owners
+    parameters:
+      - name: search
+        in: query
+        type: string
+        description: Search term for name, address, city, or telephone
+      - name: format
+        in: query
+        type: string
+        enum: [ndjson, csv]
+        default: ndjson
+        description: Output format
+      - name: fields
+        in: query
+        type: string
+        description: Comma separated columns to export (default all)
+    responses:
+      200:
+        description: One owner per line (NDJSON) or per CSV row
+    """
+    try:
+        query = OwnerService.filtered_query({'search': request.args.get('search')})
+        return stream_export(OwnerService.stream(query, fields), export_format, 'owners')
+    except Exception as e:
+        return handle_error(str(e))
+
 @owner_bp.route('/<int:owner_id>', methods=['GET'])
-def get_owner(owner_id):
+@validate_projection(OwnerService.model, OwnerService.detail_expand)
+@conditional(OwnerService, 'owner_id')
+def get_owner(owner_id, projection):
     """
     Get owner by ID
     ---
@@ -72,18 +122,28 @@ def get_owner(owner_id):
         type: integer
         required: true
         description: Owner ID
+      - name: fields
+        in: query
+        type: string
+        description: Comma separated attributes to return (dotted paths reach expanded relationships)
+      - name: expand
+        in: query
+        type: string
+        description: Comma separated relationships to embed (e.g. pets,pets.visits)
     responses:
       200:
         description: Owner details
+      304:
+        description: Unchanged since the ETag or date the client sent
       404:
         description: Owner not found
     """
     try:
-        owner = OwnerService.get_by_id(owner_id)
+        owner = OwnerService.get_by_id(owner_id, projection['expand'])
         if not owner:
             return handle_not_found('Owner')
         
-        return handle_success(owner.to_dict())
+        return handle_success(owner.to_dict(**projection))
     except Exception as e:
         return handle_error(str(e))
 
@@ -135,6 +195,56 @@ def create_owner(data):
     except Exception as e:
         return handle_error(str(e))
 
+@owner_bp.route('/bulk', methods=['POST'])
+@validate_bulk(OwnerSchema)
+def bulk_create_owners(items, errors):
+    """
+    Create many owners in one request and one transaction
+    ---
+    tags:
+      - Owners
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: array
+          items:
+            type: object
+          description: Owner objects as accepted by POST /api/owners
+    responses:
+      201:
+        description: Every owner was created
+        schema:
+          type: object
+          properties:
+            data:
+              type: object
+              properties:
+                created:
+                  type: integer
+                ids:
+                  type: array
+                  items:
+                    type: integer
+                  x-nullable: true
+                  description: Ids of the new owners in array order; null on MySQL, which returns no ids from a multi-row insert
+                errors:
+                  type: object
+                  description: Errors of the rejected owners by array index
+            message:
+              type: string
+      207:
+        description: Some owners were created, the others are listed in errors by array index (same body as 201)
+      400:
+        description: No owner could be created
+    """
+    try:
+        result = OwnerService.bulk_create(items)
+        return bulk_response(result, errors)
+    except Exception as e:
+        return handle_error(str(e))
+
 @owner_bp.route('/<int:owner_id>', methods=['PUT'])
 @validate_json(OwnerUpdateSchema)
 def update_owner(data, owner_id):
@@ -213,7 +323,9 @@ def delete_owner(owner_id):
         return handle_error(str(e))
 
 @owner_bp.route('/search/lastname/<string:last_name>', methods=['GET'])
-def find_owners_by_lastname(last_name):
+@validate_pagination(OwnerService)
+@validate_projection(OwnerService.model)
+def find_owners_by_lastname(page, per_page, last_name, projection, cursor):
     """
     Find owners by last name
     ---
@@ -224,13 +336,35 @@ def find_owners_by_lastname(last_name):
         in: path
         type: string
         required: true
-        description: Last name to search for
+        description: Beginning of the last name (case-insensitive)
+      - name: page
+        in: query
+        type: integer
+        default: 1
+        description: Page number
+      - name: per_page
+        in: query
+        type: integer
+        default: 20
+        description: Items per page (max 100)
+      - name: cursor
+        in: query
+        type: string
+        description: Opaque cursor for keyset pagination (send it empty for the first page, then use next_cursor)
+      - name: fields
+        in: query
+        type: string
+        description: Comma separated attributes to return (dotted paths reach expanded relationships)
+      - name: expand
+        in: query
+        type: string
+        description: Comma separated relationships to embed (e.g. pets,pets.visits)
     responses:
       200:
         description: List of owners with matching last name
     """
     try:
-        owners = OwnerService.find_by_last_name(last_name)
-        return handle_success([owner.to_dict() for owner in owners])
+        result = OwnerService.find_by_last_name(last_name, page, per_page, cursor=cursor, **projection)
+        return handle_success(result)
     except Exception as e:
         return handle_error(str(e))
\ No newline at end of file
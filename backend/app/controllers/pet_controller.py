@@ -5,55 +5,34 @@ from datetime import date, datetime
 from app.services.pet_service import PetService
 from app.services.owner_service import OwnerService
 from app.services.pettype_service import PetTypeService
-from .base_controller import validate_json, validate_pagination, handle_not_found, handle_success, handle_error
+from .base_controller import Exists, conditional, validate_json, validate_pagination, validate_projection, validate_export, stream_export, validate_bulk, bulk_response, handle_not_found, handle_success, handle_error
 
 pet_bp = Blueprint('pet', __name__)
 
 class PetSchema(Schema):
     name = fields.Str(required=True, validate=validate.Length(min=1, max=30))
     birth_date = fields.Date(required=True)
-    owner_id = fields.Int(required=True)
-    type_id = fields.Int(required=True)
+    owner_id = fields.Int(required=True, validate=Exists(OwnerService))
+    type_id = fields.Int(required=True, validate=Exists(PetTypeService))
     
     def validate_birth_date(self, value):
         if value > date.today():
             raise ValidationError('Birth date cannot be in the future')
-    
-    def validate_owner_id(self, value):
-        owner = OwnerService.get_by_id(value)
-        if not owner:
-            raise ValidationError('Owner not found')
-    
-    def validate_type_id(self, value):
-        pet_type = PetTypeService.get_by_id(value)
-        if not pet_type:
-            raise ValidationError('Pet type not found')
 
 class PetUpdateSchema(Schema):
     name = fields.Str(validate=validate.Length(min=1, max=30))
     birth_date = fields.Date()
-    owner_id = fields.Int()
-    type_id = fields.Int()
+    owner_id = fields.Int(validate=Exists(OwnerService))
+    type_id = fields.Int(validate=Exists(PetTypeService))
     
     def validate_birth_date(self, value):
         if value and value > date.today():
             raise ValidationError('Birth date cannot be in the future')
-    
-    def validate_owner_id(self, value):
-        if value:
-            owner = OwnerService.get_by_id(value)
-            if not owner:
-                raise ValidationError('Owner not found')
-    
-    def validate_type_id(self, value):
-        if value:
-            pet_type = PetTypeService.get_by_id(value)
-            if not pet_type:
-                raise ValidationError('Pet type not found')
 
 @pet_bp.route('', methods=['GET'])
-@validate_pagination()
-def get_pets(page, per_page):
+@validate_pagination(PetService)
+@validate_projection(PetService.model)
+def get_pets(page, per_page, projection, cursor):
     """
     Get all pets with pagination
     ---
@@ -70,6 +49,10 @@ def get_pets(page, per_page):
         type: integer
         default: 20
         description: Items per page (max 100)
+      - name: cursor
+        in: query
+        type: string
+        description: Opaque cursor for keyset pagination (send it empty for the first page, then use next_cursor)
       - name: owner_id
         in: query
         type: integer
@@ -82,6 +65,14 @@ def get_pets(page, per_page):
         in: query
         type: string
         description: Search by pet name
+      - name: fields
+        in: query
+        type: string
+        description: Comma separated attributes to return (dotted paths reach expanded relationships)
+      - name: expand
+        in: query
+        type: string
+        description: Comma separated relationships to embed (owner, type, visits)
     responses:
       200:
         description: List of pets
@@ -100,16 +91,64 @@ def get_pets(page, per_page):
             filters['name'] = name
         
         if filters:
-            result = PetService.search(filters, page, per_page)
+            result = PetService.search(filters, page, per_page, cursor=cursor, **projection)
         else:
-            result = PetService.get_all(page, per_page)
+            result = PetService.get_all(page, per_page, cursor=cursor, **projection)
         
         return handle_success(result)
     except Exception as e:
         return handle_error(str(e))
 
+@pet_bp.route('/export', methods=['GET'])
+@validate_export
+def export_pets(export_format, fields):
+    """
+    Export pets as a streamed NDJSON or CSV download
+    ---
+    tags:
+      - Pets
+    parameters:
+      - name: owner_id
+        in: query
+        type: integer
+        description: Filter by owner ID
+      - name: type_id
+        in: query
+        type: integer
+        description: Filter by pet type ID
+      - name: name
+        in: query
+        type: string
+        description: Search by pet name
+      - name: format
+        in: query
+        type: string
+        enum: [ndjson, csv]
+        default: ndjson
+        description: Output format
+      - name: fields
+        in: query
+        type: string
+        description: Comma separated columns to export (default all)
+    responses:
+      200:
+        description: One pet per line (NDJSON) or per CSV row
+    """
+    try:
+        filters = {
+            'owner_id': request.args.get('owner_id', type=int),
+            'type_id': request.args.get('type_id', type=int),
+            'name': request.args.get('name') or None
+        }
+        query = PetService.filtered_query(filters)
+        return stream_export(PetService.stream(query, fields), export_format, 'pets')
+    except Exception as e:
+        return handle_error(str(e))
+
 @pet_bp.route('/<int:pet_id>', methods=['GET'])
-def get_pet(pet_id):
+@validate_projection(PetService.model, PetService.detail_expand)
+@conditional(PetService, 'pet_id')
+def get_pet(pet_id, projection):
     """
     Get pet by ID
     ---
@@ -121,18 +160,28 @@ def get_pet(pet_id):
         type: integer
         required: true
         description: Pet ID
+      - name: fields
+        in: query
+        type: string
+        description: Comma separated attributes to return (dotted paths reach expanded relationships)
+      - name: expand
+        in: query
+        type: string
+        description: Comma separated relationships to embed (owner, type, visits)
     responses:
       200:
         description: Pet details
+      304:
+        description: Unchanged since the ETag or date the client sent
       404:
         description: Pet not found
     """
     try:
-        pet = PetService.get_pet_with_visits(pet_id)
+        pet = PetService.get_by_id(pet_id, projection['expand'])
         if not pet:
             return handle_not_found('Pet')
         
-        return handle_success(pet.to_dict())
+        return handle_success(pet.to_dict(**projection))
     except Exception as e:
         return handle_error(str(e))
 
@@ -178,6 +227,56 @@ def create_pet(data):
     except Exception as e:
         return handle_error(str(e))
 
+@pet_bp.route('/bulk', methods=['POST'])
+@validate_bulk(PetSchema)
+def bulk_create_pets(items, errors):
+    """
+    Create many pets in one request and one transaction
+    ---
+    tags:
+      - Pets
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: array
+          items:
+            type: object
+          description: Pet objects as accepted by POST /api/pets; owner_id and type_id are checked in one query per table
+    responses:
+      201:
+        description: Every pet was created
+        schema:
+          type: object
+          properties:
+            data:
+              type: object
+              properties:
+                created:
+                  type: integer
+                ids:
+                  type: array
+                  items:
+                    type: integer
+                  x-nullable: true
+                  description: Ids of the new pets in array order; null on MySQL, which returns no ids from a multi-row insert
+                errors:
+                  type: object
+                  description: Errors of the rejected pets by array index
+            message:
+              type: string
+      207:
+        description: Some pets were created, the others are listed in errors by array index (same body as 201)
+      400:
+        description: No pet could be created
+    """
+    try:
+        result = PetService.bulk_create(items)
+        return bulk_response(result, errors)
+    except Exception as e:
+        return handle_error(str(e))
+
 @pet_bp.route('/<int:pet_id>', methods=['PUT'])
 @validate_json(PetUpdateSchema)
 def update_pet(data, pet_id):
@@ -251,7 +350,9 @@ def delete_pet(pet_id):
         return handle_error(str(e))
 
 @pet_bp.route('/owner/<int:owner_id>', methods=['GET'])
-def get_pets_by_owner(owner_id):
+@validate_pagination(PetService)
+@validate_projection(PetService.model)
+def get_pets_by_owner(page, per_page, owner_id, projection, cursor):
     """
     Get all pets by owner ID
     ---
@@ -263,6 +364,28 @@ def get_pets_by_owner(owner_id):
         type: integer
         required: true
         description: Owner ID
+      - name: page
+        in: query
+        type: integer
+        default: 1
+        description: Page number
+      - name: per_page
+        in: query
+        type: integer
+        default: 20
+        description: Items per page (max 100)
+      - name: cursor
+        in: query
+        type: string
+        description: Opaque cursor for keyset pagination (send it empty for the first page, then use next_cursor)
+      - name: fields
+        in: query
+        type: string
+        description: Comma separated attributes to return (dotted paths reach expanded relationships)
+      - name: expand
+        in: query
+        type: string
+        description: Comma separated relationships to embed (owner, type, visits)
     responses:
       200:
         description: List of pets for the owner
@@ -275,7 +398,7 @@ def get_pets_by_owner(owner_id):
         if not owner:
             return handle_not_found('Owner')
         
-        pets = PetService.get_pets_by_owner(owner_id)
-        return handle_success([pet.to_dict() for pet in pets])
+        result = PetService.get_pets_by_owner(owner_id, page, per_page, cursor=cursor, **projection)
+        return handle_success(result)
     except Exception as e:
         return handle_error(str(e))
\ No newline at end of file
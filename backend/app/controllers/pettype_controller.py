@@ -2,7 +2,7 @@ from flask import Blueprint, request, jsonify
 from flasgger import swag_from
 from marshmallow import Schema, fields, validate, ValidationError
 from app.services.pettype_service import PetTypeService
-from .base_controller import validate_json, validate_pagination, handle_not_found, handle_success, handle_error
+from .base_controller import validate_json, validate_pagination, validate_projection, handle_not_found, handle_success, handle_error
 
 pettype_bp = Blueprint('pettype', __name__)
 
@@ -13,8 +13,9 @@ class PetTypeUpdateSchema(Schema):
     name = fields.Str(validate=validate.Length(min=1, max=80))
 
 @pettype_bp.route('', methods=['GET'])
-@validate_pagination()
-def get_pet_types(page, per_page):
+@validate_pagination(PetTypeService)
+@validate_projection(PetTypeService.model)
+def get_pet_types(page, per_page, projection, cursor):
     """
     Get all pet types with pagination
     ---
@@ -31,10 +32,18 @@ def get_pet_types(page, per_page):
         type: integer
         default: 20
         description: Items per page (max 100)
+      - name: cursor
+        in: query
+        type: string
+        description: Opaque cursor for keyset pagination (send it empty for the first page, then use next_cursor)
       - name: search
         in: query
         type: string
         description: Search term for pet type name
+      - name: fields
+        in: query
+        type: string
+        description: Comma separated attributes to return
     responses:
       200:
         description: List of pet types
@@ -44,15 +53,16 @@ def get_pet_types(page, per_page):
         
         if search_term:
             pet_types = PetTypeService.search_by_name(search_term)
-            return handle_success([pet_type.to_dict() for pet_type in pet_types])
+            return handle_success([pet_type.to_dict(**projection) for pet_type in pet_types])
         
-        result = PetTypeService.get_all(page, per_page)
+        result = PetTypeService.get_all(page, per_page, cursor=cursor, **projection)
         return handle_success(result)
     except Exception as e:
         return handle_error(str(e))
 
 @pettype_bp.route('/<int:pet_type_id>', methods=['GET'])
-def get_pet_type(pet_type_id):
+@validate_projection(PetTypeService.model)
+def get_pet_type(pet_type_id, projection):
     """
     Get pet type by ID
     ---
@@ -75,7 +85,7 @@ def get_pet_type(pet_type_id):
         if not pet_type:
             return handle_not_found('Pet Type')
         
-        return handle_success(pet_type.to_dict())
+        return handle_success(pet_type.to_dict(**projection))
     except Exception as e:
         return handle_error(str(e))
 
@@ -195,7 +205,7 @@ def delete_pet_type(pet_type_id):
         if not pet_type:
             return handle_not_found('Pet Type')
         
-        if pet_type.pets:
+        if PetTypeService.has_pets(pet_type_id):
             return jsonify({
                 'error': 'Cannot delete pet type',
                 'message': 'Pet type has associated pets and cannot be deleted'
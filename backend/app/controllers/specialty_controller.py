@@ -2,7 +2,7 @@ from flask import Blueprint, request, jsonify
 from flasgger import swag_from
 from marshmallow import Schema, fields, validate, ValidationError
 from app.services.specialty_service import SpecialtyService
-from .base_controller import validate_json, validate_pagination, handle_not_found, handle_success, handle_error
+from .base_controller import validate_json, validate_pagination, validate_projection, handle_not_found, handle_success, handle_error
 
 specialty_bp = Blueprint('specialty', __name__)
 
@@ -13,8 +13,9 @@ class SpecialtyUpdateSchema(Schema):
     name = fields.Str(validate=validate.Length(min=1, max=80))
 
 @specialty_bp.route('', methods=['GET'])
-@validate_pagination()
-def get_specialties(page, per_page):
+@validate_pagination(SpecialtyService)
+@validate_projection(SpecialtyService.model)
+def get_specialties(page, per_page, projection, cursor):
     """
     Get all specialties with pagination
     ---
@@ -31,10 +32,18 @@ def get_specialties(page, per_page):
         type: integer
         default: 20
         description: Items per page (max 100)
+      - name: cursor
+        in: query
+        type: string
+        description: Opaque cursor for keyset pagination (send it empty for the first page, then use next_cursor)
       - name: search
         in: query
         type: string
         description: Search term for specialty name
+      - name: fields
+        in: query
+        type: string
+        description: Comma separated attributes to return
     responses:
       200:
         description: List of specialties
@@ -44,15 +53,16 @@ def get_specialties(page, per_page):
         
         if search_term:
             specialties = SpecialtyService.search_by_name(search_term)
-            return handle_success([specialty.to_dict() for specialty in specialties])
+            return handle_success([specialty.to_dict(**projection) for specialty in specialties])
         
-        result = SpecialtyService.get_all(page, per_page)
+        result = SpecialtyService.get_all(page, per_page, cursor=cursor, **projection)
         return handle_success(result)
     except Exception as e:
         return handle_error(str(e))
 
 @specialty_bp.route('/<int:specialty_id>', methods=['GET'])
-def get_specialty(specialty_id):
+@validate_projection(SpecialtyService.model)
+def get_specialty(specialty_id, projection):
     """
     Get specialty by ID
     ---
@@ -75,7 +85,7 @@ def get_specialty(specialty_id):
         if not specialty:
             return handle_not_found('Specialty')
         
-        return handle_success(specialty.to_dict())
+        return handle_success(specialty.to_dict(**projection))
     except Exception as e:
         return handle_error(str(e))
 
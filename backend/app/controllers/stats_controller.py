@@ -0,0 +1,213 @@
+from datetime import date, datetime, timedelta
+from flask import Blueprint, request, jsonify
+from app.services.stats_service import StatsService
+from app.services.visit_stats_service import VisitStatsService
+from .base_controller import handle_success, handle_error
+
+stats_bp = Blueprint('stats', __name__)
+
+def _date_range(default_days):
+    """``start_date``/``end_date`` query arguments, the last ``default_days`` days when absent"""
+    end = request.args.get('end_date')
+    end = datetime.strptime(end, '%Y-%m-%d').date() if end else date.today()
+    start = request.args.get('start_date')
+    start = datetime.strptime(start, '%Y-%m-%d').date() if start else end - timedelta(days=default_days - 1)
+    if start > end:
+        raise ValueError('start_date is after end_date')
+    return start, end
+
+@stats_bp.route('', methods=['GET'])
+def get_stats():
+    """
+    Get the dashboard statistics in one request
+    ---
+    tags:
+      - Stats
+    responses:
+      200:
+        description: Entity totals, visits today/this week/this month and pets per type
+        schema:
+          type: object
+          properties:
+            owners:
+              type: integer
+            pets:
+              type: integer
+            visits:
+              type: integer
+            vets:
+              type: integer
+            specialties:
+              type: integer
+            pet_types:
+              type: integer
+            visits_today:
+              type: integer
+            visits_this_week:
+              type: integer
+            visits_this_month:
+              type: integer
+            pets_per_type:
+              type: array
+              items:
+                type: object
+                properties:
+                  type_id:
+                    type: integer
+                  name:
+                    type: string
+                  pets:
+                    type: integer
+    """
+    try:
+        return handle_success(StatsService.get_stats())
+    except Exception as e:
+        return handle_error(str(e))
+
+@stats_bp.route('/visits/daily', methods=['GET'])
+def get_daily_visits():
+    """
+    Visits per day, read from the rollup tables
+    ---
+    tags:
+      - Stats
+    parameters:
+      - name: start_date
+        in: query
+        type: string
+        format: date
+        description: Defaults to 29 days before end_date
+      - name: end_date
+        in: query
+        type: string
+        format: date
+        description: Defaults to today
+      - name: pet_type_id
+        in: query
+        type: integer
+      - name: city
+        in: query
+        type: string
+    responses:
+      200:
+        description: Days with visits in the range, oldest first
+      400:
+        description: Invalid date range
+    """
+    try:
+        try:
+            start, end = _date_range(30)
+        except ValueError:
+            return jsonify({'error': 'Invalid date range. Use YYYY-MM-DD'}), 400
+        return handle_success(VisitStatsService.daily(
+            start, end, request.args.get('pet_type_id', type=int), request.args.get('city')
+        ))
+    except Exception as e:
+        return handle_error(str(e))
+
+@stats_bp.route('/visits/by-type', methods=['GET'])
+def get_visits_by_pet_type():
+    """
+    Visits per pet type, read from the rollup tables
+    ---
+    tags:
+      - Stats
+    parameters:
+      - name: start_date
+        in: query
+        type: string
+        format: date
+        description: Defaults to 364 days before end_date
+      - name: end_date
+        in: query
+        type: string
+        format: date
+        description: Defaults to today
+      - name: city
+        in: query
+        type: string
+    responses:
+      200:
+        description: Pet types with visits in the range, busiest first
+      400:
+        description: Invalid date range
+    """
+    try:
+        try:
+            start, end = _date_range(365)
+        except ValueError:
+            return jsonify({'error': 'Invalid date range. Use YYYY-MM-DD'}), 400
+        return handle_success(VisitStatsService.by_pet_type(start, end, request.args.get('city')))
+    except Exception as e:
+        return handle_error(str(e))
+
+@stats_bp.route('/visits/by-city', methods=['GET'])
+def get_visits_by_city():
+    """
+    Visits per owner city, read from the rollup tables
+    ---
+    tags:
+      - Stats
+    parameters:
+      - name: start_date
+        in: query
+        type: string
+        format: date
+        description: Defaults to 364 days before end_date
+      - name: end_date
+        in: query
+        type: string
+        format: date
+        description: Defaults to today
+      - name: pet_type_id
+        in: query
+        type: integer
+      - name: limit
+        in: query
+        type: integer
+        default: 20
+    responses:
+      200:
+        description: Cities with visits in the range, busiest first
+      400:
+        description: Invalid date range
+    """
+    try:
+        try:
+            start, end = _date_range(365)
+        except ValueError:
+            return jsonify({'error': 'Invalid date range. Use YYYY-MM-DD'}), 400
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 1000)
+        return handle_success(VisitStatsService.by_city(start, end, request.args.get('pet_type_id', type=int), limit))
+    except Exception as e:
+        return handle_error(str(e))
+
+@stats_bp.route('/visits/yearly', methods=['GET'])
+def get_visits_year_over_year():
+    """
+    Visits per month of the last years, for year-over-year charts
+    ---
+    tags:
+      - Stats
+    parameters:
+      - name: years
+        in: query
+        type: integer
+        default: 3
+      - name: pet_type_id
+        in: query
+        type: integer
+      - name: city
+        in: query
+        type: string
+    responses:
+      200:
+        description: One entry per year with its twelve monthly counts and total
+    """
+    try:
+        years = min(max(request.args.get('years', 3, type=int), 1), 20)
+        return handle_success(VisitStatsService.year_over_year(
+            years, request.args.get('pet_type_id', type=int), request.args.get('city')
+        ))
+    except Exception as e:
+        return handle_error(str(e))
\ No newline at end of file
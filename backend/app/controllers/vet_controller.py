@@ -3,7 +3,7 @@ from flasgger import swag_from
 from marshmallow import Schema, fields, validate, ValidationError
 from app.services.vet_service import VetService
 from app.services.specialty_service import SpecialtyService
-from .base_controller import validate_json, validate_pagination, handle_not_found, handle_success, handle_error
+from .base_controller import Exists, conditional, validate_json, validate_pagination, validate_projection, handle_not_found, handle_success, handle_error
 
 vet_bp = Blueprint('vet', __name__)
 
@@ -16,16 +16,12 @@ class VetUpdateSchema(Schema):
     last_name = fields.Str(validate=validate.Length(min=1, max=30))
 
 class VetSpecialtySchema(Schema):
-    specialty_id = fields.Int(required=True)
-    
-    def validate_specialty_id(self, value):
-        specialty = SpecialtyService.get_by_id(value)
-        if not specialty:
-            raise ValidationError('Specialty not found')
+    specialty_id = fields.Int(required=True, validate=Exists(SpecialtyService))
 
 @vet_bp.route('', methods=['GET'])
-@validate_pagination()
-def get_vets(page, per_page):
+@validate_pagination(VetService)
+@validate_projection(VetService.model)
+def get_vets(page, per_page, projection, cursor):
     """
     Get all vets with pagination
     ---
@@ -42,6 +38,10 @@ def get_vets(page, per_page):
         type: integer
         default: 20
         description: Items per page (max 100)
+      - name: cursor
+        in: query
+        type: string
+        description: Opaque cursor for keyset pagination (send it empty for the first page, then use next_cursor)
       - name: search
         in: query
         type: string
@@ -50,6 +50,14 @@ def get_vets(page, per_page):
         in: query
         type: string
         description: Filter by specialty name
+      - name: fields
+        in: query
+        type: string
+        description: Comma separated attributes to return (dotted paths reach expanded relationships)
+      - name: expand
+        in: query
+        type: string
+        description: Comma separated relationships to embed (specialties)
     responses:
       200:
         description: List of vets
@@ -59,20 +67,22 @@ def get_vets(page, per_page):
         specialty = request.args.get('specialty')
         
         if search_term:
-            vets = VetService.find_vets_by_name(search_term)
-            return handle_success([vet.to_dict() for vet in vets])
+            result = VetService.find_vets_by_name(search_term, page, per_page, cursor=cursor, **projection)
+            return handle_success(result)
         
         if specialty:
-            vets = VetService.find_vets_by_specialty(specialty)
-            return handle_success([vet.to_dict() for vet in vets])
+            result = VetService.find_vets_by_specialty(specialty, page, per_page, cursor=cursor, **projection)
+            return handle_success(result)
         
-        result = VetService.get_all(page, per_page)
+        result = VetService.get_all(page, per_page, cursor=cursor, **projection)
         return handle_success(result)
     except Exception as e:
         return handle_error(str(e))
 
 @vet_bp.route('/<int:vet_id>', methods=['GET'])
-def get_vet(vet_id):
+@validate_projection(VetService.model, VetService.detail_expand)
+@conditional(VetService, 'vet_id')
+def get_vet(vet_id, projection):
     """
     Get vet by ID with specialties
     ---
@@ -84,18 +94,28 @@ def get_vet(vet_id):
         type: integer
         required: true
         description: Vet ID
+      - name: fields
+        in: query
+        type: string
+        description: Comma separated attributes to return (dotted paths reach expanded relationships)
+      - name: expand
+        in: query
+        type: string
+        description: Comma separated relationships to embed (specialties)
     responses:
       200:
         description: Vet details with specialties
+      304:
+        description: Unchanged since the ETag or date the client sent
       404:
         description: Vet not found
     """
     try:
-        vet = VetService.get_vet_with_specialties(vet_id)
+        vet = VetService.get_by_id(vet_id, projection['expand'])
         if not vet:
             return handle_not_found('Vet')
         
-        return handle_success(vet.to_dict())
+        return handle_success(vet.to_dict(**projection))
     except Exception as e:
         return handle_error(str(e))
 
@@ -238,7 +258,7 @@ def add_specialty_to_vet(data, vet_id):
         if not vet:
             return handle_not_found('Vet or Specialty')
         
-        return handle_success(vet.to_dict(), 'Specialty added to vet successfully')
+        return handle_success(vet.to_dict(expand='specialties'), 'Specialty added to vet successfully')
     except Exception as e:
         return handle_error(str(e))
 
@@ -271,6 +291,6 @@ def remove_specialty_from_vet(vet_id, specialty_id):
         if not vet:
             return handle_not_found('Vet or Specialty')
         
-        return handle_success(vet.to_dict(), 'Specialty removed from vet successfully')
+        return handle_success(vet.to_dict(expand='specialties'), 'Specialty removed from vet successfully')
     except Exception as e:
         return handle_error(str(e))
\ No newline at end of file
@@ -4,42 +4,32 @@ from marshmallow import Schema, fields, validate, ValidationError
 from datetime import date, datetime
 from app.services.visit_service import VisitService
 from app.services.pet_service import PetService
-from .base_controller import validate_json, validate_pagination, handle_not_found, handle_success, handle_error
+from .base_controller import Exists, conditional, validate_json, validate_pagination, validate_projection, validate_export, stream_export, validate_bulk, bulk_response, handle_not_found, handle_ranked_cursor, handle_success, handle_error
 
 visit_bp = Blueprint('visit', __name__)
 
 class VisitSchema(Schema):
     visit_date = fields.Date(required=True)
     description = fields.Str(required=True, validate=validate.Length(min=1, max=1000))
-    pet_id = fields.Int(required=True)
+    pet_id = fields.Int(required=True, validate=Exists(PetService))
     
     def validate_visit_date(self, value):
         if value > date.today():
             raise ValidationError('Visit date cannot be in the future')
-    
-    def validate_pet_id(self, value):
-        pet = PetService.get_by_id(value)
-        if not pet:
-            raise ValidationError('Pet not found')
 
 class VisitUpdateSchema(Schema):
     visit_date = fields.Date()
     description = fields.Str(validate=validate.Length(min=1, max=1000))
-    pet_id = fields.Int()
+    pet_id = fields.Int(validate=Exists(PetService))
     
     def validate_visit_date(self, value):
         if value and value > date.today():
             raise ValidationError('Visit date cannot be in the future')
-    
-    def validate_pet_id(self, value):
-        if value:
-            pet = PetService.get_by_id(value)
-            if not pet:
-                raise ValidationError('Pet not found')
 
 @visit_bp.route('', methods=['GET'])
-@validate_pagination()
-def get_visits(page, per_page):
+@validate_pagination(VisitService)
+@validate_projection(VisitService.model)
+def get_visits(page, per_page, projection, cursor):
     """
     Get all visits with pagination
     ---
@@ -56,6 +46,10 @@ def get_visits(page, per_page):
         type: integer
         default: 20
         description: Items per page (max 100)
+      - name: cursor
+        in: query
+        type: string
+        description: Opaque cursor for keyset pagination (send it empty for the first page, then use next_cursor; not available with description)
       - name: pet_id
         in: query
         type: integer
@@ -73,7 +67,15 @@ def get_visits(page, per_page):
       - name: description
         in: query
         type: string
-        description: Search in visit description
+        description: 'Full-text search in visit description, ranked by relevance ("quoted phrase", prefix*)'
+      - name: fields
+        in: query
+        type: string
+        description: Comma separated attributes to return (dotted paths reach expanded relationships)
+      - name: expand
+        in: query
+        type: string
+        description: Comma separated relationships to embed (e.g. pet,pet.owner)
     responses:
       200:
         description: List of visits
@@ -85,29 +87,93 @@ def get_visits(page, per_page):
         description = request.args.get('description')
         
         if pet_id:
-            visits = VisitService.get_visits_by_pet(pet_id)
-            return handle_success([visit.to_dict() for visit in visits])
+            result = VisitService.get_visits_by_pet(pet_id, page, per_page, cursor=cursor, **projection)
+            return handle_success(result)
         
         if start_date and end_date:
             try:
                 start = datetime.strptime(start_date, '%Y-%m-%d').date()
                 end = datetime.strptime(end_date, '%Y-%m-%d').date()
-                visits = VisitService.get_visits_by_date_range(start, end)
-                return handle_success([visit.to_dict() for visit in visits])
             except ValueError:
                 return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+            result = VisitService.get_visits_by_date_range(start, end, page, per_page, cursor=cursor, **projection)
+            return handle_success(result)
         
         if description:
-            visits = VisitService.search_visits_by_description(description)
-            return handle_success([visit.to_dict() for visit in visits])
+            if cursor is not None:
+                return handle_ranked_cursor()
+            result = VisitService.search_visits_by_description(description, page, per_page, cursor=cursor, **projection)
+            return handle_success(result)
         
-        result = VisitService.get_all(page, per_page)
+        result = VisitService.get_all(page, per_page, cursor=cursor, **projection)
         return handle_success(result)
     except Exception as e:
         return handle_error(str(e))
 
+@visit_bp.route('/export', methods=['GET'])
+@validate_export
+def export_visits(export_format, fields):
+    """
+    Export visits as a streamed NDJSON or CSV download
+    ---
+    tags:
+      - Visits
+    parameters:
+      - name: pet_id
+        in: query
+        type: integer
+        description: Filter by pet ID
+      - name: start_date
+        in: query
+        type: string
+        format: date
+        description: Start date for date range filter
+      - name: end_date
+        in: query
+        type: string
+        format: date
+        description: End date for date range filter
+      - name: description
+        in: query
+        type: string
+        description: Full-text search in visit description
+      - name: format
+        in: query
+        type: string
+        enum: [ndjson, csv]
+        default: ndjson
+        description: Output format
+      - name: fields
+        in: query
+        type: string
+        description: Comma separated columns to export (default all)
+    responses:
+      200:
+        description: One visit per line (NDJSON) or per CSV row
+    """
+    try:
+        filters = {
+            'pet_id': request.args.get('pet_id', type=int),
+            'description': request.args.get('description')
+        }
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        if start_date and end_date:
+            try:
+                filters['start_date'] = datetime.strptime(start_date, '%Y-%m-%d').date()
+                filters['end_date'] = datetime.strptime(end_date, '%Y-%m-%d').date()
+            except ValueError:
+                return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+        
+        query = VisitService.filtered_query(filters)
+        return stream_export(VisitService.stream(query, fields), export_format, 'visits')
+    except Exception as e:
+        return handle_error(str(e))
+
 @visit_bp.route('/<int:visit_id>', methods=['GET'])
-def get_visit(visit_id):
+@validate_projection(VisitService.model, VisitService.detail_expand)
+@conditional(VisitService, 'visit_id')
+def get_visit(visit_id, projection):
     """
     Get visit by ID
     ---
@@ -119,18 +185,28 @@ def get_visit(visit_id):
         type: integer
         required: true
         description: Visit ID
+      - name: fields
+        in: query
+        type: string
+        description: Comma separated attributes to return (dotted paths reach expanded relationships)
+      - name: expand
+        in: query
+        type: string
+        description: Comma separated relationships to embed (e.g. pet,pet.owner)
     responses:
       200:
         description: Visit details
+      304:
+        description: Unchanged since the ETag or date the client sent
       404:
         description: Visit not found
     """
     try:
-        visit = VisitService.get_by_id(visit_id)
+        visit = VisitService.get_by_id(visit_id, projection['expand'])
         if not visit:
             return handle_not_found('Visit')
         
-        return handle_success(visit.to_dict())
+        return handle_success(visit.to_dict(**projection))
     except Exception as e:
         return handle_error(str(e))
 
@@ -173,6 +249,56 @@ def create_visit(data):
     except Exception as e:
         return handle_error(str(e))
 
+@visit_bp.route('/bulk', methods=['POST'])
+@validate_bulk(VisitSchema)
+def bulk_create_visits(items, errors):
+    """
+    Create many visits in one request and one transaction
+    ---
+    tags:
+      - Visits
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: array
+          items:
+            type: object
+          description: Visit objects as accepted by POST /api/visits; pet_id is checked in one query
+    responses:
+      201:
+        description: Every visit was created
+        schema:
+          type: object
+          properties:
+            data:
+              type: object
+              properties:
+                created:
+                  type: integer
+                ids:
+                  type: array
+                  items:
+                    type: integer
+                  x-nullable: true
+                  description: Ids of the new visits in array order; null on MySQL, which returns no ids from a multi-row insert
+                errors:
+                  type: object
+                  description: Errors of the rejected visits by array index
+            message:
+              type: string
+      207:
+        description: Some visits were created, the others are listed in errors by array index (same body as 201)
+      400:
+        description: No visit could be created
+    """
+    try:
+        result = VisitService.bulk_create(items)
+        return bulk_response(result, errors)
+    except Exception as e:
+        return handle_error(str(e))
+
 @visit_bp.route('/<int:visit_id>', methods=['PUT'])
 @validate_json(VisitUpdateSchema)
 def update_visit(data, visit_id):
@@ -244,7 +370,9 @@ def delete_visit(visit_id):
         return handle_error(str(e))
 
 @visit_bp.route('/pet/<int:pet_id>', methods=['GET'])
-def get_visits_by_pet(pet_id):
+@validate_pagination(VisitService)
+@validate_projection(VisitService.model)
+def get_visits_by_pet(page, per_page, pet_id, projection, cursor):
     """
     Get all visits by pet ID
     ---
@@ -256,6 +384,28 @@ def get_visits_by_pet(pet_id):
         type: integer
         required: true
         description: Pet ID
+      - name: page
+        in: query
+        type: integer
+        default: 1
+        description: Page number
+      - name: per_page
+        in: query
+        type: integer
+        default: 20
+        description: Items per page (max 100)
+      - name: cursor
+        in: query
+        type: string
+        description: Opaque cursor for keyset pagination (send it empty for the first page, then use next_cursor)
+      - name: fields
+        in: query
+        type: string
+        description: Comma separated attributes to return (dotted paths reach expanded relationships)
+      - name: expand
+        in: query
+        type: string
+        description: Comma separated relationships to embed (e.g. pet,pet.owner)
     responses:
       200:
         description: List of visits for the pet
@@ -268,13 +418,15 @@ def get_visits_by_pet(pet_id):
         if not pet:
             return handle_not_found('Pet')
         
-        visits = VisitService.get_visits_by_pet(pet_id)
-        return handle_success([visit.to_dict() for visit in visits])
+        result = VisitService.get_visits_by_pet(pet_id, page, per_page, cursor=cursor, **projection)
+        return handle_success(result)
     except Exception as e:
         return handle_error(str(e))
 
 @visit_bp.route('/recent', methods=['GET'])
-def get_recent_visits():
+@validate_pagination(VisitService)
+@validate_projection(VisitService.model)
+def get_recent_visits(page, per_page, projection, cursor):
     """
     Get recent visits (last 30 days)
     ---
@@ -286,6 +438,28 @@ def get_recent_visits():
         type: integer
         default: 30
         description: Number of days to look back
+      - name: page
+        in: query
+        type: integer
+        default: 1
+        description: Page number
+      - name: per_page
+        in: query
+        type: integer
+        default: 20
+        description: Items per page (max 100)
+      - name: cursor
+        in: query
+        type: string
+        description: Opaque cursor for keyset pagination (send it empty for the first page, then use next_cursor)
+      - name: fields
+        in: query
+        type: string
+        description: Comma separated attributes to return (dotted paths reach expanded relationships)
+      - name: expand
+        in: query
+        type: string
+        description: Comma separated relationships to embed (e.g. pet,pet.owner)
     responses:
       200:
         description: List of recent visits
@@ -295,7 +469,7 @@ def get_recent_visits():
         if days < 1 or days > 365:
             return jsonify({'error': 'Days must be between 1 and 365'}), 400
         
-        visits = VisitService.get_recent_visits(days)
-        return handle_success([visit.to_dict() for visit in visits])
+        result = VisitService.get_recent_visits(days, page, per_page, cursor=cursor, **projection)
+        return handle_success(result)
     except Exception as e:
         return handle_error(str(e))
\ No newline at end of file
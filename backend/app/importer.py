@@ -0,0 +1,302 @@
+import csv
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.owner import Owner
+from app.models.pet import Pet
+from app.models.pettype import PetType
+from app.models.visit import Visit
+from app.services.visit_stats_service import VisitStatsService
+
+# (line, record, row, error) of a source record, no row when it was rejected
+Numbered = Tuple[int, Dict[str, Any], Optional[Dict[str, Any]], Optional[Exception]]
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream the records of a CSV or NDJSON (.ndjson/.jsonl) file one at a time"""
+    with open(path, newline='', encoding='utf-8') as handle:
+        if path.endswith('.csv'):
+            yield from csv.DictReader(handle)
+        else:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+class Checkpoint:
+    """Progress of an import, saved atomically to a JSON file after every batch
+    
+    For each table it records the first id of the load and the batches that
+    are committed, which is all a restart needs: row ``n`` of a file always
+    becomes id ``start_id + n``.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.state: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path) as handle:
+                self.state = json.load(handle)
+    
+    def table(self, name: str, source: str) -> Dict[str, Any]:
+        entry = self.state.get(name)
+        if entry is not None and entry['source'] != source:
+            raise ValueError(f'{self.path} belongs to an import of {entry["source"]} into {name}, not {source}')
+        return entry
+    
+    def start(self, name: str, source: str, start_id: int) -> Dict[str, Any]:
+        with self.lock:
+            self.state[name] = {'source': source, 'start_id': start_id, 'done': []}
+            self._save()
+        return self.state[name]
+    
+    def done(self, name: str, batch: int) -> None:
+        with self.lock:
+            self.state[name]['done'].append(batch)
+            self._save()
+    
+    def _save(self) -> None:
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w') as handle:
+            json.dump(self.state, handle)
+        os.replace(temporary, self.path)
+
+class Importer:
+    """Load owners, pets and visits files with batched Core inserts
+    
+    References between the files use the ``id`` column of the source system
+    (``owner_id`` of a pet, ``pet_id`` of a visit) and are resolved through
+    in-memory key maps, rebuilt from the checkpoint when the referenced file
+    was loaded by an earlier run. When the referenced file is not part of
+    the import the reference is an existing database id. Pet types are given by name
+    (``type``, created when missing) or by database id (``type_id``).
+    
+    Ids are assigned by the importer: the first run of a table reserves
+    ``MAX(id) + 1`` as its start and row ``n`` becomes ``start + n``. That
+    makes every batch idempotent, so after a failure the same command skips
+    the committed batches and a batch that was committed but not yet
+    checkpointed is detected by its ids. Rows that cannot be loaded are
+    written to ``rejects`` with the reason. Visit batches update the visit
+    rollups in their own transaction. Run imports while the API is not
+    creating rows in the same tables.
+    """
+    
+    def __init__(self, engine, checkpoint: Checkpoint, rejects_path: str,
+                 batch_size: int = 5000, workers: int = 1, echo: Callable = print):
+        self.engine = engine
+        self.checkpoint = checkpoint
+        self.batch_size = batch_size
+        # SQLite allows a single writer at a time
+        self.workers = 1 if engine.dialect.name == 'sqlite' else workers
+        self.echo = echo
+        self.rejects_path = rejects_path
+        self.rejects = None
+        self.rejected: Set[Tuple[str, int]] = set()
+        self.key_maps: Dict[str, Dict[str, int]] = {}
+        self.type_ids: Dict[str, int] = {}
+        self.converters = {'owners': self.owner_row, 'pets': self.pet_row, 'visits': self.visit_row}
+    
+    def run(self, owners: Optional[str] = None, pets: Optional[str] = None, visits: Optional[str] = None) -> None:
+        # A resumed import keeps the rejects of the earlier runs, which may
+        # have loaded files this run is not given, and adds the lines missing
+        resuming = bool(self.checkpoint.state) and os.path.exists(self.rejects_path)
+        if resuming:
+            self.rejected = self.recorded_rejects()
+        with open(self.rejects_path, 'a' if resuming else 'w', encoding='utf-8') as self.rejects:
+            for table, path in ((Owner.__table__, owners), (Pet.__table__, pets), (Visit.__table__, visits)):
+                if path:
+                    self.load(table, path, self.converters[table.name])
+    
+    def owner_row(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        return {column: self.field(record, column) for column in ('first_name', 'last_name', 'address', 'city', 'telephone')}
+    
+    def pet_row(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        if record.get('type'):
+            type_id = self.pet_type_id(record['type'])
+        else:
+            type_id = self.resolve('pet_types', record.get('type_id'))
+        return {
+            'name': self.field(record, 'name'),
+            'birth_date': self.parse_date(self.field(record, 'birth_date')),
+            'owner_id': self.resolve('owners', record.get('owner_id')),
+            'type_id': type_id
+        }
+    
+    def visit_row(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'visit_date': self.parse_date(self.field(record, 'visit_date')),
+            'description': self.field(record, 'description'),
+            'pet_id': self.resolve('pets', record.get('pet_id'))
+        }
+    
+    def load(self, table, path: str, convert: Callable) -> None:
+        """Stream ``path`` into ``table`` in batches, skipping the checkpointed ones"""
+        source = os.path.abspath(path)
+        entry = self.checkpoint.table(table.name, source)
+        if entry is None:
+            with self.engine.connect() as connection:
+                start_id = (connection.execute(db.select(db.func.max(table.c.id))).scalar() or 0) + 1
+            entry = self.checkpoint.start(table.name, source, start_id)
+        done: Set[int] = set(entry['done'])
+        key_map = self.key_maps[table.name] = {}
+        
+        loaded, started = 0, time.monotonic()
+        progress = {'rows': 0, 'reported': started}
+        
+        def committed(future):
+            rows = future.result()
+            progress['rows'] += rows
+            now = time.monotonic()
+            if now - progress['reported'] >= 5:
+                progress['reported'] = now
+                self.echo(f"{table.name}: {progress['rows']} rows, {progress['rows'] / (now - started):.0f} rows/s")
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = set()
+            batch: List[Dict[str, Any]] = []
+            for line, record, row, error in self.numbered(path, convert, entry['start_id'], key_map):
+                if row is None:
+                    self.reject(table.name, line, record, error)
+                    continue
+                
+                loaded += 1
+                batch.append(row)
+                
+                if len(batch) == self.batch_size:
+                    number = (loaded - 1) // self.batch_size
+                    if number not in done:
+                        # Keep at most two batches per worker in memory
+                        if len(pending) >= self.workers * 2:
+                            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            for future in finished:
+                                committed(future)
+                        pending.add(executor.submit(self.insert, table, number, batch))
+                    batch = []
+            
+            if batch:
+                number = (loaded - 1) // self.batch_size
+                if number not in done:
+                    pending.add(executor.submit(self.insert, table, number, batch))
+            for future in pending:
+                committed(future)
+        
+        elapsed = time.monotonic() - started
+        self.echo(f'{table.name}: {progress["rows"]} rows inserted, {loaded - progress["rows"]} already loaded, '
+                  f'{progress["rows"] / elapsed if elapsed else 0:.0f} rows/s')
+    
+    @staticmethod
+    def numbered(path: str, convert: Callable, start_id: int, key_map: Dict[str, int]) -> Iterator[Numbered]:
+        """Convert the records of ``path`` into rows with their ids
+        
+        Rows that convert are numbered from ``start_id`` and their source
+        keys added to ``key_map``, the others come with the error and no row.
+        """
+        next_id = start_id
+        for line, record in enumerate(read_records(path), start=1):
+            try:
+                row = convert(record)
+            except (KeyError, ValueError, TypeError) as e:
+                yield line, record, None, e
+                continue
+            
+            row['id'] = next_id
+            if record.get('id') not in (None, ''):
+                key_map[str(record['id'])] = row['id']
+            next_id += 1
+            yield line, record, row, None
+    
+    def insert(self, table, number: int, rows: List[Dict[str, Any]]) -> int:
+        """Insert one batch in its own transaction and checkpoint it"""
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(db.insert(table), rows)
+                if table is Visit.__table__:
+                    VisitStatsService.record_rows(connection, rows)
+        except IntegrityError:
+            # Committed by a previous run that stopped before its checkpoint
+            first, last = rows[0]['id'], rows[-1]['id']
+            with self.engine.connect() as connection:
+                present = connection.execute(
+                    db.select(db.func.count()).select_from(table).where(table.c.id.between(first, last))
+                ).scalar()
+            if present != len(rows):
+                raise
+            self.checkpoint.done(table.name, number)
+            return 0
+        self.checkpoint.done(table.name, number)
+        return len(rows)
+    
+    def resolve(self, table_name: str, key: Any) -> int:
+        """Map a source key to a database id"""
+        if key in (None, ''):
+            raise ValueError(f'missing reference to {table_name}')
+        key_map = self.key_maps.get(table_name)
+        entry = self.checkpoint.state.get(table_name)
+        if key_map is None and entry is not None and table_name in self.converters:
+            # Imported by an earlier run: number its source again, as a resumed load would
+            key_map = self.key_maps[table_name] = {}
+            for _ in self.numbered(entry['source'], self.converters[table_name], entry['start_id'], key_map):
+                pass
+        elif key_map is None:
+            # Not imported: references are existing database ids
+            table = db.metadata.tables[table_name]
+            with self.engine.connect() as connection:
+                key_map = {str(id): id for id in connection.execute(db.select(table.c.id)).scalars()}
+            self.key_maps[table_name] = key_map
+        try:
+            return key_map[str(key)]
+        except KeyError:
+            raise ValueError(f'unknown {table_name} reference {key!r}')
+    
+    def pet_type_id(self, name: str) -> int:
+        """Id of the pet type called ``name``, created when missing"""
+        if not self.type_ids:
+            with self.engine.connect() as connection:
+                self.type_ids = {
+                    type_name.lower(): id
+                    for id, type_name in connection.execute(db.select(PetType.id, PetType.name))
+                }
+        key = name.strip().lower()
+        if key not in self.type_ids:
+            now = datetime.utcnow()
+            with self.engine.begin() as connection:
+                self.type_ids[key] = connection.execute(
+                    db.insert(PetType.__table__).values(name=name.strip(), created_at=now, updated_at=now)
+                ).inserted_primary_key[0]
+        return self.type_ids[key]
+    
+    @staticmethod
+    def field(record: Dict[str, Any], name: str) -> Any:
+        """A required value of ``record``, KeyError when missing or empty"""
+        value = record.get(name)
+        if value is None or value == '':
+            raise KeyError(name)
+        return value
+    
+    @staticmethod
+    def parse_date(value: Any) -> date:
+        return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+    
+    def recorded_rejects(self) -> Set[Tuple[str, int]]:
+        """Table and line of every reject already in the rejects file"""
+        recorded = set()
+        with open(self.rejects_path, encoding='utf-8') as handle:
+            for text in handle:
+                try:
+                    entry = json.loads(text)
+                except ValueError:
+                    # Cut short by a run that was killed while writing it
+                    continue
+                recorded.add((entry['table'], entry['line']))
+        return recorded
+    
+    def reject(self, table_name: str, line: int, record: Dict[str, Any], error: Exception) -> None:
+        if (table_name, line) in self.rejected:
+            return
+        reason = f'missing field {error}' if isinstance(error, KeyError) else str(error)
+        self.rejects.write(json.dumps({'table': table_name, 'line': line, 'error': reason, 'record': record}) + '\n')
\ No newline at end of file
@@ -0,0 +1,90 @@
+import json
+import re
+from datetime import date, datetime, timezone
+from typing import Any
+from flask.json.provider import DefaultJSONProvider
+from app.profiling import serialization
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+def http_date(value: date) -> str:
+    """Same string as ``werkzeug.http.http_date``, without its round trip through ``email.utils``"""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    clock = (value.hour, value.minute, value.second) if isinstance(value, datetime) else (0, 0, 0)
+    return '%s, %02d %s %04d %02d:%02d:%02d GMT' % (
+        _WEEKDAYS[value.weekday()], value.day, _MONTHS[value.month - 1], value.year, *clock
+    )
+
+# Characters ``json.dumps(ensure_ascii=True)`` escapes and orjson writes as
+# they are (orjson already escapes the controls below 0x20)
+_NON_ASCII = re.compile(r'[^\x00-\x7e]+')
+
+def ascii_escape(text: str) -> str:
+    """Escape the non-ASCII characters of JSON text exactly like ``json.dumps(ensure_ascii=True)``"""
+    if text.isascii() and '\x7f' not in text:
+        return text
+    if '\\' not in text:
+        # Every backslash then comes from backslashreplace: its \u2028 is
+        # already JSON, \xe7 becomes \u00e7 and characters beyond the BMP
+        # (\U0001f600) are left to the regex, they need surrogate pairs
+        escaped = text.replace('\x7f', '\\u007f').encode('ascii', 'backslashreplace').decode()
+        if '\\U' not in escaped:
+            return escaped.replace('\\x', '\\u00')
+    return _NON_ASCII.sub(lambda match: json.dumps(match.group())[1:-1], text)
+
+# orjson writes NaN/Infinity as null, and floats outside [1e-4, 1e16) as
+# 1e16, 2.5e-7 or 0.00001 where repr() has 1e+16, 2.5e-07 and 1e-05. Output
+# containing one of these byte strings (in a number or, harmlessly, inside
+# a string) is encoded again by the stdlib.
+_STDLIB_ONLY = (b'null', b'0.0000', b'e-') + tuple(b'e%d' % digit for digit in range(1, 10))
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson when it is installed
+    
+    The output is byte for byte what ``DefaultJSONProvider`` produces:
+    sorted keys, HTTP dates for ``date``/``datetime``, strings for
+    ``Decimal``/``UUID``, ASCII-only escapes. Documents orjson would spell
+    differently (indented debug output, non-string keys, integers beyond 64
+    bits, non-finite or exponent-notation floats, custom ``dumps``
+    arguments) go through the stdlib encoder instead.
+    """
+    
+    @staticmethod
+    def default(value: Any) -> Any:
+        if isinstance(value, date):
+            return http_date(value)
+        return DefaultJSONProvider.default(value)
+    
+    @serialization
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # Only the compact form used by response() has an orjson equivalent
+        if orjson is None or not self.sort_keys or kwargs != {'separators': (',', ':')}:
+            return super().dumps(obj, **kwargs)
+        
+        try:
+            encoded = orjson.dumps(obj, default=self.default, option=(
+                orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+            ))
+        except TypeError:
+            return super().dumps(obj, separators=(',', ':'))
+        if any(pattern in encoded for pattern in _STDLIB_ONLY):
+            return super().dumps(obj, separators=(',', ':'))
+        
+        text = encoded.decode()
+        return ascii_escape(text) if self.ensure_ascii else text
+    
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            # NaN/Infinity, huge integers or a real error, worded by the stdlib
+            return json.loads(s)
\ No newline at end of file
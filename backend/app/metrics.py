@@ -0,0 +1,131 @@
+import os
+import time
+from typing import Tuple
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:
+    prometheus_client = None
+
+# Request latency buckets in seconds, from cached reads to slow exports
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Labelled children by metric and label values. ``labels()`` takes the
+# metric's lock on every call, a plain dict read does not
+_children = {}
+
+def _child(metric, *labels):
+    key = (metric._name, labels)
+    child = _children.get(key)
+    if child is None:
+        child = _children.setdefault(key, metric.labels(*labels))
+    return child
+
+if prometheus_client is not None:
+    REQUESTS = prometheus_client.Counter(
+        'petclinic_http_requests', 'HTTP requests handled', ['method', 'endpoint', 'status'])
+    LATENCY = prometheus_client.Histogram(
+        'petclinic_http_request_duration_seconds', 'Time to build the response, hooks included',
+        ['method', 'endpoint', 'status'], buckets=LATENCY_BUCKETS)
+    IN_FLIGHT = prometheus_client.Gauge(
+        'petclinic_http_requests_in_flight', 'Requests being handled', multiprocess_mode='livesum')
+    POOL_CHECKED_OUT = prometheus_client.Gauge(
+        'petclinic_db_pool_checked_out', 'Database connections in use', multiprocess_mode='livesum')
+    POOL_CONNECTIONS = prometheus_client.Gauge(
+        'petclinic_db_pool_connections', 'Open database connections, in use or idle in a pool', multiprocess_mode='livesum')
+    POOL_WAIT = prometheus_client.Histogram(
+        'petclinic_db_pool_wait_seconds', 'Time spent waiting for a pooled connection',
+        buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0))
+    POOL_TIMEOUTS = prometheus_client.Counter(
+        'petclinic_db_pool_timeouts', 'Requests that gave up waiting for a connection')
+    CACHE_LOOKUPS = prometheus_client.Counter(
+        'petclinic_cache_lookups', 'In-process cache lookups', ['cache', 'result'])
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    """Count a lookup of one of the in-process caches"""
+    if prometheus_client is not None:
+        _child(CACHE_LOOKUPS, cache, 'hit' if hit else 'miss').inc()
+
+def pool_waited(seconds: float, timed_out: bool) -> None:
+    """Record the wait of a checkout from an instrumented pool"""
+    if prometheus_client is not None:
+        POOL_WAIT.observe(seconds)
+        if timed_out:
+            POOL_TIMEOUTS.inc()
+
+def multiprocess_dir() -> str:
+    """Directory the workers share their metrics through, empty when single process"""
+    return os.environ.get('PROMETHEUS_MULTIPROC_DIR', '')
+
+def mark_process_dead(pid: int) -> None:
+    """Drop the live gauges of a worker that exited (gunicorn ``child_exit``)"""
+    if prometheus_client is not None and multiprocess_dir():
+        multiprocess.mark_process_dead(pid)
+
+class Metrics:
+    """Prometheus metrics served at ``/metrics``
+    
+    Requests are counted and timed by endpoint (``owner.get_owners``...),
+    method and status; the pools of every engine report connections in use
+    and open; the caches report hits and misses. Nothing is recorded when
+    ``prometheus_client`` is not installed.
+    
+    With ``PROMETHEUS_MULTIPROC_DIR`` set (pre-fork servers, see run.py)
+    every worker writes its values to that directory and a scrape of any
+    worker returns the sum over all of them.
+    """
+    
+    _listening = False
+    
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        app.extensions['metrics'] = self
+        if prometheus_client is None:
+            return
+        
+        if not Metrics._listening:
+            event.listen(Pool, 'connect', lambda dbapi_connection, connection_record: POOL_CONNECTIONS.inc())
+            event.listen(Pool, 'close', lambda dbapi_connection, connection_record: POOL_CONNECTIONS.dec())
+            event.listen(Pool, 'close_detached', lambda dbapi_connection: POOL_CONNECTIONS.dec())
+            event.listen(Pool, 'checkout', lambda dbapi_connection, connection_record, connection_proxy: POOL_CHECKED_OUT.inc())
+            event.listen(Pool, 'checkin', lambda dbapi_connection, connection_record: POOL_CHECKED_OUT.dec())
+            Metrics._listening = True
+        app.before_request(self.start)
+        app.after_request(self.finish)
+        app.teardown_request(self.teardown)
+    
+    @staticmethod
+    def start():
+        g.metrics_started = time.perf_counter()
+        IN_FLIGHT.inc()
+    
+    @staticmethod
+    def finish(response):
+        started = g.get('metrics_started')
+        if started is not None:
+            labels = (request.method, request.endpoint or 'unmatched', str(response.status_code))
+            _child(LATENCY, *labels).observe(time.perf_counter() - started)
+            _child(REQUESTS, *labels).inc()
+        return response
+    
+    @staticmethod
+    def teardown(exception=None):
+        if g.pop('metrics_started', None) is not None:
+            IN_FLIGHT.dec()
+    
+    @staticmethod
+    def exposition() -> Tuple[bytes, str]:
+        """Body and content type of a scrape"""
+        if multiprocess_dir():
+            registry = prometheus_client.CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = prometheus_client.REGISTRY
+        return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
\ No newline at end of file
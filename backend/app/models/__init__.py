@@ -4,5 +4,6 @@ from .visit import Visit
 from .vet import Vet
 from .specialty import Specialty
 from .pettype import PetType
+from .visit_stats import visit_daily_stats, visit_monthly_stats
 
-__all__ = ['Owner', 'Pet', 'Visit', 'Vet', 'Specialty', 'PetType']
\ No newline at end of file
+__all__ = ['Owner', 'Pet', 'Visit', 'Vet', 'Specialty', 'PetType', 'visit_daily_stats', 'visit_monthly_stats']
\ No newline at end of file
@@ -1,9 +1,36 @@
 from datetime import datetime
+from typing import Dict, Optional
 from app import db
+from app.profiling import serialization
+
+def parse_paths(value: Optional[str]) -> Optional[Dict[str, dict]]:
+    """Parse a comma separated list of dotted paths into a nested dict
+    
+    ``'pets,pets.visits'`` becomes ``{'pets': {'visits': {}}}``.
+    """
+    if value is None:
+        return None
+    
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for part in path.strip().split('.'):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
 
 class BaseModel(db.Model):
     __abstract__ = True
     
+    # Relationships that to_dict() can embed through ``expand``, keyed by API name
+    __expandable__ = {}
+    
+    # Methods whose results are emitted next to the columns
+    __computed__ = ()
+    
+    # The ones among them whose result changes with the current date
+    __computed_daily__ = ()
+    
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -28,6 +55,57 @@ class BaseModel(db.Model):
         db.session.commit()
         return self
     
-    def to_dict(self):
-        """Convert model to dictionary"""
-        return {c.name: getattr(self, c.name) for c in self.__table__.columns}
\ No newline at end of file
+    @classmethod
+    def related_model(cls, name: str):
+        """Return the model class behind an expandable relationship"""
+        return getattr(cls, cls.__expandable__[name]).property.mapper.class_
+    
+    @classmethod
+    def validate_expand(cls, expand: Optional[Dict[str, dict]]) -> None:
+        """Raise ValueError if an expand path names an unknown relationship"""
+        for name, subtree in (expand or {}).items():
+            if name not in cls.__expandable__:
+                raise ValueError(f'{cls.__name__} cannot expand "{name}"')
+            cls.related_model(name).validate_expand(subtree)
+    
+    @classmethod
+    def expands_collection(cls, expand: Optional[Dict[str, dict]]) -> bool:
+        """Whether ``expand`` embeds a to-many relationship anywhere in its tree"""
+        return any(
+            getattr(cls, cls.__expandable__[name]).property.uselist or cls.related_model(name).expands_collection(subtree)
+            for name, subtree in (expand or {}).items()
+        )
+    
+    @serialization
+    def to_dict(self, fields=None, expand=None):
+        """Convert model to dictionary
+        
+        ``fields`` restricts the emitted attributes and ``expand`` names the
+        relationships to embed. Both accept the nested dicts built by
+        ``parse_paths()`` (or the raw comma separated string), so
+        ``pets.visits`` expands visits inside each pet and ``pets.name``
+        limits the embedded pets to their name. ``id`` is always emitted.
+        """
+        if isinstance(fields, str):
+            fields = parse_paths(fields)
+        if isinstance(expand, str):
+            expand = parse_paths(expand)
+        
+        def wanted(name):
+            return fields is None or name == 'id' or name in fields
+        
+        data = {c.name: getattr(self, c.name) for c in self.__table__.columns if wanted(c.name)}
+        for name in self.__computed__:
+            if wanted(name):
+                data[name] = getattr(self, name)()
+        
+        for name, subtree in (expand or {}).items():
+            child_fields = (fields.get(name) or None) if fields is not None else None
+            value = getattr(self, self.__expandable__[name])
+            if value is None:
+                data[name] = None
+            elif isinstance(value, list):
+                data[name] = [item.to_dict(child_fields, subtree) for item in value]
+            else:
+                data[name] = value.to_dict(child_fields, subtree)
+        return data
\ No newline at end of file
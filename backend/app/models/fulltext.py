@@ -0,0 +1,194 @@
+import html
+import re
+import unicodedata
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.dialects.mysql import match
+from app import db
+
+# Quoted phrases or single words, a trailing * marks a prefix query
+_TERM = re.compile(r'"([^"]*)"|([\w*]+)', re.UNICODE)
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+def _fold(text: str) -> str:
+    """Lowercase and strip accents without changing the length of ``text``
+    
+    Each character folds to one: ``str.lower()`` of the whole text would turn
+    'İ' into two characters and shift the match offsets after it.
+    """
+    return ''.join(unicodedata.normalize('NFD', char.lower())[0] for char in text)
+
+class FullTextIndex:
+    """A full-text index over some text columns of a table
+    
+    SQLite gets an external-content FTS5 table kept in sync by triggers and
+    MySQL a FULLTEXT index maintained by InnoDB, so every write path (ORM,
+    Core bulk inserts, raw SQL) keeps the index current. The index is created
+    together with its table and by the migrations. Other dialects fall back
+    to ILIKE over the columns.
+    """
+    
+    # Every index by table name, for the rebuild command
+    registry: Dict[str, 'FullTextIndex'] = {}
+    
+    def __init__(self, table, columns: Sequence[str], weights: Optional[Sequence[float]] = None):
+        self.table = table
+        self.columns = list(columns)
+        self.weights = list(weights) if weights else None
+        self.name = f'{table.name}_fts'
+        FullTextIndex.registry[table.name] = self
+        event.listen(table, 'after_create', self._after_create)
+        event.listen(table, 'before_drop', self._before_drop)
+    
+    def create_statements(self, dialect: str) -> List[str]:
+        """DDL creating the index and its synchronisation triggers"""
+        table, name = self.table.name, self.name
+        columns = ', '.join(self.columns)
+        if dialect == 'mysql':
+            return [f'ALTER TABLE {table} ADD FULLTEXT INDEX {name} ({columns})']
+        if dialect != 'sqlite':
+            return []
+        
+        new_values = ', '.join(f'new.{column}' for column in self.columns)
+        old_values = ', '.join(f'old.{column}' for column in self.columns)
+        return [
+            f"CREATE VIRTUAL TABLE {name} USING fts5({columns}, content='{table}', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+            f'CREATE TRIGGER {name}_ai AFTER INSERT ON {table} BEGIN '
+            f'INSERT INTO {name}(rowid, {columns}) VALUES (new.id, {new_values}); END',
+            f'CREATE TRIGGER {name}_ad AFTER DELETE ON {table} BEGIN '
+            f"INSERT INTO {name}({name}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END",
+            f'CREATE TRIGGER {name}_au AFTER UPDATE OF {columns} ON {table} BEGIN '
+            f"INSERT INTO {name}({name}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+            f'INSERT INTO {name}(rowid, {columns}) VALUES (new.id, {new_values}); END',
+        ]
+    
+    def drop_statements(self, dialect: str) -> List[str]:
+        """DDL removing the index and its triggers"""
+        if dialect == 'mysql':
+            return [f'ALTER TABLE {self.table.name} DROP INDEX {self.name}']
+        if dialect != 'sqlite':
+            return []
+        return [f'DROP TRIGGER IF EXISTS {self.name}_{suffix}' for suffix in ('ai', 'ad', 'au')] + [
+            f'DROP TABLE IF EXISTS {self.name}'
+        ]
+    
+    def rebuild(self, connection) -> None:
+        """Rebuild the index from the content of the table"""
+        dialect = connection.dialect.name
+        if dialect == 'sqlite':
+            connection.execute(db.text(f"INSERT INTO {self.name}({self.name}) VALUES ('rebuild')"))
+        elif dialect == 'mysql':
+            for statement in self.drop_statements(dialect) + self.create_statements(dialect):
+                connection.execute(db.text(statement))
+    
+    @staticmethod
+    def parse(text: str, prefix: bool = False) -> List[Tuple[List[str], bool]]:
+        """Split user input into ``(words, is_prefix)`` terms
+        
+        ``"quoted text"`` is a phrase and a trailing ``*`` makes a word a
+        prefix query; with ``prefix=True`` every bare word is a prefix query.
+        """
+        terms = []
+        for phrase, word in _TERM.findall(text or ''):
+            if phrase:
+                words = _WORD.findall(phrase)
+                if words:
+                    terms.append((words, False))
+            else:
+                words = _WORD.findall(word)
+                if words:
+                    terms.append((words, prefix or word.endswith('*')))
+        return terms
+    
+    @staticmethod
+    def match_expression(terms: List[Tuple[List[str], bool]], dialect: str) -> str:
+        """Render parsed terms as an FTS5 or MySQL boolean-mode query, all terms required"""
+        parts = []
+        for words, is_prefix in terms:
+            quoted = '"' + ' '.join(words) + '"'
+            if dialect == 'mysql':
+                parts.append('+' + (words[0] + '*' if is_prefix and len(words) == 1 else quoted))
+            else:
+                parts.append(quoted + ('*' if is_prefix else ''))
+        return ' '.join(parts)
+    
+    @staticmethod
+    def highlight(text: str, terms: List[Tuple[List[str], bool]], size: int = 160) -> str:
+        """HTML-escaped excerpt of ``text`` around the first match, matches wrapped in ``<mark>``
+        
+        Matching ignores case and accents like the index does.
+        """
+        text = text or ''
+        patterns = []
+        for words, is_prefix in terms:
+            pattern = r'\W+'.join(re.escape(_fold(word)) for word in words)
+            patterns.append(r'\b' + pattern + (r'\w*' if is_prefix else r'\b'))
+        matches = list(re.finditer('|'.join(patterns), _fold(text))) if patterns else []
+        
+        start, end = 0, len(text)
+        if len(text) > size:
+            center = matches[0].start() if matches else 0
+            start = max(0, center - size // 3)
+            end = min(len(text), start + size)
+            start = max(0, end - size)
+            # Do not cut words in half at either end
+            if start > 0:
+                start = text.find(' ', start) + 1 or start
+            if end < len(text):
+                end = text.rfind(' ', start, end) if ' ' in text[start:end] else end
+        
+        parts, position = [], start
+        for match in matches:
+            if match.start() < start or match.end() > end:
+                continue
+            parts.append(html.escape(text[position:match.start()]))
+            parts.append('<mark>' + html.escape(text[match.start():match.end()]) + '</mark>')
+            position = match.end()
+        parts.append(html.escape(text[position:end]))
+        return ('…' if start > 0 else '') + ''.join(parts) + ('…' if end < len(text) else '')
+    
+    def search(self, query, text: str, prefix: bool = False):
+        """Restrict an ORM query over the table to matching rows, best match first"""
+        terms = self.parse(text, prefix)
+        if not terms:
+            return query.filter(db.false())
+        
+        dialect = db.engine.dialect.name
+        table = self.table
+        if dialect == 'sqlite':
+            fts = db.table(self.name, db.column('rowid'))
+            weights = [db.literal_column(repr(float(weight))) for weight in self.weights or ()]
+            matches = db.select(
+                fts.c.rowid.label('id'),
+                (-db.func.bm25(db.literal_column(self.name), *weights)).label('rank')
+            ).select_from(fts).where(
+                db.text(f'{self.name} MATCH :fts_query').bindparams(
+                    fts_query=self.match_expression(terms, dialect)
+                )
+            ).subquery()
+            return query.join(matches, matches.c.id == table.c.id).order_by(
+                matches.c.rank.desc(), table.c.id
+            )
+        if dialect == 'mysql':
+            rank = match(
+                *[table.c[column] for column in self.columns],
+                against=self.match_expression(terms, dialect)
+            ).in_boolean_mode()
+            return query.filter(rank).order_by(rank.desc(), table.c.id)
+        
+        words = [word for term_words, _ in terms for word in term_words]
+        return query.filter(db.and_(*[
+            db.or_(*[table.c[column].ilike(f'%{word}%') for column in self.columns])
+            for word in words
+        ])).order_by(table.c.id)
+    
+    def _after_create(self, target, connection, **kw):
+        for statement in self.create_statements(connection.dialect.name):
+            connection.execute(db.text(statement))
+    
+    def _before_drop(self, target, connection, **kw):
+        # MySQL drops the FULLTEXT index with its table
+        if connection.dialect.name == 'sqlite':
+            for statement in self.drop_statements('sqlite'):
+                connection.execute(db.text(statement))
\ No newline at end of file
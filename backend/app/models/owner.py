@@ -1,5 +1,6 @@
 from app import db
 from .base import BaseModel
+from .fulltext import FullTextIndex
 
 class Owner(BaseModel):
     __tablename__ = 'owners'
@@ -13,14 +14,24 @@ class Owner(BaseModel):
     # Relationship with pets
     pets = db.relationship('Pet', backref='owner', lazy=True, cascade='all, delete-orphan')
     
+    __expandable__ = {'pets': 'pets'}
+    __computed__ = ('full_name',)
+    
     def __repr__(self):
         return f'<Owner {self.first_name} {self.last_name}>'
     
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
-    
-    def to_dict(self):
-        data = super().to_dict()
-        data['full_name'] = self.full_name()
-        data['pets'] = [pet.to_dict() for pet in self.pets]
-        return data
\ No newline at end of file
+
+# Last name lookups are case-insensitive prefix matches (LIKE 'x%'). MySQL's
+# default collation already ignores case; SQLite only uses an index for LIKE
+# when the index is NOCASE.
+db.Index('ix_owners_last_name', Owner.last_name).ddl_if(dialect='mysql')
+db.Index('ix_owners_last_name', Owner.last_name.collate('NOCASE')).ddl_if(dialect='sqlite')
+
+# Ranked search over every text column, matches on names weigh the most
+owner_search_index = FullTextIndex(
+    Owner.__table__,
+    ('first_name', 'last_name', 'address', 'city', 'telephone'),
+    weights=(5, 10, 1, 2, 3)
+)
\ No newline at end of file
@@ -9,30 +9,20 @@ class Pet(BaseModel):
     birth_date = db.Column(db.Date, nullable=False)
     
     # Foreign keys
-    owner_id = db.Column(db.Integer, db.ForeignKey('owners.id'), nullable=False)
-    type_id = db.Column(db.Integer, db.ForeignKey('pet_types.id'), nullable=False)
+    owner_id = db.Column(db.Integer, db.ForeignKey('owners.id'), nullable=False, index=True)
+    type_id = db.Column(db.Integer, db.ForeignKey('pet_types.id'), nullable=False, index=True)
     
     # Relationship with visits
     visits = db.relationship('Visit', backref='pet', lazy=True, cascade='all, delete-orphan')
     
+    __expandable__ = {'owner': 'owner', 'type': 'pet_type', 'visits': 'visits'}
+    __computed__ = ('age',)
+    __computed_daily__ = ('age',)
+    
     def __repr__(self):
         return f'<Pet {self.name}>'
     
     def age(self):
         """Calculate pet's age in years"""
         today = date.today()
-        return today.year - self.birth_date.year - ((today.month, today.day) < (self.birth_date.month, self.birth_date.day))
-    
-    def to_dict(self):
-        data = super().to_dict()
-        data['age'] = self.age()
-        data['owner'] = {
-            'id': self.owner.id,
-            'full_name': self.owner.full_name()
-        } if self.owner else None
-        data['type'] = {
-            'id': self.pet_type.id,
-            'name': self.pet_type.name
-        } if self.pet_type else None
-        data['visits'] = [visit.to_dict() for visit in self.visits]
-        return data
\ No newline at end of file
+        return today.year - self.birth_date.year - ((today.month, today.day) < (self.birth_date.month, self.birth_date.day))
\ No newline at end of file
@@ -10,8 +10,4 @@ class PetType(BaseModel):
     pets = db.relationship('Pet', backref='pet_type', lazy=True)
     
     def __repr__(self):
-        return f'<PetType {self.name}>'
-    
-    def to_dict(self):
-        data = super().to_dict()
-        return data
\ No newline at end of file
+        return f'<PetType {self.name}>'
\ No newline at end of file
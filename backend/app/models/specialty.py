@@ -4,7 +4,9 @@ from .base import BaseModel
 # Association table for many-to-many relationship between vets and specialties
 vet_specialties = db.Table('vet_specialties',
     db.Column('vet_id', db.Integer, db.ForeignKey('vets.id'), primary_key=True),
-    db.Column('specialty_id', db.Integer, db.ForeignKey('specialties.id'), primary_key=True)
+    db.Column('specialty_id', db.Integer, db.ForeignKey('specialties.id'), primary_key=True),
+    # The primary key covers lookups by vet, this one the reverse direction
+    db.Index('ix_vet_specialties_specialty_id', 'specialty_id')
 )
 
 class Specialty(BaseModel):
@@ -13,8 +15,4 @@ class Specialty(BaseModel):
     name = db.Column(db.String(80), nullable=False, unique=True)
     
     def __repr__(self):
-        return f'<Specialty {self.name}>'
-    
-    def to_dict(self):
-        data = super().to_dict()
-        return data
\ No newline at end of file
+        return f'<Specialty {self.name}>'
\ No newline at end of file
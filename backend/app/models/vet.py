@@ -9,17 +9,14 @@ class Vet(BaseModel):
     last_name = db.Column(db.String(30), nullable=False)
     
     # Many-to-many relationship with specialties
-    specialties = db.relationship('Specialty', secondary=vet_specialties, lazy='subquery',
+    specialties = db.relationship('Specialty', secondary=vet_specialties, lazy=True,
                                 backref=db.backref('vets', lazy=True))
     
+    __expandable__ = {'specialties': 'specialties'}
+    __computed__ = ('full_name',)
+    
     def __repr__(self):
         return f'<Vet {self.first_name} {self.last_name}>'
     
     def full_name(self):
-        return f"{self.first_name} {self.last_name}"
-    
-    def to_dict(self):
-        data = super().to_dict()
-        data['full_name'] = self.full_name()
-        data['specialties'] = [specialty.to_dict() for specialty in self.specialties]
-        return data
\ No newline at end of file
+        return f"{self.first_name} {self.last_name}"
\ No newline at end of file
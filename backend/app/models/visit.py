@@ -1,23 +1,23 @@
 from app import db
 from .base import BaseModel
+from .fulltext import FullTextIndex
 
 class Visit(BaseModel):
     __tablename__ = 'visits'
     
-    visit_date = db.Column(db.Date, nullable=False)
+    visit_date = db.Column(db.Date, nullable=False, index=True)
     description = db.Column(db.Text, nullable=False)
     
     # Foreign key
     pet_id = db.Column(db.Integer, db.ForeignKey('pets.id'), nullable=False)
     
+    # A pet's visits are read newest first
+    __table_args__ = (db.Index('ix_visits_pet_id_visit_date', 'pet_id', 'visit_date'),)
+    
+    __expandable__ = {'pet': 'pet'}
+    
     def __repr__(self):
         return f'<Visit {self.visit_date} - Pet {self.pet_id}>'
-    
-    def to_dict(self):
-        data = super().to_dict()
-        data['pet'] = {
-            'id': self.pet.id,
-            'name': self.pet.name,
-            'owner': self.pet.owner.full_name()
-        } if self.pet else None
-        return data
\ No newline at end of file
+
+# Ranked search over the clinical notes
+visit_search_index = FullTextIndex(Visit.__table__, ('description',))
\ No newline at end of file
@@ -0,0 +1,19 @@
+from app import db
+
+# Visit counts maintained by VisitStatsService, one row per day (or month),
+# pet type and owner city. No foreign keys: rows are keyed by whatever the
+# visit pointed at when it was counted and corrected by deltas later on.
+visit_daily_stats = db.Table('visit_daily_stats',
+    db.Column('stat_date', db.Date, primary_key=True),
+    db.Column('pet_type_id', db.Integer, primary_key=True),
+    db.Column('city', db.String(80), primary_key=True),
+    db.Column('visits', db.Integer, nullable=False, default=0)
+)
+
+# Same counts per calendar month, ``stat_month`` is the first day of the month
+visit_monthly_stats = db.Table('visit_monthly_stats',
+    db.Column('stat_month', db.Date, primary_key=True),
+    db.Column('pet_type_id', db.Integer, primary_key=True),
+    db.Column('city', db.String(80), primary_key=True),
+    db.Column('visits', db.Integer, nullable=False, default=0)
+)
\ No newline at end of file
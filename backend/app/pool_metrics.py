@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+from flask import current_app, has_request_context, request
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+from app.metrics import pool_waited
+
+# Samples kept for the percentiles of /health/pool
+WINDOW = 1000
+
+class Timings:
+    """Count, total and maximum of a duration plus a window of recent samples"""
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: Deque[float] = deque(maxlen=WINDOW)
+    
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+    
+    def report(self) -> Dict[str, Any]:
+        recent = sorted(self.recent)
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total / self.count * 1000, 2) if self.count else 0,
+            'p95_ms': round(recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000, 2) if recent else 0,
+            'max_ms': round(self.max * 1000, 2)
+        }
+
+class PoolStats:
+    """Checkout waits, timeouts and hold times of the connection pool in this process"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self) -> None:
+        self.wait = Timings()
+        self.hold = Timings()
+        self.hold_by_endpoint: Dict[str, Timings] = {}
+        self.timeouts = 0
+        self.peak_checked_out = 0
+    
+    def waited(self, seconds: float, checked_out: int, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait.add(seconds)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            if timed_out:
+                self.timeouts += 1
+    
+    def held(self, seconds: float, endpoint: str) -> None:
+        with self._lock:
+            self.hold.add(seconds)
+            self.hold_by_endpoint.setdefault(endpoint, Timings()).add(seconds)
+    
+    def report(self, endpoints: int = 10) -> Dict[str, Any]:
+        with self._lock:
+            busiest = sorted(self.hold_by_endpoint.items(), key=lambda item: -item[1].total)[:endpoints]
+            return {
+                'peak_checked_out': self.peak_checked_out,
+                'timeouts': self.timeouts,
+                'wait': self.wait.report(),
+                'hold': self.hold.report(),
+                'hold_by_endpoint': {name: timings.report() for name, timings in busiest}
+            }
+
+# Shared by every instrumented pool of the process, a disposed pool's
+# replacement keeps adding to the same numbers
+pool_stats = PoolStats()
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times how long callers wait for a connection"""
+    
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            waited = time.perf_counter() - start
+            pool_stats.waited(waited, self.checkedout(), timed_out=True)
+            pool_waited(waited, timed_out=True)
+            raise
+        waited = time.perf_counter() - start
+        pool_stats.waited(waited, self.checkedout())
+        pool_waited(waited, timed_out=False)
+        return connection
+
+@event.listens_for(InstrumentedQueuePool, 'checkout')
+def _checked_out(dbapi_connection, connection_record, connection_proxy):
+    endpoint = (request.endpoint or 'unmatched') if has_request_context() else 'background'
+    connection_record.info['checked_out'] = (time.perf_counter(), endpoint)
+
+@event.listens_for(InstrumentedQueuePool, 'checkin')
+def _checked_in(dbapi_connection, connection_record):
+    checked_out = connection_record.info.pop('checked_out', None)
+    if checked_out is not None:
+        pool_stats.held(time.perf_counter() - checked_out[0], checked_out[1])
+
+class PoolMetrics:
+    """Instrument the SQLAlchemy connection pool of an app
+    
+    Must be initialised before ``db.init_app`` so the engine is built with
+    ``InstrumentedQueuePool``. Engines without a sized queue pool (SQLite in
+    memory) are reported without timings.
+    """
+    
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        if 'pool_size' in options:
+            options.setdefault('poolclass', InstrumentedQueuePool)
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+        app.extensions['pool_metrics'] = pool_stats
+    
+    @staticmethod
+    def report(engine) -> Dict[str, Any]:
+        """Pool settings, current occupancy and the collected timings"""
+        pool = engine.pool
+        options = current_app.config['SQLALCHEMY_ENGINE_OPTIONS']
+        report: Dict[str, Any] = {
+            'pool': type(pool).__name__,
+            'pre_ping': bool(options.get('pool_pre_ping')),
+            'recycle': options.get('pool_recycle', -1)
+        }
+        if isinstance(pool, QueuePool):
+            capacity = pool.size() + max(pool._max_overflow, 0)
+            report.update({
+                'size': pool.size(),
+                'max_overflow': pool._max_overflow,
+                'timeout': pool.timeout(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0),
+                'capacity': capacity,
+                'saturated': pool.checkedout() >= capacity
+            })
+        if isinstance(pool, InstrumentedQueuePool):
+            report.update(pool_stats.report())
+        return report
\ No newline at end of file
@@ -0,0 +1,215 @@
+import random
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from typing import Any, Dict, List, Optional, Tuple
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.pool_metrics import Timings
+
+PROFILING_MODES = ('off', 'sample', 'all')
+
+# Repeated statements kept per endpoint in /health/sql
+EXAMPLES = 5
+
+class RequestProfile:
+    """SQL statements, database time and serialization time of one request"""
+    
+    __slots__ = ('started', 'statements', 'db_time', 'serialize_time', 'shapes', 'serializing')
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        # Statement text by number of executions: the bound values are
+        # placeholders, so a lazy load per row repeats the same text
+        self.shapes: Counter = Counter()
+        self.serializing = False
+    
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statements executed at least ``threshold`` times, the likely N+1s"""
+        return [(statement, count) for statement, count in self.shapes.most_common() if count >= threshold]
+    
+    def server_timing(self, repeated: List[Tuple[str, int]]) -> str:
+        """``Server-Timing`` header value, durations in milliseconds"""
+        entries = [
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.statements} statements"',
+            f'serialize;dur={self.serialize_time * 1000:.2f}',
+            f'total;dur={(time.perf_counter() - self.started) * 1000:.2f}'
+        ]
+        if repeated:
+            entries.append(f'n1;desc="{len(repeated)} repeated statements"')
+        return ', '.join(entries)
+
+def current_profile() -> Optional[RequestProfile]:
+    """Profile of the current request, None when it is not being profiled"""
+    return g.get('sql_profile') if has_app_context() else None
+
+def serialization(f):
+    """Count the time spent in ``f`` as serialization of the profiled request
+    
+    Nested calls (``to_dict`` of embedded documents) are timed once, and
+    statements they trigger, e.g. lazy loads, stay database time.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        profile = current_profile()
+        if profile is None or profile.serializing:
+            return f(*args, **kwargs)
+        
+        profile.serializing = True
+        start = time.perf_counter()
+        db_time = profile.db_time
+        try:
+            return f(*args, **kwargs)
+        finally:
+            profile.serializing = False
+            profile.serialize_time += time.perf_counter() - start - (profile.db_time - db_time)
+    return decorated_function
+
+class EndpointProfile:
+    """Totals of the profiled requests of one endpoint"""
+    
+    def __init__(self):
+        self.requests = 0
+        self.statements = 0
+        self.max_statements = 0
+        self.db = Timings()
+        self.serialize = Timings()
+        self.n1_requests = 0
+        self.repeated: Dict[str, int] = {}
+    
+    def add(self, profile: RequestProfile, repeated: List[Tuple[str, int]]) -> None:
+        self.requests += 1
+        self.statements += profile.statements
+        self.max_statements = max(self.max_statements, profile.statements)
+        self.db.add(profile.db_time)
+        self.serialize.add(profile.serialize_time)
+        if repeated:
+            self.n1_requests += 1
+        for statement, count in repeated:
+            if statement in self.repeated or len(self.repeated) < EXAMPLES:
+                self.repeated[statement] = max(self.repeated.get(statement, 0), count)
+    
+    def report(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'avg_statements': round(self.statements / self.requests, 1),
+            'max_statements': self.max_statements,
+            'db': self.db.report(),
+            'serialize': self.serialize.report(),
+            'n1_requests': self.n1_requests,
+            'repeated_statements': [
+                {'statement': statement, 'max_executions': count}
+                for statement, count in sorted(self.repeated.items(), key=lambda item: -item[1])
+            ]
+        }
+
+class ProfileStats:
+    """Profiled requests of this process, by endpoint"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self) -> None:
+        self.endpoints: Dict[str, EndpointProfile] = {}
+    
+    def record(self, endpoint: str, profile: RequestProfile, repeated: List[Tuple[str, int]]) -> None:
+        with self._lock:
+            self.endpoints.setdefault(endpoint, EndpointProfile()).add(profile, repeated)
+    
+    def report(self, endpoints: int = 20) -> Dict[str, Any]:
+        with self._lock:
+            slowest = sorted(self.endpoints.items(), key=lambda item: -item[1].db.total)[:endpoints]
+            return {name: stats.report() for name, stats in slowest}
+
+profile_stats = ProfileStats()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and current_profile() is not None:
+        context.profile_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, 'profile_started', None)
+    profile = current_profile()
+    if started is not None and profile is not None:
+        profile.db_time += time.perf_counter() - started
+        profile.statements += 1
+        profile.shapes[statement] += 1
+
+class SqlProfiler:
+    """Per-request SQL profiling
+    
+    ``SQL_PROFILING`` selects the requests that are profiled: ``all``,
+    ``sample`` (a ``SQL_PROFILING_SAMPLE_RATE`` fraction, cheap enough to
+    leave on in production) or ``off``, which does not register the engine
+    listeners at all. A profiled response carries a ``Server-Timing``
+    header with the number of statements and the database, serialization
+    and total time. A statement executed ``SQL_PROFILING_N1_THRESHOLD``
+    times or more in one request is logged as a likely N+1, and
+    ``/health/sql`` aggregates the profiled requests by endpoint.
+    
+    Statements run while a streamed response is sent are not profiled.
+    """
+    
+    _listening = False
+    
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        app.config.setdefault('SQL_PROFILING', 'off')
+        app.config.setdefault('SQL_PROFILING_SAMPLE_RATE', 0.01)
+        app.config.setdefault('SQL_PROFILING_N1_THRESHOLD', 5)
+        mode = app.config['SQL_PROFILING']
+        if mode not in PROFILING_MODES:
+            raise ValueError(f"SQL_PROFILING must be one of {', '.join(PROFILING_MODES)}, not {mode!r}")
+        
+        app.extensions['sql_profiler'] = profile_stats
+        if mode == 'off':
+            return
+        
+        # Every engine (primary, replicas, the asyncio engine's sync side)
+        # shares the listeners, which do nothing outside a profiled request
+        if not SqlProfiler._listening:
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            SqlProfiler._listening = True
+        app.before_request(self.start)
+        app.after_request(self.finish)
+    
+    @staticmethod
+    def start():
+        config = current_app.config
+        if config['SQL_PROFILING'] == 'all' or random.random() < config['SQL_PROFILING_SAMPLE_RATE']:
+            g.sql_profile = RequestProfile()
+    
+    @staticmethod
+    def finish(response):
+        profile = g.pop('sql_profile', None)
+        if profile is None:
+            return response
+        
+        endpoint = request.endpoint or 'unmatched'
+        repeated = profile.repeated(current_app.config['SQL_PROFILING_N1_THRESHOLD'])
+        for statement, count in repeated:
+            current_app.logger.warning('Possible N+1 in %s: %d executions of %s', endpoint, count, ' '.join(statement.split())[:300])
+        
+        response.headers.add('Server-Timing', profile.server_timing(repeated))
+        profile_stats.record(endpoint, profile, repeated)
+        return response
+    
+    @staticmethod
+    def report() -> Dict[str, Any]:
+        config = current_app.config
+        return {
+            'mode': config['SQL_PROFILING'],
+            'sample_rate': config['SQL_PROFILING_SAMPLE_RATE'],
+            'n1_threshold': config['SQL_PROFILING_N1_THRESHOLD'],
+            'endpoints': profile_stats.report()
+        }
\ No newline at end of file
@@ -0,0 +1,81 @@
+import re
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+from sqlalchemy import event
+from app import db
+from app.services.owner_service import OwnerService
+from app.services.pet_service import PetService
+from app.services.visit_service import VisitService
+from app.services.vet_service import VetService
+from app.services.pettype_service import PetTypeService
+from app.services.stats_service import StatsService
+from app.services.visit_stats_service import VisitStatsService
+
+# SQLite reports index lookups as "SEARCH <table> ... (<range>)". A "SCAN"
+# reads every row, in table or in index order ("SCAN <table> USING [COVERING]
+# INDEX <index>" has no range either), only the full-text virtual tables
+# answer a SCAN from their own index
+_FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: USING (?:COVERING )?INDEX \w+)?$')
+
+# Service calls that must be answered from indexes, with the (small
+# reference) tables a full scan is tolerated on
+HOT_QUERIES: List[Tuple[str, Callable, Tuple[str, ...]]] = [
+    ('OwnerService.find_by_last_name', lambda: OwnerService.find_by_last_name('Da'), ()),
+    ('OwnerService.search_owners', lambda: OwnerService.search_owners('dav'), ()),
+    ('OwnerService.get_by_id(expand=pets.visits)',
+     lambda: OwnerService.get_by_id(1, {'pets': {'visits': {}}}), ()),
+    ('PetService.get_pets_by_owner', lambda: PetService.get_pets_by_owner(1, expand={'type': {}}), ()),
+    ('PetService.get_pets_by_type', lambda: PetService.get_pets_by_type(1), ()),
+    ('VisitService.get_visits_by_pet', lambda: VisitService.get_visits_by_pet(1), ()),
+    ('VisitService.get_visits_by_date_range',
+     lambda: VisitService.get_visits_by_date_range(date.today() - timedelta(days=7), date.today()), ()),
+    ('VisitService.get_visits_by_date', lambda: VisitService.get_visits_by_date(date.today()), ()),
+    ('VisitService.get_recent_visits', lambda: VisitService.get_recent_visits(30), ()),
+    ('VisitService.search_visits_by_description', lambda: VisitService.search_visits_by_description('rabies'), ()),
+    ('VisitService.get_all(cursor)', lambda: VisitService.get_all(cursor=[date.today(), 1]), ()),
+    ('VetService.find_vets_by_specialty', lambda: VetService.find_vets_by_specialty('surg'), ('specialties',)),
+    ('PetTypeService.has_pets', lambda: PetTypeService.has_pets(1), ()),
+    ('StatsService._compute', lambda: StatsService._compute(date.today()),
+     ('owners', 'pets', 'visits', 'vets', 'specialties', 'pet_types')),
+    ('VisitStatsService.daily', lambda: VisitStatsService.daily(date.today() - timedelta(days=29), date.today()), ()),
+    ('VisitStatsService.by_city',
+     lambda: VisitStatsService.by_city(date.today() - timedelta(days=364), date.today(), limit=20), ()),
+    ('VisitStatsService.year_over_year', lambda: VisitStatsService.year_over_year(3), ()),
+]
+
+def capture_statements(call: Callable) -> List[Tuple[str, Any]]:
+    """Run ``call`` and return the SELECT statements it executed with their parameters"""
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+    
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        call()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return statements
+
+def explain(statement: str, parameters: Any) -> List[str]:
+    """SQLite's EXPLAIN QUERY PLAN for a statement, one line per plan step"""
+    rows = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+    return [row[-1] for row in rows]
+
+def check_hot_queries() -> List[Dict[str, Any]]:
+    """Run every hot query and report its plans and the tables it fully scans"""
+    if db.engine.dialect.name != 'sqlite':
+        raise RuntimeError('Query plan checks need a SQLite database')
+    
+    report = []
+    for name, call, allowed in HOT_QUERIES:
+        for statement, parameters in capture_statements(call):
+            plan = explain(statement, parameters)
+            scans = [
+                match.group(1) for match in map(_FULL_SCAN.match, plan)
+                if match and match.group(1) not in allowed and not match.group(1).startswith('anon_')
+            ]
+            report.append({'query': name, 'statement': statement, 'plan': plan, 'full_scans': scans})
+    db.session.rollback()
+    return report
\ No newline at end of file
@@ -0,0 +1,114 @@
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql import Select
+
+# Requests whose reads may be served by a replica
+SAFE_METHODS = frozenset({'GET', 'HEAD'})
+
+class Replicas:
+    """Replica bind keys of an app and the end of its current lag window"""
+    
+    def __init__(self, keys: List[str], lag_window: float):
+        self.keys = keys
+        self.lag_window = lag_window
+        self.primary_until = 0.0
+        self._next = itertools.cycle(keys)
+        self._lock = threading.Lock()
+    
+    def next_key(self) -> str:
+        with self._lock:
+            return next(self._next)
+    
+    def wrote(self) -> None:
+        """Keep reads on the primary until the replicas have caught up with a write"""
+        self.primary_until = time.monotonic() + self.lag_window
+
+class ReplicaRouter:
+    """Route the reads of GET/HEAD requests to read replicas
+    
+    Each URL in ``SQLALCHEMY_REPLICA_URIS`` becomes a ``replica_<n>`` bind.
+    ``RoutingSession`` sends SELECTs issued while serving a GET or HEAD
+    request to one replica (round robin per request), everything else to
+    the primary:
+    
+    - writes, flushes and requests with other methods,
+    - reads that follow a write in the same session,
+    - any read within ``REPLICA_LAG_WINDOW`` seconds of a write committed
+      by this process,
+    - requests sent with ``X-Read-Primary: 1`` and code inside ``use_primary()``.
+    
+    Without replica URLs every statement goes to the primary.
+    """
+    
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app):
+        app.config.setdefault('SQLALCHEMY_REPLICA_URIS', [])
+        app.config.setdefault('REPLICA_LAG_WINDOW', 5)
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+        keys = []
+        for index, uri in enumerate(app.config['SQLALCHEMY_REPLICA_URIS']):
+            keys.append(f'replica_{index}')
+            binds[keys[-1]] = uri
+        app.config['SQLALCHEMY_BINDS'] = binds
+        app.extensions['replicas'] = Replicas(keys, app.config['REPLICA_LAG_WINDOW'])
+    
+    @staticmethod
+    def read_bind(session) -> Optional[str]:
+        """Bind key of the replica for a read of ``session``, None for the primary"""
+        if not has_request_context() or request.method not in SAFE_METHODS:
+            return None
+        replicas = current_app.extensions.get('replicas')
+        if not replicas or not replicas.keys or session.info.get('wrote') or g.get('read_primary'):
+            return None
+        if request.headers.get('X-Read-Primary') == '1' or time.monotonic() < replicas.primary_until:
+            return None
+        if 'replica' not in g:
+            g.replica = replicas.next_key()
+        return g.replica
+
+@contextmanager
+def use_primary():
+    """Read from the primary inside the block, e.g. right before acting on the result"""
+    previous = g.get('read_primary', False)
+    g.read_primary = True
+    try:
+        yield
+    finally:
+        g.read_primary = previous
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends eligible reads to a replica bind"""
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and isinstance(clause, Select):
+            key = ReplicaRouter.read_bind(self)
+            if key is not None:
+                return self._db.engines[key]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+@event.listens_for(RoutingSession, 'before_flush')
+def _flushing(session, flush_context, instances):
+    # Set before the flush starts, so the reads it issues use the primary too
+    session.info['wrote'] = True
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _executed(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['wrote'] = True
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _committed(session):
+    # ``wrote`` stays set: later reads of the request keep using the primary
+    if session.info.get('wrote'):
+        replicas = current_app.extensions.get('replicas')
+        if replicas is not None and replicas.keys:
+            replicas.wrote()
\ No newline at end of file
@@ -1,29 +1,283 @@
-from typing import List, Optional, Dict, Any
+import base64
+import json
+import math
+from datetime import date, datetime, time, timezone
+import re
+from typing import Callable, Iterator, List, Optional, Dict, Any, Tuple
+from flask import current_app
 from app import db
+from .cache_invalidation import tables_changed
+from .count_service import CountService
+from .existence import existing_ids
 
 class BaseService:
     model = None
     
+    # Relationships (expand paths) the detail representation embeds when the
+    # client does not ask for a specific ``expand``
+    detail_expand = None
+    
+    # Column the cursor pagination mode sorts by before ``id``, and its direction
+    cursor_sort = None
+    cursor_descending = False
+    
     @classmethod
-    def get_all(cls, page: int = 1, per_page: int = 20) -> Dict[str, Any]:
-        """Get all records with pagination"""
-        pagination = cls.model.query.paginate(
-            page=page, per_page=per_page, error_out=False
+    def loader_options(cls, expand: Optional[Dict[str, dict]], model=None) -> List[Any]:
+        """Build eager loading options for the relationships in ``expand``
+        
+        Every level is loaded with ``selectinload``, i.e. one ``IN`` query per
+        relationship level, so the number of statements depends on the depth
+        of ``expand`` and not on the number of rows.
+        """
+        model = model or cls.model
+        options = []
+        for name, subtree in (expand or {}).items():
+            loader = db.selectinload(getattr(model, model.__expandable__[name]))
+            children = cls.loader_options(subtree, model.related_model(name))
+            options.append(loader.options(*children) if children else loader)
+        return options
+    
+    @classmethod
+    def base_query(cls, expand: Optional[Dict[str, dict]] = None):
+        """Query the model with the relationships in ``expand`` eagerly loaded"""
+        query = cls.model.query
+        options = cls.loader_options(expand)
+        return query.options(*options) if options else query
+    
+    @classmethod
+    def cursor_columns(cls) -> List[Any]:
+        """Columns that make up the cursor pagination sort key"""
+        columns = [cls.model.__table__.c.id]
+        if cls.cursor_sort:
+            columns.insert(0, cls.model.__table__.c[cls.cursor_sort])
+        return columns
+    
+    @classmethod
+    def encode_cursor(cls, item) -> str:
+        """Build the opaque cursor pointing just after ``item``"""
+        values = [getattr(item, column.key) for column in cls.cursor_columns()]
+        payload = json.dumps(
+            [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values],
+            separators=(',', ':')
         )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+    
+    @classmethod
+    def decode_cursor(cls, cursor: str) -> List[Any]:
+        """Turn a cursor back into sort key values, an empty cursor starts the first page"""
+        if not cursor:
+            return []
+        
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError):
+            raise ValueError('Malformed cursor')
+        
+        columns = cls.cursor_columns()
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError('Cursor does not match this resource')
+        
+        decoded = []
+        for column, value in zip(columns, values):
+            python_type = column.type.python_type
+            if python_type in (date, datetime):
+                try:
+                    decoded.append(python_type.fromisoformat(value))
+                except (ValueError, TypeError):
+                    raise ValueError('Cursor does not match this resource')
+            elif isinstance(value, python_type) and not isinstance(value, bool):
+                decoded.append(value)
+            else:
+                raise ValueError('Cursor does not match this resource')
+        return decoded
+    
+    @staticmethod
+    def reject_cursor(cursor: Optional[List[Any]]) -> None:
+        """Refuse keyset pagination for queries ordered by relevance
+        
+        ``cursor_query`` replaces the ordering with the cursor columns, which
+        would silently drop the ranking of a full-text search.
+        """
+        if cursor is not None:
+            raise ValueError('Ranked searches are paginated with page, not cursor')
+    
+    @classmethod
+    def paginate_cursor(cls, query, cursor: List[Any], per_page: int = 20,
+                        fields: Optional[Dict[str, dict]] = None,
+                        expand: Optional[Dict[str, dict]] = None,
+                        serializer: Optional[Callable] = None) -> Dict[str, Any]:
+        """Keyset pagination: seek past the cursor instead of using OFFSET
+        
+        One extra row is fetched to compute ``has_next`` and no COUNT is run,
+        so every page costs the same no matter how deep the client scrolls.
+        """
+        items = cls.cursor_query(query, cursor, per_page).all()
+        return cls.cursor_page(items, per_page, serializer or (lambda item: item.to_dict(fields, expand)))
+    
+    @classmethod
+    def cursor_query(cls, query, cursor: List[Any], per_page: int):
+        """``query`` restricted to the rows after ``cursor``, in cursor order, one extra row included"""
+        columns = cls.cursor_columns()
+        if cursor:
+            # (a, id) > (x, y) expanded as a > x OR (a = x AND id > y). The OR
+            # alone is not an index range (SQLite walks the index from the
+            # start), the redundant a >= x bound gives the planners one
+            condition = None
+            for column, value in reversed(list(zip(columns, cursor))):
+                after = column < value if cls.cursor_descending else column > value
+                condition = after if condition is None else db.or_(after, db.and_(column == value, condition))
+            if len(columns) > 1:
+                leading, value = columns[0], cursor[0]
+                condition = db.and_(leading <= value if cls.cursor_descending else leading >= value, condition)
+            query = query.filter(condition)
+        
+        ordering = [column.desc() if cls.cursor_descending else column.asc() for column in columns]
+        return query.order_by(None).order_by(*ordering).limit(per_page + 1)
+    
+    @classmethod
+    def cursor_page(cls, items: List[Any], per_page: int, serializer: Callable) -> Dict[str, Any]:
+        """Envelope of a keyset page fetched by ``cursor_query``"""
+        has_next = len(items) > per_page
+        items = items[:per_page]
         return {
-            'data': [item.to_dict() for item in pagination.items],
-            'total': pagination.total,
-            'pages': pagination.pages,
+            'data': [serializer(item) for item in items],
+            'per_page': per_page,
+            'has_next': has_next,
+            'next_cursor': cls.encode_cursor(items[-1]) if has_next else None
+        }
+    
+    @classmethod
+    def paginate(cls, query, page: int = 1, per_page: int = 20,
+                 fields: Optional[Dict[str, dict]] = None,
+                 expand: Optional[Dict[str, dict]] = None,
+                 cursor: Optional[List[Any]] = None,
+                 serializer: Optional[Callable] = None) -> Dict[str, Any]:
+        """Paginate a query and serialize the page with the given projection
+        
+        Passing a decoded ``cursor`` (an empty list for the first page)
+        switches to keyset pagination. ``total`` comes from CountService and
+        ``total_mode`` says whether it is exact, cached or estimated.
+        ``serializer`` replaces ``to_dict(fields, expand)`` for each item.
+        """
+        if cursor is not None:
+            return cls.paginate_cursor(query, cursor, per_page, fields, expand, serializer)
+        
+        items = query.limit(per_page + 1).offset((page - 1) * per_page).all()
+        total, total_mode = CountService.count(query)
+        return cls.offset_page(items, total, total_mode, page, per_page,
+                               serializer or (lambda item: item.to_dict(fields, expand)))
+    
+    @staticmethod
+    def offset_page(items: List[Any], total: int, total_mode: str, page: int, per_page: int,
+                    serializer: Callable) -> Dict[str, Any]:
+        """Envelope of an offset page fetched with one extra row"""
+        has_next = len(items) > per_page
+        items = items[:per_page]
+        return {
+            'data': [serializer(item) for item in items],
+            'total': total,
+            'total_mode': total_mode,
+            'pages': math.ceil(total / per_page),
             'current_page': page,
             'per_page': per_page,
-            'has_next': pagination.has_next,
-            'has_prev': pagination.has_prev
+            'has_next': has_next,
+            'has_prev': page > 1
         }
     
     @classmethod
-    def get_by_id(cls, id: int) -> Optional[object]:
-        """Get a record by ID"""
-        return cls.model.query.get(id)
+    def get_all(cls, page: int = 1, per_page: int = 20,
+                fields: Optional[Dict[str, dict]] = None,
+                expand: Optional[Dict[str, dict]] = None,
+                cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Get all records with pagination"""
+        return cls.paginate(cls.base_query(expand), page, per_page, fields, expand, cursor)
+    
+    @classmethod
+    def get_by_id(cls, id: int, expand: Optional[Dict[str, dict]] = None) -> Optional[object]:
+        """Get a record by ID, with the relationships in ``expand`` eagerly loaded"""
+        return db.session.get(cls.model, id, options=cls.loader_options(expand))
+    
+    # Async counterparts of the readers, used by the ASGI read path
+    # (app/asgi.py): the same queries executed on an ``AsyncSession``
+    
+    @classmethod
+    async def apaginate(cls, session, query, page: int = 1, per_page: int = 20,
+                        fields: Optional[Dict[str, dict]] = None,
+                        expand: Optional[Dict[str, dict]] = None,
+                        cursor: Optional[List[Any]] = None,
+                        serializer: Optional[Callable] = None) -> Dict[str, Any]:
+        """``paginate`` on an ``AsyncSession``, same envelope"""
+        serializer = serializer or (lambda item: item.to_dict(fields, expand))
+        if cursor is not None:
+            result = await session.execute(cls.cursor_query(query, cursor, per_page).statement)
+            return cls.cursor_page(result.scalars().all(), per_page, serializer)
+        
+        result = await session.execute(query.limit(per_page + 1).offset((page - 1) * per_page).statement)
+        items = result.scalars().all()
+        total, total_mode = await CountService.acount(session, query)
+        return cls.offset_page(items, total, total_mode, page, per_page, serializer)
+    
+    @classmethod
+    async def aget_all(cls, session, page: int = 1, per_page: int = 20,
+                       fields: Optional[Dict[str, dict]] = None,
+                       expand: Optional[Dict[str, dict]] = None,
+                       cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """``get_all`` on an ``AsyncSession``"""
+        return await cls.apaginate(session, cls.base_query(expand), page, per_page, fields, expand, cursor)
+    
+    @classmethod
+    async def aget_by_id(cls, session, id: int, expand: Optional[Dict[str, dict]] = None) -> Optional[object]:
+        """``get_by_id`` on an ``AsyncSession``, ``expand`` loaded eagerly"""
+        return await session.get(cls.model, id, options=cls.loader_options(expand))
+    
+    @classmethod
+    async def asearch(cls, session, filters: Dict[str, Any], page: int = 1, per_page: int = 20,
+                      fields: Optional[Dict[str, dict]] = None,
+                      expand: Optional[Dict[str, dict]] = None,
+                      cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """``search`` on an ``AsyncSession``"""
+        query = cls.apply_filters(cls.base_query(expand), filters)
+        return await cls.apaginate(session, query, page, per_page, fields, expand, cursor)
+    
+    @classmethod
+    def freshness(cls, id: int, expand: Optional[Dict[str, dict]] = None) -> Optional[List[Any]]:
+        """Version of a record and of the related rows ``expand`` embeds, without loading them
+        
+        Runs a single statement returning the record's ``updated_at`` followed
+        by the latest ``updated_at``, the row count and the sum of the ids of
+        every expanded relationship, so edits, additions, removals and swapped
+        many-to-many links all change the result. When a model in the document
+        has fields computed from the current date (``__computed_daily__``) the
+        start of the day is appended too. Returns None when the record does
+        not exist.
+        """
+        root = cls.model
+        columns = [db.select(root.updated_at).where(root.id == id).scalar_subquery()]
+        daily = bool(root.__computed_daily__)
+        
+        def walk(model, joins, tree):
+            nonlocal daily
+            for name, subtree in (tree or {}).items():
+                path = joins + [getattr(model, model.__expandable__[name])]
+                child = model.related_model(name)
+                daily = daily or bool(child.__computed_daily__)
+                for aggregate in (db.func.max(child.updated_at), db.func.count(child.id), db.func.sum(child.id)):
+                    query = db.select(aggregate).select_from(root)
+                    for relationship in path:
+                        query = query.join(relationship)
+                    columns.append(query.where(root.id == id).scalar_subquery())
+                walk(child, path, subtree)
+        
+        walk(root, [], expand)
+        values = list(db.session.execute(db.select(*columns)).one())
+        if values[0] is None:
+            return None
+        if daily:
+            # Local midnight (the computed fields use date.today()) as naive
+            # UTC like updated_at, so it also moves Last-Modified
+            values.append(datetime.combine(date.today(), time.min).astimezone(timezone.utc).replace(tzinfo=None))
+        return values
     
     @classmethod
     def create(cls, data: Dict[str, Any]) -> object:
@@ -31,10 +285,82 @@ class BaseService:
         instance = cls.model(**data)
         return instance.save()
     
+    @classmethod
+    def missing_references(cls, items: List[Tuple[int, Dict[str, Any]]]) -> Dict[int, Dict[str, List[str]]]:
+        """Check the foreign keys of many records with one ``IN`` query per referenced table
+        
+        ``items`` pairs each record with its position in the request; the
+        result maps positions to field errors for ids that do not exist.
+        Ids already checked during the request are not queried again.
+        """
+        errors = {}
+        for foreign_key in cls.model.__table__.foreign_keys:
+            field, target = foreign_key.parent.name, foreign_key.column
+            existing = existing_ids(target.table, (data[field] for _, data in items if data.get(field) is not None))
+            
+            label = cls._label(target.table)
+            for index, data in items:
+                if data.get(field) is not None and data[field] not in existing:
+                    errors.setdefault(index, {})[field] = [f'{label} not found']
+        return errors
+    
+    @classmethod
+    def bulk_create(cls, items: List[Tuple[int, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Insert many validated records in a single transaction
+        
+        Records whose foreign keys do not exist are skipped and reported under
+        ``errors`` by position. The rest are inserted with Core ``executemany``
+        in batches of ``BULK_BATCH_SIZE`` and committed once. ``ids`` lists the
+        new primary keys in request order when the database returns them from
+        a multi-row insert (SQLite), otherwise it is None (MySQL).
+        """
+        errors = cls.missing_references(items)
+        rows = [data for index, data in items if index not in errors]
+        table = cls.model.__table__
+        batch_size = current_app.config.get('BULK_BATCH_SIZE', 1000)
+        returning = db.engine.dialect.insert_executemany_returning
+        
+        ids = [] if returning else None
+        try:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                if returning:
+                    # Not sort_by_parameter_order: without a sentinel column
+                    # SQLAlchemy would send one INSERT per row to keep the
+                    # order. The keys of a multi-row INSERT are assigned in
+                    # increasing row order, so sorting them restores it.
+                    statement = db.insert(table).returning(table.c.id)
+                    ids.extend(sorted(db.session.execute(statement, batch).scalars()))
+                else:
+                    db.session.execute(db.insert(table), batch)
+            if rows:
+                cls.bulk_inserted(rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        # Core statements bypass the ORM flush that reports changed tables
+        if rows:
+            tables_changed({table.name})
+        return {'created': len(rows), 'ids': ids, 'errors': errors}
+    
+    @classmethod
+    def bulk_inserted(cls, rows: List[Dict[str, Any]]) -> None:
+        """Hook run inside the ``bulk_create`` transaction, before it commits"""
+    
+    @staticmethod
+    def _label(table) -> str:
+        """Human name of the model behind a table, e.g. 'Pet type' for pet_types"""
+        for mapper in db.Model.registry.mappers:
+            if mapper.local_table is table:
+                return re.sub(r'(?<!^)(?=[A-Z])', ' ', mapper.class_.__name__).capitalize()
+        return table.name
+    
     @classmethod
     def update(cls, id: int, data: Dict[str, Any]) -> Optional[object]:
         """Update a record by ID"""
-        instance = cls.get_by_id(id)
+        instance = db.session.get(cls.model, id)
         if instance:
             return instance.update(**data)
         return None
@@ -42,34 +368,49 @@ class BaseService:
     @classmethod
     def delete(cls, id: int) -> bool:
         """Delete a record by ID"""
-        instance = cls.get_by_id(id)
+        instance = db.session.get(cls.model, id)
         if instance:
             instance.delete()
             return True
         return False
     
     @classmethod
-    def search(cls, filters: Dict[str, Any], page: int = 1, per_page: int = 20) -> Dict[str, Any]:
+    def search(cls, filters: Dict[str, Any], page: int = 1, per_page: int = 20,
+               fields: Optional[Dict[str, dict]] = None,
+               expand: Optional[Dict[str, dict]] = None,
+               cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
         """Search records with filters"""
-        query = cls.model.query
-        
+        query = cls.apply_filters(cls.base_query(expand), filters)
+        return cls.paginate(query, page, per_page, fields, expand, cursor)
+    
+    @classmethod
+    def apply_filters(cls, query, filters: Dict[str, Any]):
+        """Filter on model attributes: substring match for strings, equality otherwise"""
         for key, value in filters.items():
             if hasattr(cls.model, key) and value is not None:
                 if isinstance(value, str):
                     query = query.filter(getattr(cls.model, key).ilike(f'%{value}%'))
                 else:
                     query = query.filter(getattr(cls.model, key) == value)
+        return query
+    
+    @classmethod
+    def filtered_query(cls, filters: Dict[str, Any], expand: Optional[Dict[str, dict]] = None):
+        """The query behind the list endpoint for the given filters, in a stable order"""
+        return cls.apply_filters(cls.base_query(expand), filters).order_by(cls.model.id)
+    
+    @classmethod
+    def stream(cls, query, fields: Optional[Dict[str, dict]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield the rows of ``query`` as column dicts, fetched in batches
         
-        pagination = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        return {
-            'data': [item.to_dict() for item in pagination.items],
-            'total': pagination.total,
-            'pages': pagination.pages,
-            'current_page': page,
-            'per_page': per_page,
-            'has_next': pagination.has_next,
-            'has_prev': pagination.has_prev
-        }
\ No newline at end of file
+        Only the requested columns are selected and no ORM objects are built;
+        ``yield_per`` fetches ``EXPORT_BATCH_SIZE`` rows at a time through a
+        server-side cursor, so memory does not grow with the result size.
+        """
+        columns = [
+            column for column in cls.model.__table__.columns
+            if fields is None or column.name == 'id' or column.name in fields
+        ]
+        rows = query.with_entities(*columns).yield_per(current_app.config.get('EXPORT_BATCH_SIZE', 1000))
+        for row in rows:
+            yield row._asdict()
\ No newline at end of file
@@ -0,0 +1,37 @@
+from itertools import chain
+from typing import Callable, Iterable, List
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Callbacks notified with the set of table names written by a committed transaction
+_subscribers: List[Callable] = []
+
+def on_tables_changed(callback: Callable) -> Callable:
+    """Register a callback for committed writes, usable as a decorator"""
+    _subscribers.append(callback)
+    return callback
+
+def tables_changed(tables: Iterable[str]) -> None:
+    """Notify subscribers that rows of ``tables`` changed
+    
+    ORM writes are reported automatically after commit; code that writes
+    through Core statements calls this itself once its transaction commits.
+    """
+    tables = set(tables)
+    if tables:
+        for callback in _subscribers:
+            callback(tables)
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changed_tables(session, flush_context):
+    changed = session.info.setdefault('changed_tables', set())
+    for instance in chain(session.new, session.dirty, session.deleted):
+        changed.add(instance.__table__.name)
+
+@event.listens_for(Session, 'after_commit')
+def _notify_changed_tables(session):
+    tables_changed(session.info.pop('changed_tables', ()))
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_tables(session):
+    session.info.pop('changed_tables', None)
\ No newline at end of file
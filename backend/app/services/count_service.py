@@ -0,0 +1,178 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql.util import find_tables
+from app import db
+from app.metrics import cache_lookup
+from .cache_invalidation import on_tables_changed
+
+class CountService:
+    """Totals for paginated responses
+    
+    Three modes produce a total, and the mode is reported with it:
+    
+    - ``exact``: a fresh ``COUNT(*)``
+    - ``cached``: a previous exact count, kept for ``COUNT_CACHE_TTL`` seconds
+      and dropped as soon as a write to one of the counted tables commits
+    - ``estimated``: the row count from table statistics, used for unfiltered
+      counts of tables above ``COUNT_ESTIMATE_THRESHOLD`` rows
+    
+    ``COUNT_STRATEGY`` selects ``exact`` (always count), ``cached`` (never
+    estimate) or ``auto`` (all three). The cache is per process, so other
+    workers see a write once their TTL expires. It holds the
+    ``COUNT_CACHE_SIZE`` most recently used totals, expired ones are dropped
+    when looked up and whenever a new total is stored.
+    """
+    _cache: 'OrderedDict[Any, Tuple[int, str, float, frozenset]]' = OrderedDict()
+    _lock = threading.Lock()
+    # Bumped on every invalidation so a count that raced with a write is not stored
+    _generation = 0
+    
+    @classmethod
+    def count(cls, query) -> Tuple[int, str]:
+        """Return ``(total, mode)`` for an ORM query"""
+        config = current_app.config
+        strategy = config.get('COUNT_STRATEGY', 'auto')
+        statement, tables, table_names, unfiltered = cls._analyze(query)
+        
+        if strategy == 'exact':
+            return cls._exact(query, tables[0] if unfiltered else None), 'exact'
+        
+        key = cls._cache_key(statement)
+        generation = cls._generation
+        cached = cls._get(key, config.get('COUNT_CACHE_TTL', 60))
+        if cached is not None:
+            return cached
+        
+        if unfiltered and strategy == 'auto':
+            estimate = cls.estimate(tables[0].name)
+            if estimate is not None and estimate >= config.get('COUNT_ESTIMATE_THRESHOLD', 1000000):
+                cls._put(key, estimate, 'estimated', table_names, generation)
+                return estimate, 'estimated'
+        
+        total = cls._exact(query, tables[0] if unfiltered else None)
+        cls._put(key, total, 'cached', table_names, generation)
+        return total, 'exact'
+    
+    @classmethod
+    async def acount(cls, session, query) -> Tuple[int, str]:
+        """``count`` for the async read path, the exact counts run on ``session``"""
+        config = current_app.config
+        strategy = config.get('COUNT_STRATEGY', 'auto')
+        statement, tables, table_names, unfiltered = cls._analyze(query)
+        counted = db.select(db.func.count()).select_from(tables[0] if unfiltered else statement.subquery())
+        
+        if strategy == 'exact':
+            return (await session.execute(counted)).scalar(), 'exact'
+        
+        key = cls._cache_key(statement)
+        generation = cls._generation
+        cached = cls._get(key, config.get('COUNT_CACHE_TTL', 60))
+        if cached is not None:
+            return cached
+        
+        if unfiltered and strategy == 'auto':
+            # Blocking but rare: the result is cached like any other total
+            estimate = await asyncio.to_thread(cls.estimate, tables[0].name)
+            if estimate is not None and estimate >= config.get('COUNT_ESTIMATE_THRESHOLD', 1000000):
+                cls._put(key, estimate, 'estimated', table_names, generation)
+                return estimate, 'estimated'
+        
+        total = (await session.execute(counted)).scalar()
+        cls._put(key, total, 'cached', table_names, generation)
+        return total, 'exact'
+    
+    @classmethod
+    def estimate(cls, table_name: str) -> Optional[int]:
+        """Row count from the database statistics, None if unavailable"""
+        dialect = db.engine.dialect.name
+        # A connection of its own: a failure must not roll back the session,
+        # which would expire the rows of the page being serialized
+        try:
+            with db.engine.connect() as connection:
+                if dialect == 'mysql':
+                    return connection.execute(db.text(
+                        'SELECT TABLE_ROWS FROM information_schema.TABLES '
+                        'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table'
+                    ), {'table': table_name}).scalar()
+                if dialect == 'sqlite':
+                    # sqlite_stat1 only exists once ANALYZE has run
+                    stats = connection.execute(db.text(
+                        'SELECT stat FROM sqlite_stat1 WHERE tbl = :table'
+                    ), {'table': table_name}).scalars().all()
+                    return max((int(stat.split()[0]) for stat in stats), default=None)
+        except SQLAlchemyError as e:
+            current_app.logger.debug('No row estimate for %s: %s', table_name, e)
+        return None
+    
+    @classmethod
+    def invalidate(cls, tables) -> None:
+        """Drop cached totals that depend on any of ``tables``"""
+        tables = set(tables)
+        with cls._lock:
+            cls._generation += 1
+            for key in [key for key, entry in cls._cache.items() if entry[3] & tables]:
+                del cls._cache[key]
+    
+    @classmethod
+    def clear(cls) -> None:
+        """Drop every cached total"""
+        with cls._lock:
+            cls._generation += 1
+            cls._cache.clear()
+    
+    @staticmethod
+    def _analyze(query) -> Tuple[Any, List[Any], frozenset, bool]:
+        """Unordered statement of ``query``, its tables and whether it counts a whole table"""
+        statement = query.order_by(None).statement
+        tables = list(dict.fromkeys(find_tables(statement, include_joins=True)))
+        unfiltered = statement.whereclause is None and len(tables) == 1
+        return statement, tables, frozenset(table.name for table in tables), unfiltered
+    
+    @staticmethod
+    def _exact(query, table=None) -> int:
+        if table is not None:
+            return db.session.execute(db.select(db.func.count()).select_from(table)).scalar()
+        return query.order_by(None).count()
+    
+    @staticmethod
+    def _cache_key(statement) -> Tuple[str, str]:
+        compiled = statement.compile(dialect=db.engine.dialect)
+        return str(compiled), repr(sorted(compiled.params.items()))
+    
+    @classmethod
+    def _get(cls, key, ttl: float) -> Optional[Tuple[int, str]]:
+        with cls._lock:
+            entry = cls._cache.get(key)
+            if entry is not None and time.monotonic() - entry[2] > ttl:
+                del cls._cache[key]
+                entry = None
+            elif entry is not None:
+                cls._cache.move_to_end(key)
+        if entry is None:
+            cache_lookup('count', False)
+            return None
+        cache_lookup('count', True)
+        return entry[0], entry[1]
+    
+    @classmethod
+    def _put(cls, key, total: int, mode: str, tables: frozenset, generation: int) -> None:
+        config = current_app.config
+        now = time.monotonic()
+        with cls._lock:
+            if generation != cls._generation:
+                return
+            # Only misses store, each after a COUNT: the sweep costs little next to it
+            ttl = config.get('COUNT_CACHE_TTL', 60)
+            for expired in [stale for stale, entry in cls._cache.items() if now - entry[2] > ttl]:
+                del cls._cache[expired]
+            cls._cache[key] = (total, mode, now, tables)
+            cls._cache.move_to_end(key)
+            while len(cls._cache) > config.get('COUNT_CACHE_SIZE', 1024):
+                cls._cache.popitem(last=False)
+
+on_tables_changed(CountService.invalidate)
\ No newline at end of file
@@ -0,0 +1,38 @@
+from typing import Dict, Iterable, Set
+from flask import g, has_request_context
+from app import db
+
+# Largest IN list sent in one statement
+CHUNK_SIZE = 1000
+
+def existing_ids(table, ids: Iterable[int]) -> Set[int]:
+    """Return the subset of ``ids`` that are primary keys of ``table``
+    
+    Unknown ids are fetched with one ``SELECT id ... WHERE id IN (...)`` per
+    chunk and the answers are memoized for the rest of the request, so the
+    schemas and services of a request can all check the same references
+    without repeating queries. Tables held by a reference cache are answered
+    from memory, reloaded when an id is not there (it may have been created
+    by another process).
+    """
+    from .reference_cache import ReferenceCache
+    
+    ids = set(ids)
+    cache = ReferenceCache.registry.get(table.name)
+    if cache is not None:
+        return ids & cache.snapshot_with('by_id', ids).by_id.keys()
+    
+    known = _memo(table.name)
+    missing = [id for id in ids if id not in known]
+    for start in range(0, len(missing), CHUNK_SIZE):
+        chunk = missing[start:start + CHUNK_SIZE]
+        found = set(db.session.execute(db.select(table.c.id).where(table.c.id.in_(chunk))).scalars())
+        known.update((id, id in found) for id in chunk)
+    return {id for id in ids if known[id]}
+
+def _memo(table_name: str) -> Dict[int, bool]:
+    if not has_request_context():
+        return {}
+    if 'existing_ids' not in g:
+        g.existing_ids = {}
+    return g.existing_ids.setdefault(table_name, {})
\ No newline at end of file
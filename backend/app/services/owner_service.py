@@ -1,47 +1,58 @@
 from typing import List, Optional, Dict, Any
-from app.models.owner import Owner
+from app.models.owner import Owner, owner_search_index
 from .base_service import BaseService
 
 class OwnerService(BaseService):
     model = Owner
+    detail_expand = 'pets'
     
     @classmethod
-    def find_by_last_name(cls, last_name: str) -> List[Owner]:
-        """Find owners by last name"""
-        return cls.model.query.filter(
-            cls.model.last_name.ilike(f'%{last_name}%')
-        ).all()
+    def find_by_last_name(cls, last_name: str, page: int = 1, per_page: int = 20,
+                          fields: Optional[Dict[str, dict]] = None,
+                          expand: Optional[Dict[str, dict]] = None,
+                          cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Find owners whose last name starts with ``last_name``, ignoring case"""
+        pattern = last_name.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        query = cls.base_query(expand).filter(
+            cls.model.last_name.like(f'{pattern}%', escape='\\')
+        ).order_by(cls.model.id)
+        return cls.paginate(query, page, per_page, fields, expand, cursor)
     
     @classmethod
     def get_owner_with_pets(cls, owner_id: int) -> Optional[Owner]:
         """Get owner with all their pets"""
-        return cls.model.query.options(
-            db.joinedload(Owner.pets)
-        ).get(owner_id)
+        return cls.get_by_id(owner_id, {'pets': {}})
     
     @classmethod
-    def search_owners(cls, search_term: str, page: int = 1, per_page: int = 20) -> Dict[str, Any]:
-        """Search owners by name, address, city, or telephone"""
-        query = cls.model.query.filter(
-            db.or_(
-                cls.model.first_name.ilike(f'%{search_term}%'),
-                cls.model.last_name.ilike(f'%{search_term}%'),
-                cls.model.address.ilike(f'%{search_term}%'),
-                cls.model.city.ilike(f'%{search_term}%'),
-                cls.model.telephone.ilike(f'%{search_term}%')
-            )
-        )
+    def filtered_query(cls, filters: Dict[str, Any], expand: Optional[Dict[str, dict]] = None):
+        """Owners matching the ``search`` term (best matches first), or all owners"""
+        search_term = filters.get('search')
+        if search_term:
+            return owner_search_index.search(cls.base_query(expand), search_term, prefix=True)
+        return cls.base_query(expand).order_by(cls.model.id)
+    
+    @classmethod
+    def search_owners(cls, search_term: str, page: int = 1, per_page: int = 20,
+                      fields: Optional[Dict[str, dict]] = None,
+                      expand: Optional[Dict[str, dict]] = None,
+                      cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Search owners by name, address, city, or telephone, best matches first
         
-        pagination = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        Every word must match the start of a word in one of the columns, so
+        ``jo sil`` finds João Silva. Uses the full-text index of the table.
+        The relevance order has no keyset, so ``cursor`` is rejected.
+        """
+        cls.reject_cursor(cursor)
+        query = cls.filtered_query({'search': search_term}, expand)
         
-        return {
-            'data': [item.to_dict() for item in pagination.items],
-            'total': pagination.total,
-            'pages': pagination.pages,
-            'current_page': page,
-            'per_page': per_page,
-            'has_next': pagination.has_next,
-            'has_prev': pagination.has_prev
-        }
\ No newline at end of file
+        return cls.paginate(query, page, per_page, fields, expand, cursor)
+    
+    @classmethod
+    async def asearch_owners(cls, session, search_term: str, page: int = 1, per_page: int = 20,
+                             fields: Optional[Dict[str, dict]] = None,
+                             expand: Optional[Dict[str, dict]] = None,
+                             cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """``search_owners`` on an ``AsyncSession``"""
+        cls.reject_cursor(cursor)
+        query = cls.filtered_query({'search': search_term}, expand)
+        return await cls.apaginate(session, query, page, per_page, fields, expand, cursor)
\ No newline at end of file
@@ -6,43 +6,54 @@ from .base_service import BaseService
 
 class PetService(BaseService):
     model = Pet
+    detail_expand = 'owner,type,visits'
     
     @classmethod
-    def get_pets_by_owner(cls, owner_id: int) -> List[Pet]:
-        """Get all pets for a specific owner"""
-        return cls.model.query.filter_by(owner_id=owner_id).all()
+    def get_pets_by_owner(cls, owner_id: int, page: int = 1, per_page: int = 20,
+                          fields: Optional[Dict[str, dict]] = None,
+                          expand: Optional[Dict[str, dict]] = None,
+                          cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Get the pets of a specific owner"""
+        query = cls.filtered_query({'owner_id': owner_id}, expand)
+        return cls.paginate(query, page, per_page, fields, expand, cursor)
     
     @classmethod
-    def get_pets_by_type(cls, type_id: int) -> List[Pet]:
-        """Get all pets of a specific type"""
-        return cls.model.query.filter_by(type_id=type_id).all()
+    def get_pets_by_type(cls, type_id: int, page: int = 1, per_page: int = 20,
+                         fields: Optional[Dict[str, dict]] = None,
+                         expand: Optional[Dict[str, dict]] = None,
+                         cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Get the pets of a specific type"""
+        query = cls.filtered_query({'type_id': type_id}, expand)
+        return cls.paginate(query, page, per_page, fields, expand, cursor)
     
     @classmethod
     def get_pet_with_visits(cls, pet_id: int) -> Optional[Pet]:
         """Get pet with all visits"""
-        return cls.model.query.options(
-            db.joinedload(Pet.visits),
-            db.joinedload(Pet.owner),
-            db.joinedload(Pet.pet_type)
-        ).get(pet_id)
+        return cls.get_by_id(pet_id, {'visits': {}, 'owner': {}, 'type': {}})
     
     @classmethod
-    def find_pets_by_name(cls, name: str) -> List[Pet]:
-        """Find pets by name"""
-        return cls.model.query.filter(
-            cls.model.name.ilike(f'%{name}%')
-        ).all()
+    def find_pets_by_name(cls, name: str, page: int = 1, per_page: int = 20,
+                          fields: Optional[Dict[str, dict]] = None,
+                          expand: Optional[Dict[str, dict]] = None,
+                          cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Find pets whose name contains ``name``, ignoring case"""
+        query = cls.filtered_query({'name': name}, expand)
+        return cls.paginate(query, page, per_page, fields, expand, cursor)
     
     @classmethod
-    def get_pets_born_after(cls, birth_date: date) -> List[Pet]:
+    def get_pets_born_after(cls, birth_date: date, page: int = 1, per_page: int = 20,
+                            fields: Optional[Dict[str, dict]] = None,
+                            expand: Optional[Dict[str, dict]] = None,
+                            cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
         """Get pets born after a specific date"""
-        return cls.model.query.filter(
-            cls.model.birth_date > birth_date
-        ).all()
+        query = cls.base_query(expand).filter(cls.model.birth_date > birth_date).order_by(cls.model.id)
+        return cls.paginate(query, page, per_page, fields, expand, cursor)
     
     @classmethod
-    def get_pets_born_before(cls, birth_date: date) -> List[Pet]:
+    def get_pets_born_before(cls, birth_date: date, page: int = 1, per_page: int = 20,
+                             fields: Optional[Dict[str, dict]] = None,
+                             expand: Optional[Dict[str, dict]] = None,
+                             cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
         """Get pets born before a specific date"""
-        return cls.model.query.filter(
-            cls.model.birth_date < birth_date
-        ).all()
\ No newline at end of file
+        query = cls.base_query(expand).filter(cls.model.birth_date < birth_date).order_by(cls.model.id)
+        return cls.paginate(query, page, per_page, fields, expand, cursor)
\ No newline at end of file
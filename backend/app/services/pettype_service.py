@@ -1,21 +1,17 @@
 from typing import List, Optional, Dict, Any
+from app import db
+from app.models.pet import Pet
 from app.models.pettype import PetType
-from .base_service import BaseService
+from .reference_cache import ReferenceCache, ReferenceService
 
-class PetTypeService(BaseService):
+class PetTypeService(ReferenceService):
     model = PetType
+    cache = ReferenceCache(PetType)
     
     @classmethod
-    def find_by_name(cls, name: str) -> Optional[PetType]:
-        """Find pet type by exact name"""
-        return cls.model.query.filter_by(name=name).first()
-    
-    @classmethod
-    def search_by_name(cls, search_term: str) -> List[PetType]:
-        """Search pet types by name"""
-        return cls.model.query.filter(
-            cls.model.name.ilike(f'%{search_term}%')
-        ).all()
+    def has_pets(cls, pet_type_id: int) -> bool:
+        """Whether any pet is of this type"""
+        return db.session.query(Pet.query.filter(Pet.type_id == pet_type_id).exists()).scalar()
     
     @classmethod
     def get_pet_types_with_pets(cls) -> List[PetType]:
@@ -0,0 +1,190 @@
+import math
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from flask import current_app
+from app import db
+from app.metrics import cache_lookup
+from app.models.base import BaseModel
+from .base_service import BaseService
+from .cache_invalidation import on_tables_changed
+
+class CachedRecord:
+    """Read-only copy of a row that serializes like its model"""
+    __table__ = None
+    __computed__ = ()
+    __expandable__ = {}
+    
+    to_dict = BaseModel.to_dict
+    
+    def __init__(self, values: Dict[str, Any]):
+        self.__dict__.update(values)
+
+class Snapshot:
+    """Every row of a table at one point in time, indexed by id and by name"""
+    
+    def __init__(self, records: List[CachedRecord]):
+        self.records = records
+        self.by_id = {record.id: record for record in records}
+        self.by_name = {record.name: record for record in records}
+        self.loaded_at = time.monotonic()
+
+class ReferenceCache:
+    """In-memory copy of a small table that is read far more often than written
+    
+    Commits that touch the table (ORM writes report themselves, Core writes
+    call ``tables_changed``) bump ``version`` and drop the snapshot. A load
+    that started before such a write is used for the request that triggered
+    it but never stored, so a stale snapshot cannot outlive a write made by
+    this process. Writes made by other processes are picked up after
+    ``REFERENCE_CACHE_TTL`` seconds, or by the reload of a lookup that
+    misses (once per missing key and TTL).
+    """
+    
+    # Every cache by table name, for warm-up and invalidation
+    registry: Dict[str, 'ReferenceCache'] = {}
+    
+    def __init__(self, model):
+        self.model = model
+        self.record_class = type(f'Cached{model.__name__}', (CachedRecord,), {
+            '__table__': model.__table__,
+            '__computed__': model.__computed__
+        })
+        self.version = 0
+        self._snapshot: Optional[Snapshot] = None
+        # (index, key) -> when a load last found the key missing
+        self._missing: Dict[Tuple[str, Any], float] = {}
+        self._lock = threading.Lock()
+        ReferenceCache.registry[model.__tablename__] = self
+    
+    def snapshot(self) -> Snapshot:
+        """The current snapshot, loaded from the database when missing or expired"""
+        snapshot = self._snapshot
+        if snapshot is None or time.monotonic() - snapshot.loaded_at > current_app.config['REFERENCE_CACHE_TTL']:
+            cache_lookup('reference', False)
+            return self.load()
+        cache_lookup('reference', True)
+        return snapshot
+    
+    def snapshot_with(self, index: str, keys: Iterable[Any]) -> Snapshot:
+        """The current snapshot, reloaded once if ``keys`` are not all in ``index`` (``by_id`` or ``by_name``)
+        
+        Rows created through another process only reach this process's
+        snapshot when it expires, so a lookup that misses is checked against
+        the database before the row is reported missing. A key the database
+        did not have either is not checked again for ``REFERENCE_CACHE_TTL``
+        seconds, so repeated lookups of a bad id cannot reload the table on
+        every request.
+        """
+        ttl = current_app.config['REFERENCE_CACHE_TTL']
+        cached, missing = self._snapshot, self._missing
+        snapshot = self.snapshot()
+        absent = set(keys) - getattr(snapshot, index).keys()
+        if not absent:
+            return snapshot
+        
+        now = time.monotonic()
+        if snapshot is cached and any(now - missing.get((index, key), -math.inf) > ttl for key in absent):
+            snapshot = self.load()
+            absent -= getattr(snapshot, index).keys()
+        if snapshot is not cached:
+            with self._lock:
+                # Not recorded when a write invalidated the cache during the load
+                if missing is self._missing:
+                    for stale in [stale for stale, checked in missing.items() if now - checked > ttl]:
+                        del missing[stale]
+                    missing.update(((index, key), snapshot.loaded_at) for key in absent)
+        return snapshot
+    
+    def load(self) -> Snapshot:
+        """Read the whole table into a new snapshot"""
+        version = self.version
+        table = self.model.__table__
+        rows = db.session.execute(db.select(table).order_by(table.c.id)).mappings()
+        snapshot = Snapshot([self.record_class(dict(row)) for row in rows])
+        with self._lock:
+            if version == self.version:
+                self._snapshot = snapshot
+        return snapshot
+    
+    def invalidate(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._snapshot = None
+            # A local write may have created a key found missing before
+            self._missing = {}
+
+@on_tables_changed
+def _invalidate_reference_caches(tables):
+    for name in tables:
+        cache = ReferenceCache.registry.get(name)
+        if cache is not None:
+            cache.invalidate()
+
+def warm_reference_caches() -> None:
+    """Load every reference cache, meant to run once at startup"""
+    for cache in ReferenceCache.registry.values():
+        cache.load()
+
+class ReferenceService(BaseService):
+    """Service for a reference table whose reads are served by a ReferenceCache
+    
+    Lookups return ``CachedRecord`` copies instead of ORM instances, so
+    callers that need relationships query them explicitly. Writes still go
+    through the ORM and invalidate the cache on commit.
+    """
+    cache: ReferenceCache = None
+    
+    @classmethod
+    def get_by_id(cls, id: int, expand: Optional[Dict[str, dict]] = None) -> Optional[CachedRecord]:
+        """Get a record by ID"""
+        return cls.cache.snapshot_with('by_id', (id,)).by_id.get(id)
+    
+    @classmethod
+    def find_by_name(cls, name: str) -> Optional[CachedRecord]:
+        """Find a record by exact name"""
+        return cls.cache.snapshot_with('by_name', (name,)).by_name.get(name)
+    
+    @classmethod
+    def search_by_name(cls, search_term: str) -> List[CachedRecord]:
+        """Search records by name, case-insensitive like ``ilike``"""
+        term = search_term.lower()
+        return [record for record in cls.cache.snapshot().records if term in record.name.lower()]
+    
+    @classmethod
+    def get_all(cls, page: int = 1, per_page: int = 20,
+                fields: Optional[Dict[str, dict]] = None,
+                expand: Optional[Dict[str, dict]] = None,
+                cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Get all records with pagination"""
+        return cls.paginate_records(cls.cache.snapshot().records, page, per_page, fields, cursor)
+    
+    @classmethod
+    def paginate_records(cls, records: List[CachedRecord], page: int = 1, per_page: int = 20,
+                         fields: Optional[Dict[str, dict]] = None,
+                         cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Same envelopes as ``paginate()``, for records already in memory ordered by id"""
+        if cursor is not None:
+            if cursor:
+                records = [record for record in records if record.id > cursor[0]]
+            items = records[:per_page]
+            has_next = len(records) > per_page
+            return {
+                'data': [item.to_dict(fields) for item in items],
+                'per_page': per_page,
+                'has_next': has_next,
+                'next_cursor': cls.encode_cursor(items[-1]) if has_next else None
+            }
+        
+        start = (page - 1) * per_page
+        total = len(records)
+        return {
+            'data': [item.to_dict(fields) for item in records[start:start + per_page]],
+            'total': total,
+            'total_mode': 'exact',
+            'pages': math.ceil(total / per_page),
+            'current_page': page,
+            'per_page': per_page,
+            'has_next': start + per_page < total,
+            'has_prev': page > 1
+        }
\ No newline at end of file
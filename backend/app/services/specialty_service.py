@@ -1,21 +1,11 @@
 from typing import List, Optional, Dict, Any
+from app import db
 from app.models.specialty import Specialty
-from .base_service import BaseService
+from .reference_cache import ReferenceCache, ReferenceService
 
-class SpecialtyService(BaseService):
+class SpecialtyService(ReferenceService):
     model = Specialty
-    
-    @classmethod
-    def find_by_name(cls, name: str) -> Optional[Specialty]:
-        """Find specialty by exact name"""
-        return cls.model.query.filter_by(name=name).first()
-    
-    @classmethod
-    def search_by_name(cls, search_term: str) -> List[Specialty]:
-        """Search specialties by name"""
-        return cls.model.query.filter(
-            cls.model.name.ilike(f'%{search_term}%')
-        ).all()
+    cache = ReferenceCache(Specialty)
     
     @classmethod
     def get_specialties_with_vets(cls) -> List[Specialty]:
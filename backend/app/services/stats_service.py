@@ -0,0 +1,89 @@
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, Optional, Tuple
+from flask import current_app
+from app import db
+from app.metrics import cache_lookup
+from app.models.owner import Owner
+from app.models.pet import Pet
+from app.models.pettype import PetType
+from app.models.specialty import Specialty
+from app.models.vet import Vet
+from app.models.visit import Visit
+from .cache_invalidation import on_tables_changed
+
+class StatsService:
+    """Dashboard counters computed in two statements and cached
+    
+    The snapshot is kept for ``STATS_CACHE_TTL`` seconds and dropped as soon
+    as a write to one of the counted tables commits in this process. It is
+    also tied to the current date so the visit periods roll over at midnight.
+    """
+    TABLES = frozenset({'owners', 'pets', 'visits', 'vets', 'pet_types', 'specialties'})
+    
+    _cached: Optional[Tuple[date, float, Dict[str, Any]]] = None
+    _lock = threading.Lock()
+    # Bumped on every invalidation so a snapshot that raced with a write is not stored
+    _generation = 0
+    
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        """Entity totals, visits of the current day/week/month and pets per type"""
+        today = date.today()
+        cached = cls._cached
+        if cached is not None and cached[0] == today and time.monotonic() - cached[1] < current_app.config.get('STATS_CACHE_TTL', 30):
+            cache_lookup('stats', True)
+            return cached[2]
+        
+        cache_lookup('stats', False)
+        generation = cls._generation
+        stats = cls._compute(today)
+        with cls._lock:
+            if generation == cls._generation:
+                cls._cached = (today, time.monotonic(), stats)
+        return stats
+    
+    @classmethod
+    def _compute(cls, today: date) -> Dict[str, Any]:
+        week_start = today - timedelta(days=today.weekday())
+        month_start = today.replace(day=1)
+        next_month = (month_start + timedelta(days=32)).replace(day=1)
+        
+        def count(model, *conditions):
+            return db.select(db.func.count()).select_from(model).where(*conditions).scalar_subquery()
+        
+        def visits_between(start, end):
+            return count(Visit, Visit.visit_date >= start, Visit.visit_date < end)
+        
+        totals = db.session.execute(db.select(
+            count(Owner).label('owners'),
+            count(Pet).label('pets'),
+            count(Visit).label('visits'),
+            count(Vet).label('vets'),
+            count(Specialty).label('specialties'),
+            count(PetType).label('pet_types'),
+            visits_between(today, today + timedelta(days=1)).label('visits_today'),
+            visits_between(week_start, week_start + timedelta(days=7)).label('visits_this_week'),
+            visits_between(month_start, next_month).label('visits_this_month')
+        )).one()._asdict()
+        
+        pets_per_type = db.session.execute(
+            db.select(PetType.id, PetType.name, db.func.count(Pet.id).label('pets'))
+            .outerjoin(Pet, Pet.type_id == PetType.id)
+            .group_by(PetType.id, PetType.name)
+        ).all()
+        
+        return {
+            **totals,
+            'pets_per_type': [{'type_id': row.id, 'name': row.name, 'pets': row.pets} for row in sorted(pets_per_type)]
+        }
+    
+    @classmethod
+    def invalidate(cls, tables) -> None:
+        if cls.TABLES & set(tables):
+            with cls._lock:
+                cls._generation += 1
+                cls._cached = None
+
+on_tables_changed(StatsService.invalidate)
\ No newline at end of file
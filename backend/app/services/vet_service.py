@@ -1,11 +1,12 @@
 from typing import List, Optional, Dict, Any
 from app import db
 from app.models.vet import Vet
-from app.models.specialty import Specialty
+from app.models.specialty import Specialty, vet_specialties
 from .base_service import BaseService
 
 class VetService(BaseService):
     model = Vet
+    detail_expand = 'specialties'
     
     @classmethod
     def get_vets_with_specialties(cls) -> List[Vet]:
@@ -17,32 +18,40 @@ class VetService(BaseService):
     @classmethod
     def get_vet_with_specialties(cls, vet_id: int) -> Optional[Vet]:
         """Get a specific vet with specialties"""
-        return cls.model.query.options(
-            db.joinedload(Vet.specialties)
-        ).get(vet_id)
+        return cls.get_by_id(vet_id, {'specialties': {}})
     
     @classmethod
-    def find_vets_by_specialty(cls, specialty_name: str) -> List[Vet]:
+    def find_vets_by_specialty(cls, specialty_name: str, page: int = 1, per_page: int = 20,
+                               fields: Optional[Dict[str, dict]] = None,
+                               expand: Optional[Dict[str, dict]] = None,
+                               cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
         """Find vets by specialty name"""
-        return cls.model.query.join(Vet.specialties).filter(
-            Specialty.name.ilike(f'%{specialty_name}%')
-        ).all()
+        # Resolve the few matching specialties first, then their vets through
+        # the specialty_id index; IN also keeps each vet once
+        specialty_ids = db.select(Specialty.id).where(Specialty.name.ilike(f'%{specialty_name}%'))
+        vet_ids = db.select(vet_specialties.c.vet_id).where(vet_specialties.c.specialty_id.in_(specialty_ids))
+        query = cls.base_query(expand).filter(cls.model.id.in_(vet_ids)).order_by(cls.model.id)
+        return cls.paginate(query, page, per_page, fields, expand, cursor)
     
     @classmethod
-    def find_vets_by_name(cls, search_term: str) -> List[Vet]:
+    def find_vets_by_name(cls, search_term: str, page: int = 1, per_page: int = 20,
+                          fields: Optional[Dict[str, dict]] = None,
+                          expand: Optional[Dict[str, dict]] = None,
+                          cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
         """Find vets by first or last name"""
-        return cls.model.query.filter(
+        query = cls.base_query(expand).filter(
             db.or_(
                 cls.model.first_name.ilike(f'%{search_term}%'),
                 cls.model.last_name.ilike(f'%{search_term}%')
             )
-        ).all()
+        ).order_by(cls.model.id)
+        return cls.paginate(query, page, per_page, fields, expand, cursor)
     
     @classmethod
     def add_specialty_to_vet(cls, vet_id: int, specialty_id: int) -> Optional[Vet]:
         """Add a specialty to a vet"""
         vet = cls.get_by_id(vet_id)
-        specialty = Specialty.query.get(specialty_id)
+        specialty = db.session.get(Specialty, specialty_id)
         
         if vet and specialty and specialty not in vet.specialties:
             vet.specialties.append(specialty)
@@ -54,7 +63,7 @@ class VetService(BaseService):
     def remove_specialty_from_vet(cls, vet_id: int, specialty_id: int) -> Optional[Vet]:
         """Remove a specialty from a vet"""
         vet = cls.get_by_id(vet_id)
-        specialty = Specialty.query.get(specialty_id)
+        specialty = db.session.get(Specialty, specialty_id)
         
         if vet and specialty and specialty in vet.specialties:
             vet.specialties.remove(specialty)
@@ -1,43 +1,128 @@
 from typing import List, Optional, Dict, Any
-from datetime import date
+from datetime import date, timedelta
 from app import db
-from app.models.visit import Visit
+from app.models.visit import Visit, visit_search_index
 from .base_service import BaseService
+from .visit_stats_service import VisitStatsService
 
 class VisitService(BaseService):
     model = Visit
+    detail_expand = 'pet'
+    cursor_sort = 'visit_date'
+    cursor_descending = True
     
     @classmethod
-    def get_visits_by_pet(cls, pet_id: int) -> List[Visit]:
-        """Get all visits for a specific pet"""
-        return cls.model.query.filter_by(pet_id=pet_id).order_by(
-            cls.model.visit_date.desc()
-        ).all()
+    def filtered_query(cls, filters: Dict[str, Any], expand: Optional[Dict[str, dict]] = None):
+        """Visits matching every given filter, newest first or best match first for ``description``
+        
+        Supported filters: ``pet_id``, ``start_date`` with ``end_date`` and
+        the full-text ``description`` search.
+        """
+        query = cls.base_query(expand)
+        if filters.get('pet_id'):
+            query = query.filter(cls.model.pet_id == filters['pet_id'])
+        if filters.get('start_date') and filters.get('end_date'):
+            query = query.filter(cls.model.visit_date.between(filters['start_date'], filters['end_date']))
+        if filters.get('description'):
+            return visit_search_index.search(query, filters['description'])
+        return query.order_by(cls.model.visit_date.desc(), cls.model.id.desc())
     
     @classmethod
-    def get_visits_by_date_range(cls, start_date: date, end_date: date) -> List[Visit]:
-        """Get visits within a date range"""
-        return cls.model.query.filter(
-            cls.model.visit_date.between(start_date, end_date)
-        ).order_by(cls.model.visit_date.desc()).all()
+    def bulk_inserted(cls, rows: List[Dict[str, Any]]) -> None:
+        # Core inserts skip the flush hooks that maintain the rollups
+        VisitStatsService.record_rows(db.session.connection(), rows)
     
     @classmethod
-    def get_visits_by_date(cls, visit_date: date) -> List[Visit]:
-        """Get all visits on a specific date"""
-        return cls.model.query.filter_by(visit_date=visit_date).all()
+    def get_visits_by_pet(cls, pet_id: int, page: int = 1, per_page: int = 20,
+                          fields: Optional[Dict[str, dict]] = None,
+                          expand: Optional[Dict[str, dict]] = None,
+                          cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Get the visits of a specific pet, newest first"""
+        query = cls.filtered_query({'pet_id': pet_id}, expand)
+        return cls.paginate(query, page, per_page, fields, expand, cursor)
     
     @classmethod
-    def get_recent_visits(cls, days: int = 30) -> List[Visit]:
-        """Get visits from the last N days"""
-        from datetime import datetime, timedelta
+    def get_visits_by_date_range(cls, start_date: date, end_date: date, page: int = 1, per_page: int = 20,
+                                 fields: Optional[Dict[str, dict]] = None,
+                                 expand: Optional[Dict[str, dict]] = None,
+                                 cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Get visits within a date range, newest first"""
+        query = cls.filtered_query({'start_date': start_date, 'end_date': end_date}, expand)
+        return cls.paginate(query, page, per_page, fields, expand, cursor)
+    
+    @classmethod
+    def get_visits_by_date(cls, visit_date: date, page: int = 1, per_page: int = 20,
+                           fields: Optional[Dict[str, dict]] = None,
+                           expand: Optional[Dict[str, dict]] = None,
+                           cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Get the visits on a specific date"""
+        return cls.get_visits_by_date_range(visit_date, visit_date, page, per_page, fields, expand, cursor)
+    
+    @classmethod
+    def get_recent_visits(cls, days: int = 30, page: int = 1, per_page: int = 20,
+                          fields: Optional[Dict[str, dict]] = None,
+                          expand: Optional[Dict[str, dict]] = None,
+                          cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Get visits from the last N days, newest first"""
         cutoff_date = date.today() - timedelta(days=days)
-        return cls.model.query.filter(
+        query = cls.base_query(expand).filter(
             cls.model.visit_date >= cutoff_date
-        ).order_by(cls.model.visit_date.desc()).all()
+        ).order_by(cls.model.visit_date.desc(), cls.model.id.desc())
+        return cls.paginate(query, page, per_page, fields, expand, cursor)
+    
+    @classmethod
+    def search_visits_by_description(cls, search_term: str, page: int = 1, per_page: int = 20,
+                                     fields: Optional[Dict[str, dict]] = None,
+                                     expand: Optional[Dict[str, dict]] = None,
+                                     cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Search visits by description, best matches first
+        
+        Words are ANDed, ``"quoted words"`` match a phrase and ``word*`` a
+        prefix. Each result carries a ``snippet`` of its description with the
+        matches highlighted. The relevance order has no keyset, so ``cursor``
+        is rejected.
+        """
+        cls.reject_cursor(cursor)
+        query = visit_search_index.search(cls.base_query(expand), search_term)
+        return cls.paginate(query, page, per_page, fields, expand, cursor, cls.snippet_serializer(search_term, fields, expand))
+    
+    @staticmethod
+    def snippet_serializer(search_term: str, fields: Optional[Dict[str, dict]] = None,
+                           expand: Optional[Dict[str, dict]] = None):
+        """``to_dict`` plus the highlighted ``snippet`` of the description"""
+        terms = visit_search_index.parse(search_term)
+        
+        def serialize(visit):
+            data = visit.to_dict(fields, expand)
+            data['snippet'] = visit_search_index.highlight(visit.description, terms)
+            return data
+        return serialize
+    
+    @classmethod
+    async def aget_visits_by_pet(cls, session, pet_id: int, page: int = 1, per_page: int = 20,
+                                 fields: Optional[Dict[str, dict]] = None,
+                                 expand: Optional[Dict[str, dict]] = None,
+                                 cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """``get_visits_by_pet`` on an ``AsyncSession``"""
+        query = cls.filtered_query({'pet_id': pet_id}, expand)
+        return await cls.apaginate(session, query, page, per_page, fields, expand, cursor)
+    
+    @classmethod
+    async def aget_visits_by_date_range(cls, session, start_date: date, end_date: date, page: int = 1, per_page: int = 20,
+                                        fields: Optional[Dict[str, dict]] = None,
+                                        expand: Optional[Dict[str, dict]] = None,
+                                        cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """``get_visits_by_date_range`` on an ``AsyncSession``"""
+        query = cls.filtered_query({'start_date': start_date, 'end_date': end_date}, expand)
+        return await cls.apaginate(session, query, page, per_page, fields, expand, cursor)
     
     @classmethod
-    def search_visits_by_description(cls, search_term: str) -> List[Visit]:
-        """Search visits by description"""
-        return cls.model.query.filter(
-            cls.model.description.ilike(f'%{search_term}%')
-        ).order_by(cls.model.visit_date.desc()).all()
\ No newline at end of file
+    async def asearch_visits_by_description(cls, session, search_term: str, page: int = 1, per_page: int = 20,
+                                            fields: Optional[Dict[str, dict]] = None,
+                                            expand: Optional[Dict[str, dict]] = None,
+                                            cursor: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """``search_visits_by_description`` on an ``AsyncSession``"""
+        cls.reject_cursor(cursor)
+        query = visit_search_index.search(cls.base_query(expand), search_term)
+        return await cls.apaginate(session, query, page, per_page, fields, expand, cursor,
+                                   cls.snippet_serializer(search_term, fields, expand))
\ No newline at end of file
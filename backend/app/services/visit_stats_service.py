@@ -0,0 +1,288 @@
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.engine import make_url
+from app import db
+from app.models.owner import Owner
+from app.models.pet import Pet
+from app.models.visit import Visit
+from app.models.visit_stats import visit_daily_stats, visit_monthly_stats
+from .existence import CHUNK_SIZE
+
+# (visit date, pet type id, owner city) -> number of visits
+Deltas = Dict[Tuple[date, int, str], int]
+
+# Attributes that move a visit to another rollup row when they change
+TRACKED_ATTRIBUTES = {
+    Visit: ('visit_date', 'pet_id', 'pet'),
+    Pet: ('type_id', 'owner_id', 'pet_type', 'owner'),
+    Owner: ('city',),
+}
+
+# Dialects ``upsert`` can write the deltas for
+UPSERT_DIALECTS = ('mysql', 'postgresql', 'sqlite')
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def next_month(day: date) -> date:
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+class VisitStatsService:
+    """Visit counts per day and month, pet type and owner city
+    
+    The rollup tables are kept current in the transaction of every write:
+    ORM flushes of ``db.session`` that add, move or delete visits (including
+    pet type, pet owner and owner city changes) are handled by the hooks
+    ``init_app`` installs, Core bulk inserts call ``record_rows`` themselves.
+    Counts are applied as deltas with an upsert, so concurrent writers never
+    overwrite each other.
+    The reports only read the rollups.
+    """
+    
+    @staticmethod
+    def init_app(app) -> None:
+        """Check the database can hold the rollups and hook the flushes of ``db.session``
+        
+        An unsupported dialect fails here, at startup, rather than in the
+        middle of the first flush that touches a visit.
+        """
+        dialect = make_url(app.config['SQLALCHEMY_DATABASE_URI']).get_backend_name()
+        if dialect not in UPSERT_DIALECTS:
+            raise RuntimeError(f'visit rollups need an upsert for {dialect}, supported: {", ".join(UPSERT_DIALECTS)}')
+        for name, listener in (('before_flush', _count_visits_before_flush), ('after_flush', _update_visit_stats)):
+            # db.session's factory has a Session subclass of its own, other sessions are not affected
+            if not event.contains(db.session, name, listener):
+                event.listen(db.session, name, listener)
+    
+    @staticmethod
+    def contributions(connection, *conditions) -> Deltas:
+        """Visits per rollup key among the visits matching ``conditions``"""
+        rows = connection.execute(
+            db.select(Visit.visit_date, Pet.type_id, Owner.city, db.func.count())
+            .select_from(Visit)
+            .join(Pet, Pet.id == Visit.pet_id)
+            .join(Owner, Owner.id == Pet.owner_id)
+            .where(*conditions)
+            .group_by(Visit.visit_date, Pet.type_id, Owner.city)
+        )
+        return {(visit_date, type_id, city): visits for visit_date, type_id, city, visits in rows}
+    
+    @classmethod
+    def record_rows(cls, connection, rows: Iterable[Dict[str, Any]]) -> None:
+        """Count visit rows inserted through Core, in the inserting transaction"""
+        visits = Counter((row['visit_date'], row['pet_id']) for row in rows)
+        pet_ids = list({pet_id for _, pet_id in visits})
+        keys = {}
+        for start in range(0, len(pet_ids), CHUNK_SIZE):
+            keys.update((id, (type_id, city)) for id, type_id, city in connection.execute(
+                db.select(Pet.id, Pet.type_id, Owner.city)
+                .join(Owner, Owner.id == Pet.owner_id)
+                .where(Pet.id.in_(pet_ids[start:start + CHUNK_SIZE]))
+            ))
+        
+        deltas: Deltas = Counter()
+        for (visit_date, pet_id), count in visits.items():
+            deltas[(visit_date, *keys[pet_id])] += count
+        cls.apply(connection, deltas)
+    
+    @classmethod
+    def apply(cls, connection, deltas: Deltas) -> None:
+        """Add ``deltas`` to the daily and monthly rollups"""
+        monthly: Deltas = Counter()
+        for (day, type_id, city), count in deltas.items():
+            monthly[(month_start(day), type_id, city)] += count
+        
+        for table, period_column, counts in ((visit_daily_stats, 'stat_date', deltas),
+                                             (visit_monthly_stats, 'stat_month', monthly)):
+            # Sorted so concurrent transactions lock rows in the same order
+            rows = [
+                {period_column: period, 'pet_type_id': type_id, 'city': city, 'visits': count}
+                for (period, type_id, city), count in sorted(counts.items()) if count
+            ]
+            if rows:
+                connection.execute(cls.upsert(table, connection.dialect.name), rows)
+    
+    @staticmethod
+    def upsert(table, dialect: str):
+        """INSERT that adds ``visits`` to the existing row of the same key"""
+        if dialect == 'mysql':
+            statement = mysql.insert(table)
+            return statement.on_duplicate_key_update(visits=table.c.visits + statement.inserted.visits)
+        if dialect in ('sqlite', 'postgresql'):
+            statement = (sqlite if dialect == 'sqlite' else postgresql).insert(table)
+            return statement.on_conflict_do_update(
+                index_elements=[column.name for column in table.primary_key],
+                set_={'visits': table.c.visits + statement.excluded.visits}
+            )
+        # Unreachable through the app, init_app refuses these databases
+        raise NotImplementedError(f'visit rollups need an upsert for {dialect}')
+    
+    @classmethod
+    def backfill(cls, engine, first: date, last: date, echo: Callable[[str], None] = print) -> None:
+        """Rebuild the rollups of the months from ``first`` to ``last``
+        
+        Each month is recomputed from ``visits`` in its own transaction, so
+        the command can be interrupted and rerun, and live writes only wait
+        for the month being rebuilt.
+        """
+        month = month_start(first)
+        while month <= last:
+            end = next_month(month)
+            with engine.begin() as connection:
+                connection.execute(db.delete(visit_daily_stats).where(
+                    visit_daily_stats.c.stat_date >= month, visit_daily_stats.c.stat_date < end))
+                connection.execute(db.insert(visit_daily_stats).from_select(
+                    ['stat_date', 'pet_type_id', 'city', 'visits'],
+                    db.select(Visit.visit_date, Pet.type_id, Owner.city, db.func.count())
+                    .select_from(Visit)
+                    .join(Pet, Pet.id == Visit.pet_id)
+                    .join(Owner, Owner.id == Pet.owner_id)
+                    .where(Visit.visit_date >= month, Visit.visit_date < end)
+                    .group_by(Visit.visit_date, Pet.type_id, Owner.city)
+                ))
+                connection.execute(db.delete(visit_monthly_stats).where(visit_monthly_stats.c.stat_month == month))
+                connection.execute(db.insert(visit_monthly_stats).from_select(
+                    ['stat_month', 'pet_type_id', 'city', 'visits'],
+                    db.select(db.literal(month, db.Date), visit_daily_stats.c.pet_type_id, visit_daily_stats.c.city,
+                              db.func.sum(visit_daily_stats.c.visits))
+                    .where(visit_daily_stats.c.stat_date >= month, visit_daily_stats.c.stat_date < end)
+                    .group_by(visit_daily_stats.c.pet_type_id, visit_daily_stats.c.city)
+                ))
+            echo(f'{month:%Y-%m} rebuilt')
+            month = end
+    
+    @staticmethod
+    def _filters(table, pet_type_id: Optional[int], city: Optional[str]) -> List[Any]:
+        conditions = [table.c.visits > 0]
+        if pet_type_id is not None:
+            conditions.append(table.c.pet_type_id == pet_type_id)
+        if city:
+            conditions.append(table.c.city == city)
+        return conditions
+    
+    @classmethod
+    def daily(cls, start: date, end: date, pet_type_id: Optional[int] = None,
+              city: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Visits per day between ``start`` and ``end`` inclusive, days without visits omitted"""
+        table = visit_daily_stats
+        rows = db.session.execute(
+            db.select(table.c.stat_date, db.func.sum(table.c.visits))
+            .where(table.c.stat_date.between(start, end), *cls._filters(table, pet_type_id, city))
+            .group_by(table.c.stat_date)
+            .order_by(table.c.stat_date)
+        )
+        return [{'date': day.isoformat(), 'visits': int(visits)} for day, visits in rows]
+    
+    @classmethod
+    def totals_by(cls, column: str, start: date, end: date, pet_type_id: Optional[int] = None,
+                  city: Optional[str] = None) -> Counter:
+        """Visits between ``start`` and ``end`` inclusive grouped by ``pet_type_id`` or ``city``
+        
+        Whole months in the range are read from the monthly rollup and only
+        the partial months at either end from the daily one, so long ranges
+        stay cheap.
+        """
+        first_full = month_start(start) if start.day == 1 else next_month(start)
+        last_full = month_start(end + timedelta(days=1))
+        totals: Counter = Counter()
+        
+        daily, monthly = visit_daily_stats, visit_monthly_stats
+        if first_full < last_full:
+            totals.update(dict(db.session.execute(
+                db.select(monthly.c[column], db.func.sum(monthly.c.visits))
+                .where(monthly.c.stat_month >= first_full, monthly.c.stat_month < last_full,
+                       *cls._filters(monthly, pet_type_id, city))
+                .group_by(monthly.c[column])
+            ).all()))
+            edges = db.or_(daily.c.stat_date.between(start, first_full - timedelta(days=1)),
+                           daily.c.stat_date.between(last_full, end))
+        else:
+            edges = daily.c.stat_date.between(start, end)
+        
+        totals.update(dict(db.session.execute(
+            db.select(daily.c[column], db.func.sum(daily.c.visits))
+            .where(edges, *cls._filters(daily, pet_type_id, city))
+            .group_by(daily.c[column])
+        ).all()))
+        return totals
+    
+    @classmethod
+    def by_pet_type(cls, start: date, end: date, city: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Visits per pet type between ``start`` and ``end``, busiest first"""
+        from .pettype_service import PetTypeService
+        
+        types = PetTypeService.cache.snapshot().by_id
+        totals = cls.totals_by('pet_type_id', start, end, city=city)
+        return [
+            {'type_id': type_id, 'name': types[type_id].name if type_id in types else None, 'visits': int(visits)}
+            for type_id, visits in sorted(totals.items(), key=lambda item: (-item[1], item[0])) if visits
+        ]
+    
+    @classmethod
+    def by_city(cls, start: date, end: date, pet_type_id: Optional[int] = None,
+                limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Visits per owner city between ``start`` and ``end``, busiest first"""
+        totals = cls.totals_by('city', start, end, pet_type_id=pet_type_id)
+        ranked = sorted(((city, visits) for city, visits in totals.items() if visits), key=lambda item: (-item[1], item[0]))
+        return [{'city': city, 'visits': int(visits)} for city, visits in ranked[:limit]]
+    
+    @classmethod
+    def year_over_year(cls, years: int = 3, pet_type_id: Optional[int] = None,
+                       city: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Visits per month of each of the last ``years`` years, current year last"""
+        current = date.today().year
+        table = visit_monthly_stats
+        rows = db.session.execute(
+            db.select(table.c.stat_month, db.func.sum(table.c.visits))
+            .where(table.c.stat_month >= date(current - years + 1, 1, 1), *cls._filters(table, pet_type_id, city))
+            .group_by(table.c.stat_month)
+        )
+        series = {year: [0] * 12 for year in range(current - years + 1, current + 1)}
+        for month, visits in rows:
+            if month.year in series:
+                series[month.year][month.month - 1] = int(visits)
+        return [{'year': year, 'months': months, 'total': sum(months)} for year, months in series.items()]
+
+def _changed_visit_conditions(session) -> List[Any]:
+    """Conditions selecting the stored visits a flush is about to move or delete"""
+    ids = {Visit: set(), Pet: set(), Owner: set()}
+    for instance in session.dirty:
+        attributes = TRACKED_ATTRIBUTES.get(type(instance))
+        if attributes and instance.id is not None:
+            state = db.inspect(instance)
+            if any(state.attrs[name].history.has_changes() for name in attributes):
+                ids[type(instance)].add(instance.id)
+    for instance in session.deleted:
+        if type(instance) in ids and instance.id is not None:
+            ids[type(instance)].add(instance.id)
+    
+    conditions = []
+    if ids[Visit]:
+        conditions.append(Visit.id.in_(ids[Visit]))
+    if ids[Pet]:
+        conditions.append(Visit.pet_id.in_(ids[Pet]))
+    if ids[Owner]:
+        conditions.append(Pet.owner_id.in_(ids[Owner]))
+    return conditions
+
+def _count_visits_before_flush(session, flush_context, instances):
+    conditions = _changed_visit_conditions(session)
+    before = VisitStatsService.contributions(session.connection(), db.or_(*conditions)) if conditions else {}
+    # Always replaced, so a failed flush never leaks its counts into the next one
+    session.info['visit_stats'] = (conditions, before)
+
+def _update_visit_stats(session, flush_context):
+    conditions, before = session.info.pop('visit_stats', ([], {}))
+    new_ids = [instance.id for instance in session.new if isinstance(instance, Visit)]
+    if new_ids:
+        conditions = conditions + [Visit.id.in_(new_ids)]
+    if not conditions:
+        return
+    
+    connection = session.connection()
+    deltas = Counter(VisitStatsService.contributions(connection, db.or_(*conditions)))
+    deltas.subtract(before)
+    VisitStatsService.apply(connection, deltas)
\ No newline at end of file
@@ -0,0 +1,603 @@
+#!/usr/bin/env python3
+"""Benchmark every API route on a seeded dataset
+
+Seeds the database with benchmarks/seed.py when it does not hold the
+requested scale (only an empty database or one seeded before, others need
+``--reseed``), then sends ``--requests`` requests per route shape (plain
+lists, searches, expands, cursor and deep offset pages, detail reads,
+stats) from ``--concurrency`` threads, through the Flask test client,
+a real HTTP server or both. Reports p50/p95/p99 latency, throughput and the
+SQL statements and database time of each route (from the ``Server-Timing``
+header of the SQL profiler), and saves everything as JSON under
+benchmarks/results so runs can be compared.
+    
+    python benchmarks/api_routes.py [--owners 10000] [--client test|http|both] [--writes] [--compare results/old.json]
+
+The HTTP client starts a threaded werkzeug server in process, or targets
+an already running server with ``--url`` (gunicorn, uvicorn), which must
+use the same ``--database-url``. Query counts of an external server need
+SQL_PROFILING=all in its environment.
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Every request reports its statements, read before the app config is imported
+os.environ.setdefault('SQL_PROFILING', 'all')
+
+import seed as dataset
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Endpoints that are not part of the API
+IGNORED_ENDPOINTS = ('static', 'flasgger.')
+
+# Marks the names of the rows the write routes create
+MARKER = 'Benchmark'
+
+class Scenario:
+    """One request shape of an endpoint
+    
+    ``path`` and ``body`` build request number ``i`` from a random stream
+    seeded by the scenario name and ``i``, so every run sends the same
+    requests. Creates keep the ids they get back under ``created`` for the
+    updates and deletes that follow.
+    """
+    
+    def __init__(self, name: str, endpoint: str, path: Callable[[random.Random, int], str],
+                 method: str = 'GET', body: Optional[Callable[[random.Random, int], Any]] = None,
+                 expect: Tuple[int, ...] = (200,), auth: bool = False, heavy: bool = False,
+                 created: Optional[str] = None, requests: Optional[Callable[[], int]] = None):
+        self.name = name
+        self.endpoint = endpoint
+        self.path = path
+        self.method = method
+        self.body = body
+        self.expect = expect
+        self.auth = auth
+        self.heavy = heavy
+        self.created = created
+        self.requests = requests
+    
+    @property
+    def write(self) -> bool:
+        return self.method != 'GET'
+
+class Dataset:
+    """Id ranges and sample values of the seeded database"""
+    
+    def __init__(self):
+        from app import db
+        from app.services.owner_service import OwnerService
+        from app.services.pet_service import PetService
+        from app.services.visit_service import VisitService
+        
+        def scalar(sql):
+            return db.session.execute(db.text(sql)).scalar()
+        
+        self.max_ids = {
+            table: scalar(f'SELECT MAX(id) FROM {table}') or 0
+            for table in ('owners', 'pets', 'visits', 'vets', 'specialties', 'pet_types')
+        }
+        self.last_names = db.session.execute(db.text(
+            'SELECT DISTINCT last_name FROM owners ORDER BY last_name LIMIT 50')).scalars().all()
+        self.cities = db.session.execute(db.text(
+            'SELECT DISTINCT city FROM owners ORDER BY city LIMIT 50')).scalars().all()
+        self.pet_names = db.session.execute(db.text(
+            'SELECT DISTINCT name FROM pets ORDER BY name LIMIT 50')).scalars().all()
+        last_visit = scalar('SELECT MAX(visit_date) FROM visits')
+        self.last_visit = datetime.strptime(str(last_visit), '%Y-%m-%d').date()
+        
+        # Keyset cursors halfway through each list
+        self.middle_cursors = {}
+        for name, service in (('owners', OwnerService), ('pets', PetService), ('visits', VisitService)):
+            item = db.session.get(service.model, max(1, self.max_ids[name] // 2))
+            self.middle_cursors[name] = service.encode_cursor(item) if item is not None else ''
+        db.session.remove()
+        
+        # Ids returned by the create routes, by table
+        self.created: Dict[str, List[int]] = {table: [] for table in self.max_ids}
+        self.lock = threading.Lock()
+    
+    def id(self, table: str, rng: random.Random) -> int:
+        return rng.randint(1, max(1, self.max_ids[table]))
+    
+    def date_range(self, days: int) -> str:
+        return f'start_date={self.last_visit - timedelta(days=days - 1)}&end_date={self.last_visit}'
+    
+    def take(self, table: str, i: int, pop: bool = False) -> int:
+        with self.lock:
+            created = self.created[table]
+            if pop:
+                return created.pop()
+            return created[i % len(created)]
+
+def read_scenarios(data: Dataset) -> List[Scenario]:
+    def fixed(path):
+        return lambda rng, i: path
+    
+    def pages(table):
+        # Offset page halfway through the table, the cost OFFSET pagination grows with
+        return max(1, data.max_ids[table] // 20 // 2)
+    
+    recent_days = (datetime.now().date() - data.last_visit).days + 30
+    return [
+        Scenario('health', 'health_check', fixed('/health')),
+        Scenario('health pool', 'pool_health', fixed('/health/pool')),
+        Scenario('health sql', 'sql_health', fixed('/health/sql')),
+        Scenario('metrics', 'prometheus_metrics', fixed('/metrics'), expect=(200, 501)),
+        Scenario('api docs', 'api_docs', fixed('/api')),
+        Scenario('login', 'auth.login', fixed('/api/auth/login'), method='POST',
+                 body=lambda rng, i: {'username': 'admin', 'password': 'admin123'}),
+        Scenario('auth protected', 'auth.protected', fixed('/api/auth/protected'), auth=True),
+        Scenario('auth user', 'auth.get_current_user', fixed('/api/auth/user'), auth=True),
+        
+        Scenario('owners', 'owner.get_owners', fixed('/api/owners')),
+        Scenario('owners per_page=100', 'owner.get_owners', fixed('/api/owners?per_page=100')),
+        Scenario('owners expand=pets', 'owner.get_owners', fixed('/api/owners?expand=pets')),
+        Scenario('owners fields', 'owner.get_owners', fixed('/api/owners?fields=id,first_name,last_name')),
+        Scenario('owners deep page', 'owner.get_owners', fixed(f"/api/owners?page={pages('owners')}")),
+        Scenario('owners cursor', 'owner.get_owners', fixed('/api/owners?cursor=')),
+        Scenario('owners deep cursor', 'owner.get_owners',
+                 fixed(f"/api/owners?cursor={data.middle_cursors['owners']}")),
+        Scenario('owners search', 'owner.get_owners',
+                 lambda rng, i: f'/api/owners?search={quote(rng.choice(data.last_names))}'),
+        Scenario('owners search city', 'owner.get_owners',
+                 lambda rng, i: f'/api/owners?search={quote(rng.choice(data.cities))}'),
+        Scenario('owner', 'owner.get_owner', lambda rng, i: f"/api/owners/{data.id('owners', rng)}"),
+        Scenario('owner fields', 'owner.get_owner',
+                 lambda rng, i: f"/api/owners/{data.id('owners', rng)}?fields=id,last_name"),
+        Scenario('owners by last name', 'owner.find_owners_by_lastname',
+                 lambda rng, i: f'/api/owners/search/lastname/{quote(rng.choice(data.last_names))}'),
+        Scenario('owners export', 'owner.export_owners', fixed('/api/owners/export'), heavy=True),
+        Scenario('owners export csv', 'owner.export_owners', fixed('/api/owners/export?format=csv'), heavy=True),
+        
+        Scenario('pets', 'pet.get_pets', fixed('/api/pets')),
+        Scenario('pets expand', 'pet.get_pets', fixed('/api/pets?expand=owner,type')),
+        Scenario('pets deep page', 'pet.get_pets', fixed(f"/api/pets?page={pages('pets')}")),
+        Scenario('pets deep cursor', 'pet.get_pets', fixed(f"/api/pets?cursor={data.middle_cursors['pets']}")),
+        Scenario('pets by name', 'pet.get_pets', lambda rng, i: f'/api/pets?name={quote(rng.choice(data.pet_names))}'),
+        Scenario('pets by owner_id', 'pet.get_pets', lambda rng, i: f"/api/pets?owner_id={data.id('owners', rng)}"),
+        Scenario('pets by type_id', 'pet.get_pets', lambda rng, i: f"/api/pets?type_id={data.id('pet_types', rng)}"),
+        Scenario('pet', 'pet.get_pet', lambda rng, i: f"/api/pets/{data.id('pets', rng)}"),
+        Scenario('pet expand visits', 'pet.get_pet', lambda rng, i: f"/api/pets/{data.id('pets', rng)}?expand=visits"),
+        Scenario('pets of owner', 'pet.get_pets_by_owner', lambda rng, i: f"/api/pets/owner/{data.id('owners', rng)}"),
+        Scenario('pets export', 'pet.export_pets', fixed('/api/pets/export'), heavy=True),
+        
+        Scenario('visits', 'visit.get_visits', fixed('/api/visits')),
+        Scenario('visits expand=pet', 'visit.get_visits', fixed('/api/visits?expand=pet')),
+        Scenario('visits deep page', 'visit.get_visits', fixed(f"/api/visits?page={pages('visits')}")),
+        Scenario('visits deep cursor', 'visit.get_visits',
+                 fixed(f"/api/visits?cursor={data.middle_cursors['visits']}")),
+        Scenario('visits by pet_id', 'visit.get_visits', lambda rng, i: f"/api/visits?pet_id={data.id('pets', rng)}"),
+        Scenario('visits date range', 'visit.get_visits', fixed(f'/api/visits?{data.date_range(30)}')),
+        Scenario('visits description', 'visit.get_visits',
+                 lambda rng, i: f"/api/visits?description={quote(rng.choice(('vaccination', 'rabies', 'dental', 'castração')))}"),
+        Scenario('visit', 'visit.get_visit', lambda rng, i: f"/api/visits/{data.id('visits', rng)}"),
+        Scenario('visits of pet', 'visit.get_visits_by_pet', lambda rng, i: f"/api/visits/pet/{data.id('pets', rng)}"),
+        Scenario('visits recent', 'visit.get_recent_visits', fixed(f'/api/visits/recent?days={recent_days}')),
+        Scenario('visits export', 'visit.export_visits', fixed(f'/api/visits/export?{data.date_range(30)}'), heavy=True),
+        
+        Scenario('vets', 'vet.get_vets', fixed('/api/vets')),
+        Scenario('vets expand', 'vet.get_vets', fixed('/api/vets?expand=specialties')),
+        Scenario('vets by specialty', 'vet.get_vets', fixed(f'/api/vets?specialty={dataset.SPECIALTIES[1]}')),
+        Scenario('vet', 'vet.get_vet', lambda rng, i: f"/api/vets/{data.id('vets', rng)}"),
+        Scenario('specialties', 'specialty.get_specialties', fixed('/api/specialties')),
+        Scenario('specialty', 'specialty.get_specialty', lambda rng, i: f"/api/specialties/{data.id('specialties', rng)}"),
+        Scenario('pet types', 'pettype.get_pet_types', fixed('/api/pet-types')),
+        Scenario('pet type', 'pettype.get_pet_type', lambda rng, i: f"/api/pet-types/{data.id('pet_types', rng)}"),
+        
+        Scenario('stats', 'stats.get_stats', fixed('/api/stats')),
+        Scenario('stats daily', 'stats.get_daily_visits', fixed(f'/api/stats/visits/daily?{data.date_range(90)}')),
+        Scenario('stats daily city', 'stats.get_daily_visits',
+                 lambda rng, i: f'/api/stats/visits/daily?{data.date_range(90)}&city={quote(rng.choice(data.cities))}'),
+        Scenario('stats by city', 'stats.get_visits_by_city', fixed(f'/api/stats/visits/by-city?{data.date_range(365)}')),
+        Scenario('stats by type', 'stats.get_visits_by_pet_type', fixed(f'/api/stats/visits/by-type?{data.date_range(365)}')),
+        Scenario('stats yearly', 'stats.get_visits_year_over_year', fixed('/api/stats/visits/yearly?years=3'))
+    ]
+
+def write_scenarios(data: Dataset) -> List[Scenario]:
+    """Create, update and delete cycles that leave the dataset as they found it
+    
+    The bulk routes insert rows that are not deleted through the API, they
+    are removed by ``cleanup`` at the end of the run.
+    """
+    visit_date = str(data.last_visit)
+    
+    def owner(rng, i):
+        return {'first_name': MARKER, 'last_name': f'{MARKER}{i}', 'address': f'{i} Rua das Flores',
+                'city': rng.choice(data.cities), 'telephone': f'55{i:08d}'}
+    
+    def created(table):
+        return lambda rng, i: data.take(table, i)
+    
+    def deleted(table):
+        return lambda rng, i: data.take(table, i, pop=True)
+    
+    def remaining(table):
+        return lambda: len(data.created[table])
+    
+    scenarios = []
+    for table, url, endpoint, body in (
+        ('pet_types', '/api/pet-types', 'pettype', lambda rng, i: {'name': f'{MARKER} type {i}'}),
+        ('specialties', '/api/specialties', 'specialty', lambda rng, i: {'name': f'{MARKER} specialty {i}'}),
+        ('vets', '/api/vets', 'vet', lambda rng, i: {'first_name': MARKER, 'last_name': f'{MARKER}{i}'}),
+        ('owners', '/api/owners', 'owner', owner),
+        ('pets', '/api/pets', 'pet', lambda rng, i: {
+            'name': f'{MARKER}{i}', 'birth_date': '2020-01-01',
+            'owner_id': data.take('owners', i), 'type_id': data.id('pet_types', rng)}),
+        ('visits', '/api/visits', 'visit', lambda rng, i: {
+            'visit_date': visit_date, 'description': f'{MARKER} visit {i}', 'pet_id': data.take('pets', i)})
+    ):
+        singular = endpoint if endpoint != 'pettype' else 'pet_type'
+        scenarios.append(Scenario(f'create {singular}', f'{endpoint}.create_{singular}', lambda rng, i, url=url: url,
+                                  method='POST', body=body, expect=(201,), created=table))
+    
+    scenarios += [
+        Scenario('bulk owners x100', 'owner.bulk_create_owners', lambda rng, i: '/api/owners/bulk', method='POST',
+                 body=lambda rng, i: [owner(rng, i * 100 + j) for j in range(100)], expect=(201,)),
+        Scenario('bulk pets x100', 'pet.bulk_create_pets', lambda rng, i: '/api/pets/bulk', method='POST',
+                 body=lambda rng, i: [{'name': f'{MARKER}{j}', 'birth_date': '2020-01-01', 'owner_id': data.id('owners', rng),
+                                       'type_id': data.id('pet_types', rng)} for j in range(100)], expect=(201,)),
+        Scenario('bulk visits x100', 'visit.bulk_create_visits', lambda rng, i: '/api/visits/bulk', method='POST',
+                 body=lambda rng, i: [{'visit_date': visit_date, 'description': f'{MARKER} visit {j}',
+                                       'pet_id': data.id('pets', rng)} for j in range(100)], expect=(201,)),
+        Scenario('add vet specialty', 'vet.add_specialty_to_vet',
+                 lambda rng, i: f"/api/vets/{data.take('vets', i)}/specialties", method='POST',
+                 body=lambda rng, i: {'specialty_id': data.take('specialties', i)}, expect=(200, 201),
+                 requests=remaining('vets')),
+        Scenario('remove vet specialty', 'vet.remove_specialty_from_vet',
+                 lambda rng, i: f"/api/vets/{data.take('vets', i)}/specialties/{data.take('specialties', i)}",
+                 method='DELETE', requests=remaining('vets'))
+    ]
+    for table, url, endpoint, body in (
+        ('owners', '/api/owners', 'owner', lambda rng, i: {'city': rng.choice(data.cities)}),
+        ('pets', '/api/pets', 'pet', lambda rng, i: {'name': f'{MARKER}{i}u'}),
+        ('visits', '/api/visits', 'visit', lambda rng, i: {'description': f'{MARKER} visit {i} updated'}),
+        ('vets', '/api/vets', 'vet', lambda rng, i: {'last_name': f'{MARKER}{i}u'}),
+        ('specialties', '/api/specialties', 'specialty', lambda rng, i: {'name': f'{MARKER} specialty {i}u'}),
+        ('pet_types', '/api/pet-types', 'pettype', lambda rng, i: {'name': f'{MARKER} type {i}u'})
+    ):
+        singular = endpoint if endpoint != 'pettype' else 'pet_type'
+        scenarios.append(Scenario(f'update {singular}', f'{endpoint}.update_{singular}',
+                                  lambda rng, i, url=url, table=table: f'{url}/{data.take(table, i)}',
+                                  method='PUT', body=body, requests=remaining(table)))
+    # Deletes in dependency order, each consumes the ids its create returned
+    for table, url, endpoint in (('visits', '/api/visits', 'visit'), ('pets', '/api/pets', 'pet'),
+                                 ('owners', '/api/owners', 'owner'), ('vets', '/api/vets', 'vet'),
+                                 ('specialties', '/api/specialties', 'specialty'),
+                                 ('pet_types', '/api/pet-types', 'pettype')):
+        singular = endpoint if endpoint != 'pettype' else 'pet_type'
+        scenarios.append(Scenario(f'delete {singular}', f'{endpoint}.delete_{singular}',
+                                  lambda rng, i, url=url, table=table: f'{url}/{deleted(table)(rng, i)}',
+                                  method='DELETE', requests=remaining(table)))
+    return scenarios
+
+def cleanup(data: Dataset) -> None:
+    """Delete what the write routes left above the seeded ids and rebuild the rollups they touched"""
+    from app import db
+    from app.models.specialty import vet_specialties
+    from app.services.visit_stats_service import VisitStatsService
+    
+    with db.engine.begin() as connection:
+        connection.execute(db.delete(vet_specialties).where(
+            (vet_specialties.c.vet_id > data.max_ids['vets']) | (vet_specialties.c.specialty_id > data.max_ids['specialties'])))
+        for table in ('visits', 'pets', 'owners', 'vets', 'specialties', 'pet_types'):
+            connection.execute(db.text(f'DELETE FROM {table} WHERE id > :id'), {'id': data.max_ids[table]})
+    VisitStatsService.backfill(db.engine, data.last_visit, data.last_visit, echo=lambda line: None)
+
+class Client:
+    """Sends requests and returns status, headers and the whole body"""
+    
+    name = ''
+    
+    def __init__(self, headers: Dict[str, str]):
+        self.headers = headers
+    
+    def send(self, method: str, path: str, body: Any = None, auth: bool = False) -> Tuple[int, Dict[str, str], bytes]:
+        headers = dict(self.headers) if auth else {}
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        return self.request(method, path, data, headers)
+    
+    def request(self, method, path, data, headers):
+        raise NotImplementedError
+    
+    def close(self) -> None:
+        pass
+
+class TestClient(Client):
+    name = 'test'
+    
+    def __init__(self, app, headers):
+        super().__init__(headers)
+        self.client = app.test_client()
+    
+    def request(self, method, path, data, headers):
+        response = self.client.open(path, method=method, data=data, headers=headers)
+        try:
+            return response.status_code, response.headers, response.get_data()
+        finally:
+            response.close()
+
+class HttpClient(Client):
+    """Keep-alive connection per thread to an HTTP server"""
+    
+    name = 'http'
+    
+    def __init__(self, url, headers):
+        super().__init__(headers)
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.local = threading.local()
+    
+    def request(self, method, path, data, headers):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection(self.host, self.port, timeout=120)
+        try:
+            connection.request(method, path, body=data, headers=headers)
+            response = connection.getresponse()
+        except (http.client.HTTPException, ConnectionError):
+            # The server closed the idle connection, retry once on a new one
+            connection.close()
+            connection.request(method, path, body=data, headers=headers)
+            response = connection.getresponse()
+        return response.status, response.headers, response.read()
+
+def server_timing(value: Optional[str]) -> Tuple[Optional[int], Optional[float], int]:
+    """Statements, database milliseconds and repeated statements from a ``Server-Timing`` header"""
+    if not value:
+        return None, None, 0
+    statements, db_ms, repeated = None, None, 0
+    for entry in value.split(','):
+        name, *params = [part.strip() for part in entry.split(';')]
+        params = dict(param.split('=', 1) for param in params if '=' in param)
+        if name == 'db':
+            db_ms = float(params.get('dur', 0))
+            statements = int(params.get('desc', '"0').strip('"').split()[0])
+        elif name == 'n1':
+            repeated = int(params.get('desc', '"0').strip('"').split()[0])
+    return statements, db_ms, repeated
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted ``values``"""
+    return values[min(len(values) - 1, max(0, int(round(fraction * len(values) + 0.5)) - 1))]
+
+def run_scenario(client: Client, scenario: Scenario, args) -> Optional[Dict[str, Any]]:
+    requests = args.requests
+    if scenario.heavy:
+        requests = min(requests, args.heavy_requests)
+    if scenario.requests is not None:
+        requests = min(requests, scenario.requests())
+    if not requests:
+        return None
+    
+    def send(i):
+        rng = random.Random(f'{args.seed}-{scenario.name}-{i}')
+        path = scenario.path(rng, i)
+        body = scenario.body(rng, i) if scenario.body else None
+        started = time.perf_counter()
+        status, headers, content = client.send(scenario.method, path, body, scenario.auth)
+        elapsed = time.perf_counter() - started
+        if scenario.created and status == 201:
+            with data_lock:
+                created.append(json.loads(content)['data']['id'])
+        return elapsed, status, len(content), server_timing(headers.get('Server-Timing'))
+    
+    data_lock = threading.Lock()
+    created = []
+    # Writes are not warmed up, every create must be matched by a delete
+    if not scenario.write:
+        for i in range(min(args.warmup, requests)):
+            send(-1 - i)
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as executor:
+        samples = list(executor.map(send, range(requests)))
+    wall = time.perf_counter() - started
+    if scenario.created:
+        args.data.created[scenario.created].extend(sorted(created))
+    
+    latencies = sorted(elapsed * 1000 for elapsed, status, size, timing in samples)
+    statuses = Counter(status for elapsed, status, size, timing in samples)
+    statements = [timing[0] for elapsed, status, size, timing in samples if timing[0] is not None]
+    db_ms = [timing[1] for elapsed, status, size, timing in samples if timing[1] is not None]
+    return {
+        'name': scenario.name,
+        'endpoint': scenario.endpoint,
+        'method': scenario.method,
+        'client': client.name,
+        'requests': requests,
+        'concurrency': args.concurrency,
+        'errors': sum(count for status, count in statuses.items() if status not in scenario.expect),
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50), 3),
+            'p95': round(percentile(latencies, 0.95), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'mean': round(sum(latencies) / len(latencies), 3),
+            'max': round(latencies[-1], 3)
+        },
+        'throughput_rps': round(requests / wall, 1),
+        'statements': {
+            'mean': round(sum(statements) / len(statements), 2),
+            'max': max(statements)
+        } if statements else None,
+        'db_ms_mean': round(sum(db_ms) / len(db_ms), 3) if db_ms else None,
+        'n1_requests': sum(1 for elapsed, status, size, timing in samples if timing[2]),
+        'bytes_mean': round(sum(size for elapsed, status, size, timing in samples) / requests)
+    }
+
+def print_header() -> None:
+    print(f"{'route':<28} {'client':<6} {'req':>5} {'err':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} "
+          f"{'rps':>8} {'stmts':>6} {'db ms':>7} {'KB':>8}")
+
+def print_row(result: Dict[str, Any]) -> None:
+    latency = result['latency_ms']
+    statements = f"{result['statements']['mean']:.1f}" if result['statements'] else '-'
+    db_ms = f"{result['db_ms_mean']:.2f}" if result['db_ms_mean'] is not None else '-'
+    flag = ' N+1' if result['n1_requests'] else ''
+    print(f"{result['name']:<28} {result['client']:<6} {result['requests']:>5} {result['errors']:>4} "
+          f"{latency['p50']:>8.2f} {latency['p95']:>8.2f} {latency['p99']:>8.2f} {latency['max']:>8.2f} "
+          f"{result['throughput_rps']:>8.1f} {statements:>6} {db_ms:>7} {result['bytes_mean'] / 1024:>8.1f}{flag}", flush=True)
+
+def compare(results: List[Dict[str, Any]], path: str) -> None:
+    """Latency and throughput change of every route against an earlier run"""
+    with open(path) as f:
+        previous = {(result['client'], result['name']): result for result in json.load(f)['routes']}
+    
+    def change(old, new):
+        return f'{(new - old) / old * 100:+7.1f}%' if old else '      -'
+    
+    print(f'\nChange against {path} (negative latency is faster):')
+    print(f"{'route':<28} {'client':<6} {'p50':>14} {'p95':>14} {'p99':>14} {'rps':>14} {'stmts':>10}")
+    for result in results:
+        old = previous.get((result['client'], result['name']))
+        if old is None:
+            continue
+        latency, old_latency = result['latency_ms'], old['latency_ms']
+        statements = ''
+        if result['statements'] and old['statements']:
+            old_mean, new_mean = f"{old['statements']['mean']:.1f}", f"{result['statements']['mean']:.1f}"
+            if old_mean != new_mean:
+                statements = f'{old_mean}->{new_mean}'
+        print(f"{result['name']:<28} {result['client']:<6} "
+              + ' '.join(f'{latency[key]:>6.1f}{change(old_latency[key], latency[key])}' for key in ('p50', 'p95', 'p99'))
+              + f" {result['throughput_rps']:>6.0f}{change(old['throughput_rps'], result['throughput_rps'])} {statements:>10}")
+
+def uncovered(app, scenarios: List[Scenario]) -> List[str]:
+    """API endpoints no scenario requests"""
+    covered = {scenario.endpoint for scenario in scenarios}
+    endpoints = {rule.endpoint for rule in app.url_map.iter_rules() if not rule.endpoint.startswith(IGNORED_ENDPOINTS)}
+    return sorted(endpoints - covered)
+
+def metadata(app, args, counts: Dict[str, int]) -> Dict[str, Any]:
+    from sqlalchemy.engine import make_url
+    
+    def git(*command):
+        try:
+            return subprocess.run(['git', *command], capture_output=True, text=True, check=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    
+    url = make_url(args.database_url)
+    return {
+        'started_at': args.started_at,
+        'git_commit': git('rev-parse', 'HEAD'),
+        'git_dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'database': url.render_as_string(hide_password=True),
+        'database_backend': url.get_backend_name(),
+        'rows': counts,
+        'sql_profiling': app.config['SQL_PROFILING'],
+        'server': args.url or 'werkzeug (in process)',
+        'arguments': {key: value for key, value in vars(args).items() if key not in ('data', 'started_at')}
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    dataset.add_arguments(parser)
+    parser.add_argument('--client', choices=('test', 'http', 'both'), default='both')
+    parser.add_argument('--url', help='Benchmark a running server instead of an in-process one')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per route shape')
+    parser.add_argument('--heavy-requests', type=int, default=5, help='Requests per export')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--writes', action='store_true', help='Also benchmark the create, update and delete routes')
+    parser.add_argument('--only', help='Only the route shapes whose name contains this text')
+    parser.add_argument('--output', help='JSON results file, by default results/<time>-<client>.json')
+    parser.add_argument('--compare', help='Earlier JSON results to compare with')
+    args = parser.parse_args()
+    args.started_at = datetime.now().isoformat(timespec='seconds')
+    
+    app = dataset.create_benchmark_app(args.database_url)
+    app.logger.setLevel(logging.ERROR)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    with app.app_context():
+        counts = dataset.row_counts() if not args.reseed else {}
+        expected = {'owners': args.owners, 'pets': args.owners * args.pets_per_owner,
+                    'visits': args.owners * args.pets_per_owner * args.visits_per_pet}
+        if any(counts.get(table) != count for table, count in expected.items()):
+            if not args.reseed and not dataset.seeded_or_empty():
+                sys.exit(f'{args.database_url} does not hold the requested scale and was not created by '
+                         'benchmarks/seed.py: pass --reseed to drop and seed it, or another --database-url')
+            print(f"Seeding {expected['owners']:,} owners, {expected['pets']:,} pets, {expected['visits']:,} visits")
+            counts = dataset.seed(args, echo=lambda text: print(text, end='', flush=True))
+        args.data = Dataset()
+    
+    scenarios = read_scenarios(args.data)
+    if args.writes:
+        scenarios += write_scenarios(args.data)
+    if args.only:
+        scenarios = [scenario for scenario in scenarios if args.only in scenario.name]
+    
+    results = []
+    server = None
+    try:
+        with app.app_context():
+            token = json.loads(app.test_client().post(
+                '/api/auth/login', json={'username': 'admin', 'password': 'admin123'}).get_data())['data']['access_token']
+        headers = {'Authorization': f'Bearer {token}'}
+        
+        clients = []
+        if args.client in ('test', 'both'):
+            clients.append(TestClient(app, headers))
+        if args.client in ('http', 'both'):
+            url = args.url
+            if not url:
+                from werkzeug.serving import make_server
+                server = make_server('127.0.0.1', 0, app, threaded=True)
+                threading.Thread(target=server.serve_forever, daemon=True).start()
+                url = f'http://127.0.0.1:{server.server_port}'
+            clients.append(HttpClient(url, headers))
+        
+        print_header()
+        for client in clients:
+            for scenario in scenarios:
+                result = run_scenario(client, scenario, args)
+                if result is not None:
+                    results.append(result)
+                    print_row(result)
+            if args.writes:
+                with app.app_context():
+                    cleanup(args.data)
+    finally:
+        if server is not None:
+            server.shutdown()
+    
+    missing = uncovered(app, scenarios) if not args.only else []
+    if missing:
+        print(f"\nNot benchmarked: {', '.join(missing)}")
+    
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{args.client}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({'meta': metadata(app, args, counts), 'routes': results}, f, indent=2, ensure_ascii=False)
+    print(f'\nResults saved to {output}')
+    
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Compare response encoding time of the stdlib and the fast JSON provider
+
+Builds owner, pet and visit list pages the way the API serializes them
+(in an in-memory SQLite database), checks that both providers produce the
+same bytes and times ``dumps`` on each page.
+    
+    python benchmarks/json_encoding.py [--owners 200] [--per-page 100] [--repeat 50]
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('FLASK_DEBUG', '0')
+
+from flask.json.provider import DefaultJSONProvider
+from app import create_app, db
+from app.json_provider import FastJSONProvider, orjson
+from app.models import Owner, Pet, PetType, Visit
+
+FIRST_NAMES = ('João', 'Maria', 'George', 'Betty', 'Zoë', 'Eduardo')
+LAST_NAMES = ('Conceição', 'Franklin', 'Davis', 'Müller', 'Escobito', 'Black')
+
+def populate(owners: int) -> None:
+    """Owners with two pets each and three visits per pet"""
+    types = [PetType(name=name) for name in ('cat', 'dog', 'lizard', 'bird')]
+    db.session.add_all(types)
+    for i in range(owners):
+        owner = Owner(first_name=FIRST_NAMES[i % 6], last_name=LAST_NAMES[i % 6], address=f'{i} Rua das Flores',
+                      city='São Paulo', telephone=f'1199{i:07d}')
+        for j in range(2):
+            pet = Pet(name=f'Pet {i}-{j}', birth_date=date(2015, 1, 1) + timedelta(days=i + j),
+                      owner=owner, pet_type=types[(i + j) % 4])
+            for k in range(3):
+                db.session.add(Visit(visit_date=date(2024, 1, 1) + timedelta(days=k * 30 + i % 30),
+                                     description=f'Consulta de rotina nº {k}: vacinação e check-up', pet=pet))
+        db.session.add(owner)
+    db.session.commit()
+
+def pages(per_page: int):
+    """The ``handle_success`` payload of a list page for each resource"""
+    from app.services.owner_service import OwnerService
+    from app.services.pet_service import PetService
+    from app.services.visit_service import VisitService
+    yield 'owners?expand=pets.visits', OwnerService.get_all(1, per_page, expand={'pets': {'visits': {}}})
+    yield 'pets?expand=owner,type,visits', PetService.get_all(1, per_page, expand={'owner': {}, 'type': {}, 'visits': {}})
+    yield 'visits?expand=pet', VisitService.get_all(1, per_page, expand={'pet': {}})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--owners', type=int, default=200)
+    parser.add_argument('--per-page', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    
+    app = create_app('testing')
+    app.config['SQLALCHEMY_ECHO'] = False
+    with app.app_context():
+        db.create_all()
+        populate(args.owners)
+        stdlib, fast = DefaultJSONProvider(app), FastJSONProvider(app)
+        
+        print(f'orjson {orjson.__version__ if orjson else "not installed, fast provider falls back to the stdlib"}')
+        print(f'{"page":34} {"bytes":>9} {"stdlib ms":>10} {"fast ms":>9} {"speedup":>8}')
+        for name, page in pages(args.per_page):
+            payload = {'data': page}
+            expected = stdlib.dumps(payload, separators=(',', ':'))
+            if fast.dumps(payload, separators=(',', ':')) != expected:
+                sys.exit(f'{name}: providers disagree')
+            
+            timings = []
+            for provider in (stdlib, fast):
+                seconds = min(timeit.repeat(lambda: provider.dumps(payload, separators=(',', ':')),
+                                            number=args.repeat, repeat=5))
+                timings.append(seconds / args.repeat * 1000)
+            print(f'{name:34} {len(expected):>9} {timings[0]:>10.3f} {timings[1]:>9.3f} {timings[0] / timings[1]:>7.1f}x')
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""Seed a database with a synthetic PetClinic dataset for the benchmarks
+
+The data is generated from ``--seed``, so the same arguments always produce
+the same rows: owners spread over a few dozen cities and a few hundred last
+names, ``--pets-per-owner`` pets each and ``--visits-per-pet`` visits per
+pet over the last three years, plus the vets, specialties and visit
+rollups. Rows go in with batched Core inserts, one transaction per batch.
+    
+    python benchmarks/seed.py --database-url sqlite:///benchmarks/data/petclinic.db --owners 100000
+
+100000 owners with the defaults give 300k pets and 3M visits. Seeding drops
+every table of the app first, so it only runs on an empty database or one
+seeded before (marked by a ``benchmark_seed`` table), other databases need
+``--reseed``.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('FLASK_DEBUG', '0')
+
+FIRST_NAMES = ('George', 'Betty', 'Eduardo', 'Harold', 'Peter', 'Jean', 'Jeff', 'Maria', 'David', 'Carlos',
+               'João', 'Ana', 'Lucas', 'Julia', 'Pedro', 'Mariana', 'Rafael', 'Camila', 'Bruno', 'Larissa')
+LAST_NAMES = ('Franklin', 'Davis', 'Rodriquez', 'McTavish', 'Coleman', 'Black', 'Escobito', 'Schroeder',
+              'Silva', 'Santos', 'Oliveira', 'Souza', 'Pereira', 'Costa', 'Almeida', 'Conceição', 'Müller',
+              'Carvalho', 'Gomes', 'Martins', 'Araújo', 'Ribeiro', 'Barbosa', 'Lima', 'Rocha', 'Dias')
+NAME_SUFFIXES = ('', 'son', 'sen', 'ez', 'ini', 'ova', 'ford', 'well')
+CITIES = ('Madison', 'Sun Prairie', 'McFarland', 'Windsor', 'Monona', 'Waunakee', 'São Paulo', 'Rio de Janeiro',
+          'Belo Horizonte', 'Curitiba', 'Porto Alegre', 'Recife', 'Salvador', 'Fortaleza', 'Brasília', 'Manaus',
+          'Campinas', 'Florianópolis', 'Goiânia', 'Belém', 'Vitória', 'Natal', 'Santos', 'Niterói',
+          'Londrina', 'Joinville', 'Uberlândia', 'Ribeirão Preto', 'Sorocaba', 'Maceió')
+STREETS = ('Rua das Flores', 'Avenida Paulista', 'Main St.', 'Oak Ave.', 'Rua Augusta', 'Lake St.', 'Avenida Brasil')
+PET_NAMES = ('Leo', 'Basil', 'Rosy', 'Jewel', 'Iggy', 'George', 'Samantha', 'Max', 'Lucky', 'Mulligan',
+             'Freddy', 'Thor', 'Mel', 'Bidu', 'Pipoca', 'Nina', 'Luna', 'Fred', 'Pandora', 'Tom')
+PET_TYPES = ('cat', 'dog', 'lizard', 'snake', 'bird', 'hamster')
+SPECIALTIES = ('radiology', 'surgery', 'dentistry', 'cardiology', 'dermatology', 'oncology')
+VISIT_REASONS = ('rabies shot', 'annual check-up', 'vaccination', 'dental cleaning', 'neutered', 'spayed',
+                 'skin allergy', 'broken leg', 'ear infection', 'weight control', 'vomiting', 'microchip',
+                 'consulta de rotina', 'vacinação', 'castração', 'limpeza dentária', 'exame de sangue')
+VISIT_NOTES = ('no complications', 'follow-up in two weeks', 'owner reported lethargy', 'prescribed antibiotics',
+               'retorno em 15 dias', 'sem intercorrências', 'x-ray taken', 'diet changed')
+
+# Visits fall in the three years before this date, fixed so results compare
+# across days
+LAST_VISIT = date(2026, 6, 30)
+VISIT_DAYS = 3 * 365
+
+# Table created by ``seed``: a database that has it may be dropped and seeded again
+MARKER = 'benchmark_seed'
+
+def batches(rows: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def generate(args) -> Dict[str, Callable[[], Iterator[Dict[str, Any]]]]:
+    """Row generators by table, each draws from its own seeded random stream"""
+    now = datetime(2026, 7, 1)
+    first_visit = LAST_VISIT - timedelta(days=VISIT_DAYS - 1)
+    
+    def owners():
+        rng = random.Random(f'{args.seed}-owners')
+        for id in range(1, args.owners + 1):
+            yield {
+                'id': id,
+                'first_name': rng.choice(FIRST_NAMES),
+                'last_name': rng.choice(LAST_NAMES) + rng.choice(NAME_SUFFIXES),
+                'address': f'{rng.randint(1, 9999)} {rng.choice(STREETS)}',
+                'city': rng.choice(CITIES),
+                'telephone': f'{rng.randint(1000000000, 9999999999)}',
+                'created_at': now,
+                'updated_at': now
+            }
+    
+    def pets():
+        rng = random.Random(f'{args.seed}-pets')
+        for id in range(1, args.owners * args.pets_per_owner + 1):
+            yield {
+                'id': id,
+                'name': rng.choice(PET_NAMES),
+                'birth_date': LAST_VISIT - timedelta(days=rng.randint(90, 15 * 365)),
+                'owner_id': (id - 1) // args.pets_per_owner + 1,
+                'type_id': rng.randint(1, len(PET_TYPES)),
+                'created_at': now,
+                'updated_at': now
+            }
+    
+    def visits():
+        rng = random.Random(f'{args.seed}-visits')
+        pets = args.owners * args.pets_per_owner
+        for id in range(1, pets * args.visits_per_pet + 1):
+            yield {
+                'id': id,
+                'visit_date': first_visit + timedelta(days=rng.randrange(VISIT_DAYS)),
+                'description': f'{rng.choice(VISIT_REASONS)}, {rng.choice(VISIT_NOTES)}',
+                'pet_id': (id - 1) // args.visits_per_pet + 1,
+                'created_at': now,
+                'updated_at': now
+            }
+    
+    return {'owners': owners, 'pets': pets, 'visits': visits}
+
+def seeded_or_empty() -> bool:
+    """Whether the database has no tables or was created by ``seed``, i.e. ``seed`` may drop it"""
+    from app import db
+    tables = db.inspect(db.engine).get_table_names()
+    return not tables or MARKER in tables
+
+def seed(args, echo: Callable[[str], None] = print) -> Dict[str, int]:
+    """Drop and create the schema and load the dataset, return the row count of each table
+    
+    Callers check ``seeded_or_empty`` (or an explicit ``--reseed``) first.
+    """
+    from app import db
+    from app.models import Owner, Pet, PetType, Specialty, Vet, Visit
+    from app.models.specialty import vet_specialties
+    from app.services.visit_stats_service import VisitStatsService
+    
+    # Marked before dropping, so a seed that is interrupted can be run again
+    marker = db.Table(MARKER, db.MetaData(), db.Column('seeded_at', db.DateTime), db.Column('arguments', db.Text))
+    marker.create(db.engine, checkfirst=True)
+    with db.engine.begin() as connection:
+        connection.execute(db.delete(marker))
+        connection.execute(db.insert(marker).values(seeded_at=datetime.now(), arguments=json.dumps({
+            name: getattr(args, name) for name in ('owners', 'pets_per_owner', 'visits_per_pet', 'vets', 'seed')
+        })))
+    db.drop_all()
+    db.create_all()
+    now = datetime(2026, 7, 1)
+    rng = random.Random(f'{args.seed}-vets')
+    with db.engine.begin() as connection:
+        connection.execute(db.insert(PetType.__table__), [
+            {'id': id, 'name': name, 'created_at': now, 'updated_at': now} for id, name in enumerate(PET_TYPES, 1)
+        ])
+        connection.execute(db.insert(Specialty.__table__), [
+            {'id': id, 'name': name, 'created_at': now, 'updated_at': now} for id, name in enumerate(SPECIALTIES, 1)
+        ])
+        connection.execute(db.insert(Vet.__table__), [
+            {'id': id, 'first_name': rng.choice(FIRST_NAMES), 'last_name': rng.choice(LAST_NAMES),
+             'created_at': now, 'updated_at': now} for id in range(1, args.vets + 1)
+        ])
+        connection.execute(db.insert(vet_specialties), [
+            {'vet_id': id, 'specialty_id': specialty_id}
+            for id in range(1, args.vets + 1)
+            for specialty_id in rng.sample(range(1, len(SPECIALTIES) + 1), rng.randint(0, 2))
+        ])
+    
+    tables = {'owners': Owner.__table__, 'pets': Pet.__table__, 'visits': Visit.__table__}
+    for name, rows in generate(args).items():
+        started = time.perf_counter()
+        count = 0
+        for batch in batches(rows(), args.batch_size):
+            with db.engine.begin() as connection:
+                connection.execute(db.insert(tables[name]), batch)
+            count += len(batch)
+            echo(f'\r{name}: {count:,} rows ({count / (time.perf_counter() - started):,.0f}/s)')
+        echo('\n')
+    
+    echo('visit rollups...\n')
+    VisitStatsService.backfill(db.engine, LAST_VISIT - timedelta(days=VISIT_DAYS - 1), LAST_VISIT, echo=lambda line: None)
+    with db.engine.begin() as connection:
+        if db.engine.dialect.name == 'sqlite':
+            connection.execute(db.text('ANALYZE'))
+        elif db.engine.dialect.name == 'mysql':
+            connection.execute(db.text('ANALYZE TABLE owners, pets, visits, visit_daily_stats, visit_monthly_stats'))
+    return row_counts()
+
+def row_counts() -> Dict[str, int]:
+    """Rows of each benchmarked table, empty when the schema does not exist"""
+    from app import db
+    if not db.inspect(db.engine).has_table('visits'):
+        return {}
+    return {
+        table: db.session.execute(db.text(f'SELECT COUNT(*) FROM {table}')).scalar()
+        for table in ('owners', 'pets', 'visits', 'vets', 'specialties', 'pet_types')
+    }
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--database-url', default='sqlite:///' + os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'data', 'petclinic.db'))
+    parser.add_argument('--owners', type=int, default=10000)
+    parser.add_argument('--pets-per-owner', type=int, default=3)
+    parser.add_argument('--visits-per-pet', type=int, default=10)
+    parser.add_argument('--vets', type=int, default=50)
+    parser.add_argument('--seed', default='petclinic')
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--reseed', action='store_true',
+                        help='Drop and seed the database again, even one not created by benchmarks/seed.py')
+
+def create_benchmark_app(database_url: str):
+    """Production configuration of the app on ``database_url``"""
+    if database_url.startswith('sqlite:///'):
+        os.makedirs(os.path.dirname(os.path.abspath(database_url[len('sqlite:///'):])), exist_ok=True)
+    os.environ['DATABASE_URL'] = database_url
+    from app import create_app
+    return create_app('production')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    args = parser.parse_args()
+    
+    app = create_benchmark_app(args.database_url)
+    with app.app_context():
+        if not args.reseed and not seeded_or_empty():
+            sys.exit(f'{args.database_url} has tables not created by benchmarks/seed.py, pass --reseed to drop them')
+        started = time.perf_counter()
+        counts = seed(args, echo=lambda text: print(text, end='', flush=True))
+        print(', '.join(f'{count:,} {table}' for table, count in counts.items()) +
+              f' in {time.perf_counter() - started:.0f}s')
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""Full-text search index on owners
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-01-15 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+COLUMNS = 'first_name, last_name, address, city, telephone'
+NEW_VALUES = ', '.join(f'new.{column}' for column in COLUMNS.split(', '))
+OLD_VALUES = ', '.join(f'old.{column}' for column in COLUMNS.split(', '))
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        op.execute(f'ALTER TABLE owners ADD FULLTEXT INDEX owners_fts ({COLUMNS})')
+    elif dialect == 'sqlite':
+        # External-content FTS5 table kept in sync with owners by triggers
+        op.execute(f"""
+        CREATE VIRTUAL TABLE owners_fts USING fts5({COLUMNS}, content='owners', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3')
+        """)
+        op.execute(f"""
+        CREATE TRIGGER owners_fts_ai AFTER INSERT ON owners BEGIN
+            INSERT INTO owners_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES});
+        END
+        """)
+        op.execute(f"""
+        CREATE TRIGGER owners_fts_ad AFTER DELETE ON owners BEGIN
+            INSERT INTO owners_fts(owners_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES});
+        END
+        """)
+        op.execute(f"""
+        CREATE TRIGGER owners_fts_au AFTER UPDATE OF {COLUMNS} ON owners BEGIN
+            INSERT INTO owners_fts(owners_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES});
+            INSERT INTO owners_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES});
+        END
+        """)
+        op.execute("INSERT INTO owners_fts(owners_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        op.execute('ALTER TABLE owners DROP INDEX owners_fts')
+    elif dialect == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS owners_fts_au')
+        op.execute('DROP TRIGGER IF EXISTS owners_fts_ad')
+        op.execute('DROP TRIGGER IF EXISTS owners_fts_ai')
+        op.execute('DROP TABLE IF EXISTS owners_fts')
\ No newline at end of file
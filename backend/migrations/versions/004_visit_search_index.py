@@ -0,0 +1,58 @@
+"""Full-text search index on visit descriptions
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-01-20 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+COLUMNS = 'description'
+NEW_VALUES = ', '.join(f'new.{column}' for column in COLUMNS.split(', '))
+OLD_VALUES = ', '.join(f'old.{column}' for column in COLUMNS.split(', '))
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        op.execute(f'ALTER TABLE visits ADD FULLTEXT INDEX visits_fts ({COLUMNS})')
+    elif dialect == 'sqlite':
+        # External-content FTS5 table kept in sync with visits by triggers
+        op.execute(f"""
+        CREATE VIRTUAL TABLE visits_fts USING fts5({COLUMNS}, content='visits', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3')
+        """)
+        op.execute(f"""
+        CREATE TRIGGER visits_fts_ai AFTER INSERT ON visits BEGIN
+            INSERT INTO visits_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES});
+        END
+        """)
+        op.execute(f"""
+        CREATE TRIGGER visits_fts_ad AFTER DELETE ON visits BEGIN
+            INSERT INTO visits_fts(visits_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES});
+        END
+        """)
+        op.execute(f"""
+        CREATE TRIGGER visits_fts_au AFTER UPDATE OF {COLUMNS} ON visits BEGIN
+            INSERT INTO visits_fts(visits_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES});
+            INSERT INTO visits_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES});
+        END
+        """)
+        op.execute("INSERT INTO visits_fts(visits_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'mysql':
+        op.execute('ALTER TABLE visits DROP INDEX visits_fts')
+    elif dialect == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS visits_fts_au')
+        op.execute('DROP TRIGGER IF EXISTS visits_fts_ad')
+        op.execute('DROP TRIGGER IF EXISTS visits_fts_ai')
+        op.execute('DROP TABLE IF EXISTS visits_fts')
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""Secondary indexes on foreign keys and lookup columns
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-02-01 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_pets_owner_id', 'pets', ['owner_id'])
+    op.create_index('ix_pets_type_id', 'pets', ['type_id'])
+    op.create_index('ix_visits_pet_id_visit_date', 'visits', ['pet_id', 'visit_date'])
+    op.create_index('ix_visits_visit_date', 'visits', ['visit_date'])
+    op.create_index('ix_vet_specialties_specialty_id', 'vet_specialties', ['specialty_id'])
+    
+    # LIKE 'x%' needs a NOCASE index on SQLite, MySQL collations ignore case already
+    if op.get_bind().dialect.name == 'sqlite':
+        op.create_index('ix_owners_last_name', 'owners', [sa.text('last_name COLLATE NOCASE')])
+    else:
+        op.create_index('ix_owners_last_name', 'owners', ['last_name'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_owners_last_name', table_name='owners')
+    op.drop_index('ix_vet_specialties_specialty_id', table_name='vet_specialties')
+    op.drop_index('ix_visits_visit_date', table_name='visits')
+    op.drop_index('ix_visits_pet_id_visit_date', table_name='visits')
+    op.drop_index('ix_pets_type_id', table_name='pets')
+    op.drop_index('ix_pets_owner_id', table_name='pets')
\ No newline at end of file
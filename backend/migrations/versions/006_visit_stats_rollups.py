@@ -0,0 +1,38 @@
+"""Visit statistics rollup tables
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-03-01 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Filled by `flask stats backfill`, kept current by the application afterwards
+    op.create_table('visit_daily_stats',
+        sa.Column('stat_date', sa.Date(), nullable=False),
+        sa.Column('pet_type_id', sa.Integer(), nullable=False),
+        sa.Column('city', sa.String(length=80), nullable=False),
+        sa.Column('visits', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('stat_date', 'pet_type_id', 'city')
+    )
+    op.create_table('visit_monthly_stats',
+        sa.Column('stat_month', sa.Date(), nullable=False),
+        sa.Column('pet_type_id', sa.Integer(), nullable=False),
+        sa.Column('city', sa.String(length=80), nullable=False),
+        sa.Column('visits', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('stat_month', 'pet_type_id', 'city')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('visit_monthly_stats')
+    op.drop_table('visit_daily_stats')
\ No newline at end of file
@@ -1,10 +1,36 @@
 #!/usr/bin/env python3
 import os
+import shutil
 import sys
 import time
 import subprocess
+import multiprocessing
+
+# SERVER_MODE=production serves the app with gunicorn instead of the Werkzeug dev
+# server, SERVER_MODE=async with uvicorn and the asyncio read path (app/asgi.py)
+SERVER_MODE = os.environ.get('SERVER_MODE', 'development')
+PRODUCTION = SERVER_MODE in ('production', 'async')
+CONFIG_NAME = 'production' if PRODUCTION else 'default'
+
+# Worker processes share their Prometheus metrics through this directory, which
+# must exist and be emptied before prometheus_client is imported (only by the
+# command line process: spawned workers import this module under another name)
+if PRODUCTION:
+    os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/petclinic-metrics')
+if os.environ.get('PROMETHEUS_MULTIPROC_DIR') and __name__ == '__main__':
+    shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'])
+
+# gevent workers need the standard library patched before the app (and its
+# database driver) is imported, since the app is loaded before forking
+if SERVER_MODE == 'production' and os.environ.get('GUNICORN_WORKER_CLASS') == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
 from flask_migrate import upgrade
 from app import create_app, db
+from app.metrics import mark_process_dead
+from app.services.reference_cache import warm_reference_caches
 
 def wait_for_db():
     """Wait for database to be ready"""
@@ -14,7 +40,7 @@ def wait_for_db():
     while retry_count < max_retries:
         try:
             # Try to connect to the database
-            app = create_app()
+            app = create_app(CONFIG_NAME)
             with app.app_context():
                 with db.engine.connect() as connection:
                     connection.execute(db.text('SELECT 1'))
@@ -31,7 +57,7 @@ def wait_for_db():
 def run_migrations():
     """Run database migrations"""
     try:
-        app = create_app()
+        app = create_app(CONFIG_NAME)
         with app.app_context():
             print("🔄 Running database migrations...")
             
@@ -57,7 +83,7 @@ def create_initial_migration():
         versions_dir = os.path.join(os.path.dirname(__file__), 'migrations', 'versions')
         if not os.path.exists(versions_dir) or len(os.listdir(versions_dir)) == 0:
             print("🔄 Creating initial migration...")
-            app = create_app()
+            app = create_app(CONFIG_NAME)
             with app.app_context():
                 # Initialize migration repository if needed
                 try:
@@ -72,12 +98,103 @@ def create_initial_migration():
     except Exception as e:
         print(f"⚠ Could not create initial migration: {e}")
 
+def env_int(name, default):
+    """Integer environment variable, ``default`` when unset or empty"""
+    return int(os.environ.get(name) or default)
+
+def gunicorn_options(app):
+    """gunicorn settings from the environment
+    
+    ``WEB_CONCURRENCY`` worker processes (one per core by default, twice
+    that plus one for the sync worker) with ``GUNICORN_THREADS`` threads
+    each for the default ``gthread`` worker class. ``GUNICORN_WORKER_CLASS``
+    also accepts ``sync`` and ``gevent``.
+    """
+    worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+    cores = multiprocessing.cpu_count()
+    default_workers = cores * 2 + 1 if worker_class == 'sync' else cores
+    
+    def post_fork(server, worker):
+        # Connections opened while starting up belong to the parent process (primary and replicas)
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+    
+    def child_exit(server, worker):
+        mark_process_dead(worker.pid)
+    
+    return {
+        'bind': f"0.0.0.0:{os.environ.get('PORT', 5000)}",
+        'workers': env_int('WEB_CONCURRENCY', default_workers),
+        'worker_class': worker_class,
+        'threads': env_int('GUNICORN_THREADS', 4),
+        'worker_connections': env_int('GUNICORN_WORKER_CONNECTIONS', 1000),
+        'preload_app': True,
+        'timeout': env_int('GUNICORN_TIMEOUT', 30),
+        'graceful_timeout': env_int('GUNICORN_GRACEFUL_TIMEOUT', 30),
+        'keepalive': env_int('GUNICORN_KEEPALIVE', 5),
+        # Recycle workers now and then so slow leaks cannot accumulate
+        'max_requests': env_int('GUNICORN_MAX_REQUESTS', 1000),
+        'max_requests_jitter': env_int('GUNICORN_MAX_REQUESTS_JITTER', 100),
+        'accesslog': '-',
+        'errorlog': '-',
+        'post_fork': post_fork,
+        'child_exit': child_exit,
+    }
+
+def run_production(app):
+    """Serve the preloaded app from pre-forked gunicorn workers
+    
+    SIGTERM stops accepting connections and lets the workers finish their
+    requests for up to ``GUNICORN_GRACEFUL_TIMEOUT`` seconds.
+    """
+    from gunicorn.app.base import BaseApplication
+    
+    class ProductionServer(BaseApplication):
+        def __init__(self, application, options):
+            self.application = application
+            self.options = options
+            super().__init__()
+        
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+        
+        def load(self):
+            return self.application
+    
+    options = gunicorn_options(app)
+    print(f"🚀 Starting {options['workers']} {options['worker_class']} workers on {options['bind']}")
+    ProductionServer(app, options).run()
+
+def run_async():
+    """Serve the ASGI gateway from ``WEB_CONCURRENCY`` uvicorn worker processes
+    
+    Each worker builds its own app and engines, reads of the hot endpoints
+    run on the asyncio engine and the rest of the API on a thread pool.
+    """
+    import uvicorn
+    
+    os.environ['PETCLINIC_CONFIG'] = CONFIG_NAME
+    port = int(os.environ.get('PORT', 5000))
+    workers = env_int('WEB_CONCURRENCY', multiprocessing.cpu_count())
+    print(f"🚀 Starting {workers} uvicorn workers on 0.0.0.0:{port}")
+    uvicorn.run(
+        'app.asgi:create_asgi_app',
+        factory=True,
+        host='0.0.0.0',
+        port=port,
+        workers=workers,
+        timeout_keep_alive=env_int('GUNICORN_KEEPALIVE', 5),
+        timeout_graceful_shutdown=env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+    )
+
 if __name__ == '__main__':
     print("🚀 Starting PetClinic API Server...")
     
     # Set Flask environment variables
     os.environ['FLASK_APP'] = 'app:create_app'
-    os.environ['FLASK_ENV'] = os.environ.get('FLASK_ENV', 'development')
+    os.environ['FLASK_ENV'] = os.environ.get('FLASK_ENV', 'production' if PRODUCTION else 'development')
     
     # Wait for database to be ready
     if not wait_for_db():
@@ -88,16 +205,28 @@ if __name__ == '__main__':
         print("⚠ Continuing without migrations...")
     
     # Create and run the Flask app
-    app = create_app()
+    app = create_app(CONFIG_NAME)
+    
+    # Load pet types and specialties into memory before the first request
+    try:
+        with app.app_context():
+            warm_reference_caches()
+    except Exception as e:
+        print(f"⚠ Reference data not preloaded: {e}")
     
     print("✓ PetClinic API Server is ready!")
     print("📋 API Documentation available at: http://localhost:5000/apidocs")
     print("❤️  Health check available at: http://localhost:5000/health")
     print("")
     
-    # Start the Flask development server
-    app.run(
-        host='0.0.0.0',
-        port=int(os.environ.get('PORT', 5000)),
-        debug=os.environ.get('FLASK_DEBUG', '1') == '1'
-    )
\ No newline at end of file
+    if SERVER_MODE == 'async':
+        run_async()
+    elif PRODUCTION:
+        run_production(app)
+    else:
+        # Start the Flask development server
+        app.run(
+            host='0.0.0.0',
+            port=int(os.environ.get('PORT', 5000)),
+            debug=os.environ.get('FLASK_DEBUG', '1') == '1'
+        )
\ No newline at end of file
@@ -0,0 +1,63 @@
+import os
+from contextlib import contextmanager
+from datetime import date
+from typing import Iterator, List
+
+import pytest
+from sqlalchemy import event
+
+os.environ.setdefault('FLASK_DEBUG', '0')
+
+from app import create_app, db
+from app.models import Owner, Pet, PetType, Specialty, Vet, Visit
+
+def populate() -> None:
+    """A small clinic: 3 vets, 6 owners with 2 pets each and 3 visits per pet"""
+    types = [PetType(name=name) for name in ('cat', 'dog', 'bird')]
+    specialties = [Specialty(name=name) for name in ('radiology', 'surgery')]
+    db.session.add_all(types + specialties)
+    for i in range(3):
+        db.session.add(Vet(first_name='James', last_name=f'Carter{i}', specialties=specialties[:i]))
+    for i in range(6):
+        owner = Owner(first_name='George', last_name=f'Franklin{i}', address=f'{i} Main St.',
+                      city='Madison', telephone=f'60855501{i:02d}')
+        for j in range(2):
+            pet = Pet(name=f'Leo{i}{j}', birth_date=date(2020, 1, 1), owner=owner, pet_type=types[(i + j) % 3])
+            for k in range(3):
+                db.session.add(Visit(visit_date=date(2024, 1, 1 + j + k), description='rabies shot', pet=pet))
+        db.session.add(owner)
+    db.session.commit()
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        populate()
+    yield app
+    with app.app_context():
+        db.drop_all()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def statements(app):
+    """Context manager collecting the SQL statements executed inside it"""
+    @contextmanager
+    def collect() -> Iterator[List[str]]:
+        executed = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            executed.append(statement)
+        
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            yield executed
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+    
+    return collect
\ No newline at end of file
@@ -0,0 +1,20 @@
+"""Bulk creation inserts in batches and reports the new ids in request order"""
+from app import db
+from app.models import Owner
+
+def test_bulk_insert_is_batched_and_ids_follow_the_request(app, client, statements, monkeypatch):
+    monkeypatch.setitem(app.config, 'BULK_BATCH_SIZE', 20)
+    owners = [{'first_name': 'Maria', 'last_name': f'Escobito{i}', 'address': f'{i} Rua das Flores',
+               'city': 'Madison', 'telephone': '6085551023'} for i in range(50)]
+    
+    with statements() as executed:
+        response = client.post('/api/owners/bulk', json=owners)
+    assert response.status_code == 201
+    assert sum(statement.lstrip().upper().startswith('INSERT') for statement in executed) == 3
+    
+    ids = response.get_json()['data']['ids']
+    with app.app_context():
+        names = dict(db.session.execute(db.select(Owner.id, Owner.last_name).where(Owner.id.in_(ids))).all())
+        db.session.execute(db.delete(Owner).where(Owner.id.in_(ids)))
+        db.session.commit()
+    assert [names[id] for id in ids] == [owner['last_name'] for owner in owners]
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""Conditional GETs revalidate against everything the document shows"""
+from datetime import date, datetime, timedelta, timezone
+
+from werkzeug.http import http_date
+
+from app import db
+from app.models import Specialty
+from app.models.specialty import vet_specialties
+from app.services import base_service
+
+def etag(client, url, **headers):
+    response = client.get(url, headers=headers)
+    return response.status_code, response.headers.get('ETag')
+
+def test_unchanged_document_is_not_modified(client):
+    _, tag = etag(client, '/api/owners/1')
+    assert etag(client, '/api/owners/1', **{'If-None-Match': tag}) == (304, tag)
+
+def test_swapped_many_to_many_link_changes_etag(app, client):
+    # Same updated_at on both specialties, only the linked ids tell them apart
+    with app.app_context():
+        db.session.execute(Specialty.__table__.update().values(updated_at=datetime(2024, 1, 1)))
+        db.session.commit()
+    _, before = etag(client, '/api/vets/2')
+    
+    def relink(old, new):
+        with app.app_context():
+            db.session.execute(vet_specialties.update().where(
+                vet_specialties.c.vet_id == 2, vet_specialties.c.specialty_id == old
+            ).values(specialty_id=new))
+            db.session.commit()
+    
+    relink(1, 2)
+    try:
+        status, after = etag(client, '/api/vets/2', **{'If-None-Match': before})
+    finally:
+        relink(2, 1)
+    assert status == 200 and after != before
+
+def test_date_computed_fields_change_etag_daily(client, monkeypatch):
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return date.today() + timedelta(days=1)
+    
+    _, today = etag(client, '/api/pets/1')
+    monkeypatch.setattr(base_service, 'date', Tomorrow)
+    status, tomorrow = etag(client, '/api/pets/1', **{'If-None-Match': today})
+    assert status == 200 and tomorrow != today
+
+def test_deleted_child_is_not_hidden_by_if_modified_since(client):
+    owner = client.post('/api/owners', json={'first_name': 'Harold', 'last_name': 'Davis', 'address': '563 Friendly St.',
+                                             'city': 'Windsor', 'telephone': '6085553198'}).get_json()['data']['id']
+    pets = [client.post('/api/pets', json={'name': name, 'birth_date': '2019-06-08', 'owner_id': owner,
+                                            'type_id': 1}).get_json()['data']['id'] for name in ('Iggy', 'Basil')]
+    pages = {f'/api/owners/{owner}': lambda data: data['pets'], f'/api/pets/owner/{owner}': lambda data: data['data']}
+    try:
+        for url in pages:
+            assert 'Last-Modified' not in client.get(url).headers
+        
+        assert client.delete(f'/api/pets/{pets[0]}').status_code == 200
+        since = http_date(datetime.now(timezone.utc) + timedelta(minutes=1))
+        for url, embedded in pages.items():
+            response = client.get(url, headers={'If-Modified-Since': since})
+            assert response.status_code == 200
+            assert [pet['id'] for pet in embedded(response.get_json()['data'])] == pets[1:]
+    finally:
+        client.delete(f'/api/owners/{owner}')
+
+def test_single_document_keeps_last_modified(client):
+    response = client.get('/api/visits/1')
+    assert response.last_modified is not None
+    assert client.get('/api/visits/1', headers={'If-Modified-Since': response.headers['Last-Modified']}).status_code == 304
\ No newline at end of file
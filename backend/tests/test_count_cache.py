@@ -0,0 +1,34 @@
+"""The per-process cache of pagination totals stays bounded"""
+import pytest
+
+from app.services import count_service
+from app.services.count_service import CountService
+
+@pytest.fixture
+def cache(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'COUNT_CACHE_SIZE', 3)
+    monkeypatch.setitem(app.config, 'COUNT_CACHE_TTL', 60)
+    with app.app_context():
+        CountService.clear()
+        yield CountService._cache
+        CountService.clear()
+
+def put(key, now, monkeypatch):
+    monkeypatch.setattr(count_service.time, 'monotonic', lambda: now)
+    CountService._put(key, 1, 'cached', frozenset({'owners'}), CountService._generation)
+
+def test_least_recently_used_total_is_evicted(cache, monkeypatch):
+    for key in 'abc':
+        put(key, 0, monkeypatch)
+    assert CountService._get('a', 60) == (1, 'cached')
+    put('d', 0, monkeypatch)
+    assert list(cache) == ['c', 'a', 'd']
+
+def test_expired_totals_are_removed(cache, monkeypatch):
+    put('a', 0, monkeypatch)
+    put('b', 50, monkeypatch)
+    put('c', 100, monkeypatch)
+    assert list(cache) == ['b', 'c']
+    monkeypatch.setattr(count_service.time, 'monotonic', lambda: 120)
+    assert CountService._get('b', 60) is None
+    assert list(cache) == ['c']
\ No newline at end of file
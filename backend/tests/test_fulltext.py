@@ -0,0 +1,9 @@
+"""Search excerpts mark the matched words of the original text"""
+from app.models.fulltext import FullTextIndex
+
+def test_highlight_ignores_case_and_accents():
+    assert FullTextIndex.highlight('Vacinação anual', [(['vacinacao'], False)]) == '<mark>Vacinação</mark> anual'
+
+def test_highlight_offsets_survive_characters_that_lowercase_longer():
+    text = 'İzmir İstanbul: rabies shot'
+    assert FullTextIndex.highlight(text, [(['rabies'], False)]) == 'İzmir İstanbul: <mark>rabies</mark> shot'
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""A resumed import keeps the rejects and the source keys of the runs before it"""
+import json
+
+from app import db
+from app.importer import Checkpoint, Importer
+from app.models import Owner, Pet
+
+def test_resumed_import_appends_to_the_rejects(app, tmp_path):
+    owners = tmp_path / 'owners.csv'
+    owners.write_text('id,first_name,last_name,address,city,telephone\n'
+                      '1,Jean,Coleman,105 N. Lake St.,Monona,6085552654\n'
+                      '2,Jeff,,440 Main St.,Monona,6085555387\n')
+    pets = tmp_path / 'pets.ndjson'
+    pets.write_text('{"name": "Max", "birth_date": "2019-09-06", "owner_id": 1, "type_id": 1}\n'
+                    '{"name": "Samantha", "birth_date": "2019-09-04", "owner_id": 1}\n')
+    checkpoint, rejects = str(tmp_path / 'import.json'), tmp_path / 'rejects.ndjson'
+    
+    with app.app_context():
+        def run(**files):
+            Importer(db.engine, Checkpoint(checkpoint), str(rejects), echo=lambda text: None).run(**files)
+        
+        try:
+            run(owners=str(owners))
+            run(owners=str(owners))
+            run(pets=str(pets))
+            recorded = [(entry['table'], entry['line']) for entry in map(json.loads, rejects.read_text().splitlines())]
+            assert recorded == [('owners', 2), ('pets', 2)]
+            # owner_id 1 is the source id of the owner loaded by the first run, not database id 1
+            owner = db.session.execute(db.select(Owner).join(Pet).where(Pet.name == 'Max')).scalar_one()
+            assert (owner.first_name, owner.last_name) == ('Jean', 'Coleman')
+        finally:
+            start = json.loads((tmp_path / 'import.json').read_text())
+            for model in (Pet, Owner):
+                if model.__tablename__ in start:
+                    db.session.execute(db.delete(model).where(model.id >= start[model.__tablename__]['start_id']))
+            db.session.commit()
\ No newline at end of file
@@ -0,0 +1,37 @@
+"""The orjson provider writes the same bytes as the stdlib one"""
+import json
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+CORPUS = [
+    'ascii', 'Conceição', 'Müller', 'São Paulo', '😀 emoji', '  line separator', '\x7f', '\x00\x1f\t\n',
+    'quote " and backslash \\', 'tab\tção', '\x7fç', 'follow-up e-mail', 'Suite e1',
+    0.0, -0.0, 0.1, 1.5, 123.456, 1e-4, 1e-5, 2.5e-7, 1e15, 1e16, 1.2345678901234568e17, 1.5e300, 5e-324,
+    float('nan'), float('inf'), float('-inf'),
+    0, -1, 2 ** 63 - 1, 2 ** 70, True, False, None,
+    date(2024, 2, 29), datetime(2026, 10, 17, 23, 59, 58, 999999),
+    datetime(2026, 10, 17, 1, 2, 3, tzinfo=timezone(timedelta(hours=-3))),
+    Decimal('10.50'), uuid.UUID(int=1),
+]
+
+def stdlib(obj):
+    return json.dumps(obj, default=DefaultJSONProvider.default, ensure_ascii=True, sort_keys=True, separators=(',', ':'))
+
+@pytest.mark.parametrize('value', CORPUS, ids=repr)
+def test_value_encodes_like_the_stdlib(app, value):
+    document = {'value': value, 'list': [value, {'b': value, 'a': 'Zoë'}]}
+    assert app.json.dumps(document, separators=(',', ':')) == stdlib(document)
+
+def test_corpus_encodes_like_the_stdlib(app):
+    document = {'data': CORPUS}
+    assert app.json.dumps(document, separators=(',', ':')) == stdlib(document)
+
+def test_plain_documents_do_not_fall_back(app, monkeypatch):
+    document = {'name': 'Conceição 😀', 'weight': 12.5, 'birth_date': date(2020, 1, 1), 'id': 1, 'tags': ['a', 'b']}
+    expected = stdlib(document)
+    monkeypatch.setattr(DefaultJSONProvider, 'dumps', lambda *args, **kwargs: pytest.fail('stdlib fallback'))
+    assert app.json.dumps(document, separators=(',', ':')) == expected
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""Statements each endpoint runs, so an N+1 or a dropped eager load fails here
+
+Every URL is requested once to warm the per-process caches (reference data,
+pagination totals) and counted on the second request.
+"""
+import pytest
+
+from app.services.count_service import CountService
+
+STATEMENTS = [
+    ('/api/owners', 1),
+    ('/api/owners?expand=pets', 2),
+    ('/api/owners?expand=pets.visits,pets.type', 4),
+    ('/api/owners?search=franklin', 1),
+    ('/api/owners/search/lastname/Franklin', 1),
+    ('/api/owners/1', 3),
+    ('/api/owners/1?expand=pets.visits', 4),
+    ('/api/pets', 1),
+    ('/api/pets?expand=owner,type,visits', 4),
+    ('/api/pets/1', 5),
+    ('/api/pets/owner/1', 2),
+    ('/api/visits', 1),
+    ('/api/visits?expand=pet.owner', 3),
+    ('/api/visits?cursor=&expand=pet', 2),
+    ('/api/visits/1', 3),
+    ('/api/visits/pet/1', 2),
+    ('/api/vets', 1),
+    ('/api/vets?expand=specialties', 2),
+    ('/api/vets/1', 3),
+    ('/api/pet-types', 0),
+    ('/api/specialties', 0),
+    ('/api/specialties/1', 0),
+]
+
+def count(client, statements, url):
+    assert client.get(url).status_code == 200
+    with statements() as executed:
+        assert client.get(url).status_code == 200
+    return len(executed)
+
+@pytest.mark.parametrize('url,expected', STATEMENTS)
+def test_statements_per_endpoint(client, statements, url, expected):
+    assert count(client, statements, url) == expected
+
+@pytest.mark.parametrize('url', [
+    '/api/owners?expand=pets.visits,pets.type',
+    '/api/pets?expand=owner,type,visits',
+    '/api/visits?expand=pet.owner',
+    '/api/vets?expand=specialties',
+])
+def test_statements_do_not_grow_with_page_size(client, statements, url):
+    assert count(client, statements, url + '&per_page=1') == count(client, statements, url + '&per_page=50')
+
+@pytest.mark.parametrize('url', ['/api/owners?expand=pets', '/api/pets', '/api/visits?expand=pet.owner'])
+def test_uncached_total_does_not_reload_the_page(client, statements, url):
+    # Only the statistics lookup and the COUNT on top of the warm request
+    warm = count(client, statements, url)
+    CountService.clear()
+    with statements() as executed:
+        assert client.get(url).status_code == 200
+    assert len(executed) == warm + 2
\ No newline at end of file
@@ -0,0 +1,31 @@
+"""The hot service queries stay on their indexes (``flask plans check`` as a test)"""
+import pytest
+
+from app.query_plans import _FULL_SCAN, check_hot_queries
+
+@pytest.mark.parametrize('step,table', [
+    ('SCAN visits', 'visits'),
+    ('SCAN TABLE visits', 'visits'),
+    ('SCAN owners USING INDEX ix_owners_last_name', 'owners'),
+    ('SCAN visits USING COVERING INDEX ix_visits_visit_date', 'visits'),
+    ('SEARCH visits USING INDEX ix_visits_visit_date (visit_date>?)', None),
+    ('SEARCH owners USING INTEGER PRIMARY KEY (rowid=?)', None),
+    ('SCAN owners_fts VIRTUAL TABLE INDEX 0:M5', None),
+    ('SCAN CONSTANT ROW', None),
+])
+def test_full_scan_pattern(step, table):
+    match = _FULL_SCAN.match(step)
+    assert (match.group(1) if match else None) == table
+
+def test_hot_queries_use_indexes(app):
+    with app.app_context():
+        report = check_hot_queries()
+    assert report
+    assert {entry['query']: entry['full_scans'] for entry in report if entry['full_scans']} == {}
+def test_last_name_lookup_is_an_escaped_prefix_match(client):
+    def last_names(prefix):
+        return [owner['last_name'] for owner in client.get(f'/api/owners/search/lastname/{prefix}').get_json()['data']['data']]
+    
+    assert last_names('fRANKLIN') == [f'Franklin{i}' for i in range(6)]
+    assert last_names('ranklin') == []
+    assert last_names('Franklin_') == [] and last_names('Franklin%') == []
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""Lookups of missing reference rows reload the table once, not on every request"""
+from app import db
+from app.models import PetType
+from app.services.cache_invalidation import tables_changed
+
+def pet_type_loads(executed):
+    return sum('FROM pet_types' in statement for statement in executed)
+
+def test_missing_pet_type_reloads_once(client, statements):
+    with statements() as executed:
+        for _ in range(3):
+            assert client.get('/api/pet-types/999').status_code == 404
+    assert pet_type_loads(executed) == 1
+
+def test_bad_type_in_bulk_payload_reloads_once(client, statements):
+    pets = [{'name': 'Lucky', 'birth_date': '2020-06-24', 'owner_id': 1, 'type_id': 998}]
+    with statements() as executed:
+        for _ in range(3):
+            assert client.post('/api/pets/bulk', json=pets).status_code == 400
+    assert pet_type_loads(executed) == 1
+
+def test_row_of_another_process_is_found_after_the_ttl(app, client, monkeypatch):
+    assert client.get('/api/pet-types/997').status_code == 404
+    with app.app_context():
+        # Core insert without tables_changed, like a write from another worker
+        db.session.execute(db.insert(PetType).values(id=997, name='hamster'))
+        db.session.commit()
+    try:
+        assert client.get('/api/pet-types/997').status_code == 404
+        monkeypatch.setitem(app.config, 'REFERENCE_CACHE_TTL', -1)
+        assert client.get('/api/pet-types/997').status_code == 200
+    finally:
+        with app.app_context():
+            db.session.execute(db.delete(PetType).where(PetType.id == 997))
+            db.session.commit()
+            tables_changed(['pet_types'])
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""GET reads go to the replica, writes and the reads that follow them to the primary"""
+import pytest
+
+from app import create_app, db
+from app.models import Owner
+from config import TestingConfig, config
+
+@pytest.fixture
+def routed(tmp_path, monkeypatch):
+    """An app on two SQLite files holding the same owner under different last names"""
+    class ReplicaConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'primary.db'}"
+        SQLALCHEMY_REPLICA_URIS = [f"sqlite:///{tmp_path / 'replica.db'}"]
+        REPLICA_LAG_WINDOW = 0
+    
+    monkeypatch.setitem(config, 'replicas', ReplicaConfig)
+    app = create_app('replicas')
+    with app.app_context():
+        for key, last_name in ((None, 'Primary'), ('replica_0', 'Replica')):
+            engine = db.engines[key]
+            db.metadata.create_all(engine)
+            with engine.begin() as connection:
+                connection.execute(db.insert(Owner).values(id=1, first_name='Betty', last_name=last_name,
+                                                           address='638 Cardinal Ave.', city='Sun Prairie',
+                                                           telephone='6085551749'))
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+    # Flask-SQLAlchemy keeps a MetaData per bind key for every app, the other apps have no replica
+    db.metadatas.pop('replica_0')
+
+def last_name():
+    return db.session.execute(db.select(Owner.last_name).where(Owner.id == 1)).scalar()
+
+def test_get_reads_the_replica(routed):
+    response = routed.test_client().get('/api/owners/1')
+    assert response.get_json()['data']['last_name'] == 'Replica'
+
+def test_writes_go_to_the_primary(routed):
+    response = routed.test_client().put('/api/owners/1', json={'city': 'Madison'})
+    assert response.status_code == 200 and response.get_json()['data']['last_name'] == 'Primary'
+    with routed.app_context():
+        cities = {}
+        for key, engine in db.engines.items():
+            with engine.connect() as connection:
+                cities[key] = connection.execute(db.select(Owner.city)).scalar()
+    assert cities == {None: 'Madison', 'replica_0': 'Sun Prairie'}
+
+def test_reads_after_a_write_in_a_get_use_the_primary(routed):
+    with routed.test_request_context('/api/owners/1', method='GET'):
+        assert last_name() == 'Replica'
+        db.session.add(Owner(first_name='Peter', last_name='McTavish', address='2387 S. Fair Way',
+                             city='Madison', telephone='6085552765'))
+        # The autoflush writes the pending owner first, the read then follows it
+        assert last_name() == 'Primary'
+        assert db.session.execute(db.select(Owner.id).where(Owner.last_name == 'McTavish')).scalar() == 2
+        db.session.rollback()
\ No newline at end of file
@@ -0,0 +1,20 @@
+"""Service lookups return pages, never whole tables"""
+from datetime import date
+
+import pytest
+
+from app.services.pet_service import PetService
+from app.services.visit_service import VisitService
+
+@pytest.mark.parametrize('lookup,total', [
+    (lambda **page: PetService.get_pets_by_type(1, **page), 4),
+    (lambda **page: PetService.find_pets_by_name('leo', **page), 12),
+    (lambda **page: PetService.get_pets_born_after(date(2019, 12, 31), **page), 12),
+    (lambda **page: PetService.get_pets_born_before(date(2020, 1, 2), **page), 12),
+    (lambda **page: VisitService.get_visits_by_date(date(2024, 1, 2), **page), 12),
+])
+def test_lookup_is_paginated(app, lookup, total):
+    with app.app_context():
+        page = lookup(per_page=3)
+        assert len(page['data']) == 3 and page['total'] == total and page['has_next']
+        assert len(lookup(cursor=[])['data']) == min(total, 20)
\ No newline at end of file
@@ -2,40 +2,29 @@ import { useEffect, useState } from "react";
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from "@/components/ui/card";
 import { Badge } from "@/components/ui/badge";
 import { Users, Heart, Calendar, UserCheck } from "lucide-react";
-import { ownerService, petService, visitService, vetService } from "@/services/api";
-
-interface DashboardStats {
-  owners: number;
-  pets: number;
-  visits: number;
-  vets: number;
-}
+import { statsService, Stats } from "@/services/api";
 
 export default function Dashboard() {
-  const [stats, setStats] = useState<DashboardStats>({
+  const [stats, setStats] = useState<Stats>({
     owners: 0,
     pets: 0,
     visits: 0,
     vets: 0,
+    specialties: 0,
+    pet_types: 0,
+    visits_today: 0,
+    visits_this_week: 0,
+    visits_this_month: 0,
+    pets_per_type: [],
   });
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     const fetchStats = async () => {
       try {
-        const [ownersData, petsData, visitsData, vetsData] = await Promise.all([
-          ownerService.getAll(1, 1),
-          petService.getAll(1, 1),
-          visitService.getAll(1, 1),
-          vetService.getAll(1, 1),
-        ]);
-
-        setStats({
-          owners: ownersData.total,
-          pets: petsData.total,
-          visits: visitsData.total,
-          vets: vetsData.total,
-        });
+        // A single cached request instead of one paginated list per entity
+        const response = await statsService.get();
+        setStats(response.data);
       } catch (error) {
         console.error('Error fetching dashboard stats:', error);
       } finally {
@@ -107,6 +96,48 @@ export default function Dashboard() {
         ))}
       </div>
 
+      <div className="grid gap-4 md:grid-cols-2">
+        <Card>
+          <CardHeader>
+            <CardTitle>Visits</CardTitle>
+            <CardDescription>
+              Appointments in the current period
+            </CardDescription>
+          </CardHeader>
+          <CardContent className="space-y-2">
+            <div className="flex items-center justify-between text-sm">
+              <span>Today</span>
+              <span className="font-bold">{loading ? "..." : stats.visits_today}</span>
+            </div>
+            <div className="flex items-center justify-between text-sm">
+              <span>This week</span>
+              <span className="font-bold">{loading ? "..." : stats.visits_this_week}</span>
+            </div>
+            <div className="flex items-center justify-between text-sm">
+              <span>This month</span>
+              <span className="font-bold">{loading ? "..." : stats.visits_this_month}</span>
+            </div>
+          </CardContent>
+        </Card>
+
+        <Card>
+          <CardHeader>
+            <CardTitle>Pets by Type</CardTitle>
+            <CardDescription>
+              How many pets of each type are registered
+            </CardDescription>
+          </CardHeader>
+          <CardContent className="space-y-2">
+            {stats.pets_per_type.map((type) => (
+              <div key={type.type_id} className="flex items-center justify-between text-sm">
+                <Badge variant="outline">{type.name}</Badge>
+                <span className="font-bold">{type.pets}</span>
+              </div>
+            ))}
+          </CardContent>
+        </Card>
+      </div>
+
       <div className="grid gap-4 md:grid-cols-2 lg:grid-cols-3">
         <Card className="col-span-2">
           <CardHeader>
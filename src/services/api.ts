@@ -110,6 +110,26 @@ export interface Visit {
   created_at?: string;
   updated_at?: string;
   pet?: Pet;
+  snippet?: string;
+}
+
+export interface PetTypeCount {
+  type_id: number;
+  name: string;
+  pets: number;
+}
+
+export interface Stats {
+  owners: number;
+  pets: number;
+  visits: number;
+  vets: number;
+  specialties: number;
+  pet_types: number;
+  visits_today: number;
+  visits_this_week: number;
+  visits_this_month: number;
+  pets_per_type: PetTypeCount[];
 }
 
 export interface PaginatedResponse<T> {
@@ -117,6 +137,7 @@ export interface PaginatedResponse<T> {
   page: number;
   per_page: number;
   total: number;
+  total_mode?: 'exact' | 'cached' | 'estimated';
   pages: number;
 }
 
@@ -197,4 +218,9 @@ export const petTypeService = {
     apiClient.put<PetType>(`/pet-types/${id}`, data),
   delete: (id: number) => 
     apiClient.delete(`/pet-types/${id}`),
+};
+
+export const statsService = {
+  get: () =>
+    apiClient.get<{ data: Stats }>('/stats'),
 };
\ No newline at end of file